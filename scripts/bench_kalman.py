@@ -0,0 +1,94 @@
+"""
+Micro-benchmark: Kalman predict + update per step.
+
+    python -m scripts.bench_kalman --steps 20000 --tracks 16
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.tracking.kalman_filter import BallKalmanFilter, BatchKalmanFilter
+
+
+class LegacyBallKalman:
+    """The previous BallKalmanFilter (np.linalg.inv + fresh arrays every step)."""
+
+    def __init__(self, dt=1/30):
+        self.x = np.zeros((4, 1))
+        self.F = np.array([
+            [1, 0, dt, 0],
+            [0, 1, 0, dt],
+            [0, 0, 1,  0],
+            [0, 0, 0,  1]
+        ])
+        self.H = np.array([
+            [1, 0, 0, 0],
+            [0, 1, 0, 0]
+        ])
+        self.P = np.eye(4) * 500
+        self.R = np.eye(2) * 10
+        self.Q = np.eye(4) * 0.1
+
+    def predict(self):
+        self.x = self.F @ self.x
+        self.P = self.F @ self.P @ self.F.T + self.Q
+        return self.x[:2].flatten()
+
+    def update(self, z):
+        z = np.array(z).reshape(2, 1)
+        y = z - (self.H @ self.x)
+        S = self.H @ self.P @ self.H.T + self.R
+        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ y
+        self.P = (np.eye(4) - K @ self.H) @ self.P
+
+
+def measurements(steps, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(steps) / 30.0
+    xy = np.stack([100 + 600 * t, 200 + 150 * t], axis=1)
+    return xy + rng.normal(0, 3, xy.shape)
+
+
+def time_single(kf, zs):
+    zs = [tuple(z) for z in zs]
+    t0 = time.perf_counter()
+    for z in zs:
+        kf.predict()
+        kf.update(z)
+    return (time.perf_counter() - t0) / len(zs)
+
+
+def time_batch(n, zs):
+    kf = BatchKalmanFilter(n)
+    Z = np.repeat(zs[:, None, :], n, axis=1)
+    t0 = time.perf_counter()
+    for z in Z:
+        kf.predict()
+        kf.update(z)
+    return (time.perf_counter() - t0) / len(Z)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--tracks", type=int, default=16)
+    args = parser.parse_args()
+
+    zs = measurements(args.steps)
+
+    legacy = time_single(LegacyBallKalman(), zs)
+    current = time_single(BallKalmanFilter(), zs)
+    batch = time_batch(args.tracks, zs)
+
+    print(f"legacy  BallKalman         {legacy * 1e6:8.2f} µs/step")
+    print(f"BallKalmanFilter           {current * 1e6:8.2f} µs/step  "
+          f"({legacy / current:.1f}x)")
+    print(f"BatchKalmanFilter N={args.tracks:<4}  {batch * 1e6:8.2f} µs/step  "
+          f"({batch / args.tracks * 1e6:.2f} µs/track, "
+          f"{legacy * args.tracks / batch:.1f}x vs {args.tracks} legacy filters)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Per-frame tracking cost against the number of balls in view:
+MultiBallTracker (one set of arrays) vs one TrackStage per ball.
+
+    python -m scripts.bench_multi_track --balls 1 4 16 64 --frames 300
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.pipeline.stages import TrackStage
+from src.tracking.multi_tracker import MultiBallTracker
+from src.utils.synthetic import delivery_path
+
+WIDTH, HEIGHT = 1920, 1080
+
+
+def scene(balls, frames, seed=0):
+    """Per-frame detection arrays: `balls` deliveries in parallel lanes, restarting."""
+    rng = np.random.default_rng(seed)
+    lane = WIDTH / (balls + 1)
+    dets = [[] for _ in range(frames)]
+    for b in range(balls):
+        start = int(rng.integers(0, 30))
+        while start < frames:
+            xy, _ = delivery_path(60, lane, HEIGHT, rng)
+            xy[:, 0] += lane * b
+            for k, (x, y) in enumerate(xy):
+                if start + k < frames:
+                    dets[start + k].append((x, y, x - 4, y - 4, x + 4, y + 4, 0.9))
+            start += 60 + int(rng.integers(10, 30))
+    return dets
+
+
+def time_multi(dets):
+    tracker = MultiBallTracker(fps=30)
+    t0 = time.perf_counter()
+    for k, d in enumerate(dets):
+        tracker.step(np.asarray(d, dtype=np.float32).reshape(-1, 7), HEIGHT, k / 30)
+    return (time.perf_counter() - t0) / len(dets), tracker.next_id
+
+
+def time_per_object(dets, balls):
+    stages = [TrackStage(fps=30) for _ in range(balls)]
+    t0 = time.perf_counter()
+    for k, d in enumerate(dets):
+        for stage, det in zip(stages, d):
+            stage.step([det], HEIGHT, k / 30)
+    return (time.perf_counter() - t0) / len(dets)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--balls", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    for n in args.balls:
+        dets = scene(n, args.frames)
+        multi, tracks = time_multi(dets)
+        single = time_per_object(dets, n)
+        print(f"balls={n:<4} MultiBallTracker {multi * 1e6:9.1f} µs/frame "
+              f"({tracks} tracks)   {n} x TrackStage {single * 1e6:9.1f} µs/frame  "
+              f"({single / multi:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
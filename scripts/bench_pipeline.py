@@ -0,0 +1,203 @@
+"""
+Per-stage pipeline benchmark on synthetic delivery videos.
+No GPU or weights needed: detection is a ground-truth stub.
+
+    python -m scripts.bench_pipeline                                  # print
+    python -m scripts.bench_pipeline --save outputs/bench/baseline.json
+    python -m scripts.bench_pipeline --check outputs/bench/baseline.json --tolerance 0.3
+
+Stages (ms per frame, best of --repeat runs after one warm-up):
+  decode     cv2.VideoCapture.read
+  detect     GroundTruthDetector (box filter on truth + clutter)
+  associate  associate_ball + gated associate_tracks
+  kalman     BallKalmanFilter predict / update
+  track      TrackStage.step (BallTracker speed / bounce / pitch analytics)
+  draw       OverlayRenderer update + draw (boxes, trail, future path, HUD)
+  export     ExportStage.record + final JSON save
+--check exits 1 if any stage is slower than baseline * (1 + tolerance).
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from src.association.data_association import associate_ball, associate_tracks
+from src.pipeline.stages import TrackStage, ExportStage
+from src.tracking.kalman_filter import BallKalmanFilter
+from src.utils.json_exporter import BallJSONExporter
+from src.utils.synthetic import make_delivery_video, GroundTruthDetector, ball_radius
+from src.visualization.renderer import OverlayRenderer
+
+STAGES = ("decode", "detect", "associate", "kalman", "track", "draw", "export")
+
+# stages cheaper than this (ms/frame) are too noisy to gate on
+MIN_GATED_MS = 0.002
+
+
+def run_once(video, truth, width, height, fps, clutter, tmp_dir):
+    cap = cv2.VideoCapture(video)
+    assert cap.isOpened(), f"❌ Failed to open video: {video}"
+
+    detector = GroundTruthDetector(truth, ball_radius(width), (width, height), clutter=clutter)
+    kalman = BallKalmanFilter(dt=1 / fps)
+    track_stage = TrackStage(fps=fps)
+    exporter = BallJSONExporter(os.path.basename(video), fps)
+    export = ExportStage(exporter)
+    renderer = OverlayRenderer(fps)
+
+    acc = dict.fromkeys(STAGES, 0.0)
+    clock = time.perf_counter
+    n = 0
+
+    while True:
+        t0 = clock()
+        ok, frame = cap.read()
+        t1 = clock()
+        if not ok:
+            break
+        acc["decode"] += t1 - t0
+
+        dets = detector.detect(frame, frame_index=n)
+        t2 = clock()
+        acc["detect"] += t2 - t1
+
+        tracker = track_stage.tracker
+        predicted = tracker.predict() if tracker.initialized else None
+        associate_ball(dets, predicted)
+        if kalman.initialized:
+            S = kalman.P[:2, :2] + kalman.R
+            associate_tracks(dets, [kalman.get_position()], S[None])
+        t3 = clock()
+        acc["associate"] += t3 - t2
+
+        if kalman.initialized:
+            kalman.predict()
+        if dets:
+            cx, cy = dets[0][:2]
+            if kalman.initialized:
+                kalman.update((cx, cy))
+            else:
+                kalman.init(cx, cy)
+        t4 = clock()
+        acc["kalman"] += t4 - t3
+
+        track = track_stage.step(dets, height, n / fps)
+        t5 = clock()
+        acc["track"] += t5 - t4
+
+        renderer.update(track)
+        renderer.draw(frame, dets, track)
+        t6 = clock()
+        acc["draw"] += t6 - t5
+
+        export.record(n, track)
+        acc["export"] += clock() - t6
+        n += 1
+
+    cap.release()
+
+    t0 = clock()
+    export.close()
+    exporter.save(os.path.join(tmp_dir, "bench.json"))
+    acc["export"] += clock() - t0
+
+    return {k: 1000 * v / max(n, 1) for k, v in acc.items()}, n
+
+
+def bench_case(width, height, frames, fps, repeat, clutter, tmp_dir):
+    video = os.path.join(tmp_dir, f"synthetic_{width}x{height}_{frames}.mp4")
+    truth, _ = make_delivery_video(video, width, height, frames, fps)
+
+    # warm-up: page cache, codec init, first-call numpy overheads
+    run_once(video, truth, width, height, fps, clutter, tmp_dir)
+
+    best = None
+    for _ in range(repeat):
+        ms, n = run_once(video, truth, width, height, fps, clutter, tmp_dir)
+        best = ms if best is None else {k: min(best[k], ms[k]) for k in STAGES}
+
+    best["total"] = sum(best[k] for k in STAGES)
+    best["frames"] = n
+    return {k: round(v, 4) for k, v in best.items()}
+
+
+def compare(baseline, results, tolerance):
+    """[(case, stage, base_ms, now_ms), ...] for every stage over budget."""
+    slow = []
+    for case, stages in results.items():
+        base = baseline.get(case)
+        if base is None:
+            continue
+        for stage in STAGES:
+            b, now = base.get(stage), stages[stage]
+            if b is None or max(b, now) < MIN_GATED_MS:
+                continue
+            if now > b * (1 + tolerance):
+                slow.append((case, stage, b, now))
+    return slow
+
+
+def parse_resolutions(text):
+    return [tuple(int(v) for v in r.split("x")) for r in text.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resolutions", default="640x360,1280x720,1920x1080")
+    parser.add_argument("--frames", default="150,600",
+                        help="comma-separated video lengths")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--clutter", type=int, default=3,
+                        help="false-positive boxes per frame")
+    parser.add_argument("--save", default=None, help="write results as a baseline")
+    parser.add_argument("--check", default=None, help="compare against a baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for width, height in parse_resolutions(args.resolutions):
+            for frames in (int(f) for f in args.frames.split(",")):
+                case = f"{width}x{height}x{frames}"
+                results[case] = bench_case(
+                    width, height, frames, args.fps, args.repeat, args.clutter, tmp_dir
+                )
+
+    print(f"{'case':>16} " + " ".join(f"{s:>9}" for s in STAGES + ("total",)))
+    for case, ms in results.items():
+        print(f"{case:>16} " + " ".join(f"{ms[s]:9.3f}" for s in STAGES + ("total",)))
+    print("(ms per frame)")
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump({
+                "machine": platform.platform(),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "opencv": cv2.__version__,
+                "results": results
+            }, f, indent=2)
+        print(f"✅ baseline → {args.save}")
+
+    if args.check:
+        with open(args.check) as f:
+            baseline = json.load(f)["results"]
+        slow = compare(baseline, results, args.tolerance)
+        for case, stage, b, now in slow:
+            print(f"❌ {case} {stage}: {b:.3f} → {now:.3f} ms/frame "
+                  f"(+{100 * (now / b - 1):.0f}%, tolerance {100 * args.tolerance:.0f}%)")
+        if slow:
+            sys.exit(1)
+        print(f"✅ all stages within {100 * args.tolerance:.0f}% of {args.check}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Accuracy parity and CPU throughput of detector backends.
+
+Reference boxes come from the detection cache of the PyTorch (.pt) run,
+so the reference model does not need to be loaded again:
+
+    python -m src.cli --set yolo.model=models/yolo/ball_stump_best.pt \
+        track data/samples/test_video.mp4 --cache outputs/cache
+    python -m scripts.compare_backends --video data/samples/test_video.mp4 \
+        --reference models/yolo/ball_stump_best.pt --cache outputs/cache \
+        --candidate models/yolo/ball_stump_best.onnx \
+        --candidate models/yolo/ball_stump_best_int8.onnx
+
+Exits 1 if any candidate's ball detections agree with the reference
+on fewer than --min-agreement of boxes (IoU >= --iou).
+"""
+import argparse
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from src.detection.cache import DetectionCache
+from src.detection.yolo_detector import BallBoxFilter, YoloBallDetector
+
+
+def box_iou(a, b):
+    """(N, 4) × (M, 4) → (N, M) IoU."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def match(ref, cand, iou=0.5):
+    """Greedy one-to-one match of (M, 7) detection arrays; returns index pairs."""
+    if len(ref) == 0 or len(cand) == 0:
+        return []
+    overlap = box_iou(ref[:, 2:6], cand[:, 2:6])
+    pairs = []
+    while True:
+        i, j = np.unravel_index(np.argmax(overlap), overlap.shape)
+        if overlap[i, j] < iou:
+            return pairs
+        pairs.append((i, j))
+        overlap[i, :] = -1
+        overlap[:, j] = -1
+
+
+def evaluate(detector, frames, reference, box_filter, iou):
+    n_ref = n_cand = n_match = 0
+    centre_err = []
+    conf_err = []
+
+    t0 = time.perf_counter()
+    outputs = [detector.filter_boxes(*detector.detect_raw(f)) for f in frames]
+    wall = time.perf_counter() - t0
+
+    for ref_raw, cand in zip(reference, outputs):
+        ref = box_filter.filter_boxes(*ref_raw)
+        pairs = match(ref, cand, iou)
+        n_ref += len(ref)
+        n_cand += len(cand)
+        n_match += len(pairs)
+        for i, j in pairs:
+            centre_err.append(np.hypot(*(ref[i, :2] - cand[j, :2])))
+            conf_err.append(abs(ref[i, 6] - cand[j, 6]))
+
+    return {
+        "fps": len(frames) / wall if wall > 0 else 0.0,
+        "recall": n_match / n_ref if n_ref else 1.0,
+        "precision": n_match / n_cand if n_cand else 1.0,
+        "centre_err_px": float(np.mean(centre_err)) if centre_err else 0.0,
+        "conf_err": float(np.mean(conf_err)) if conf_err else 0.0,
+        "boxes": (n_ref, n_cand)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--video", required=True)
+    parser.add_argument("--reference", required=True, help=".pt weights the cache was built with")
+    parser.add_argument("--cache", default="outputs/cache")
+    parser.add_argument("--candidate", action="append", default=[],
+                        help="exported model (.onnx / .xml); repeatable")
+    parser.add_argument("--backend", default="auto",
+                        help="force a backend for the candidates (onnx / openvino)")
+    parser.add_argument("--time-reference", action="store_true",
+                        help="also load the .pt model to measure its throughput")
+    parser.add_argument("--conf", type=float, default=0.2)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--iou", type=float, default=0.5)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--min-agreement", type=float, default=0.95)
+    args = parser.parse_args()
+
+    cached = DetectionCache(args.cache).load(args.video, args.reference, args.conf)
+    assert cached is not None, (
+        f"❌ No cached reference detections for {args.video} at conf {args.conf}"
+    )
+
+    cap = cv2.VideoCapture(args.video)
+    assert cap.isOpened(), f"❌ Failed to open video: {args.video}"
+    frames = []
+    while len(frames) < min(args.frames, len(cached)):
+        ok, frame = cap.read()
+        if not ok:
+            break
+        frames.append(frame)
+    cap.release()
+
+    reference = [cached.raw(i) for i in range(len(frames))]
+    box_filter = BallBoxFilter(conf=args.conf)
+
+    models = [(args.reference, "ultralytics")] if args.time_reference else []
+    models += [(path, args.backend) for path in args.candidate]
+
+    failed = False
+    print(f"{len(frames)} frames, reference: {cached.path}")
+    print(f"{'model':>40} {'backend':>12} {'fps':>7} {'recall':>7} "
+          f"{'prec':>7} {'Δc px':>6} {'Δconf':>6}")
+    for path, backend in models:
+        try:
+            detector = YoloBallDetector(
+                path, conf=args.conf, backend=backend, threads=args.threads
+            )
+        except ImportError as e:
+            print(f"{path:>40} skipped: {e}")
+            continue
+
+        # warm-up (graph optimisation, allocator)
+        detector.detect_raw(frames[0])
+
+        r = evaluate(detector, frames, reference, box_filter, args.iou)
+        print(f"{path[-40:]:>40} {detector.backend.name:>12} {r['fps']:7.1f} "
+              f"{r['recall']:7.3f} {r['precision']:7.3f} "
+              f"{r['centre_err_px']:6.2f} {r['conf_err']:6.3f}")
+
+        if min(r["recall"], r["precision"]) < args.min_agreement:
+            print(f"❌ {path}: agreement below {args.min_agreement}")
+            failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
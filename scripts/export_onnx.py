@@ -0,0 +1,60 @@
+"""
+Export the ball detector for the CPU backends, optionally INT8.
+
+    python -m scripts.export_onnx --model models/yolo/ball_stump_best.pt
+    python -m scripts.export_onnx --model models/yolo/ball_stump_best.pt \
+        --int8 --calib-video data/samples/test_video.mp4 --calib-frames 200
+
+Run the result with --model ....onnx (backend picked by extension) and
+check it with scripts/compare_backends.py.
+"""
+import argparse
+import os
+
+import cv2
+
+from src.detection.backends import export_onnx, quantize_int8
+
+
+def sample_frames(video, n):
+    cap = cv2.VideoCapture(video)
+    assert cap.isOpened(), f"❌ Failed to open video: {video}"
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) or n
+    step = max(1, total // n)
+
+    frames = []
+    index = 0
+    while len(frames) < n:
+        ok, frame = cap.read()
+        if not ok:
+            break
+        if index % step == 0:
+            frames.append(frame)
+        index += 1
+    cap.release()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--model", default="models/yolo/ball_stump_best.pt")
+    parser.add_argument("--imgsz", type=int, default=640)
+    parser.add_argument("--dynamic", action="store_true",
+                        help="dynamic input size (needed for search-window crops)")
+    parser.add_argument("--int8", action="store_true")
+    parser.add_argument("--calib-video", default="data/samples/test_video.mp4")
+    parser.add_argument("--calib-frames", type=int, default=200)
+    args = parser.parse_args()
+
+    onnx_path = export_onnx(args.model, imgsz=args.imgsz, dynamic=args.dynamic)
+    print(f"✅ {args.model} → {onnx_path}")
+
+    if args.int8:
+        frames = sample_frames(args.calib_video, args.calib_frames)
+        out = os.path.splitext(onnx_path)[0] + "_int8.onnx"
+        quantize_int8(onnx_path, out, frames, imgsz=args.imgsz)
+        print(f"✅ INT8 ({len(frames)} calibration frames) → {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Array-based bounce detection and pitch-length classification.
+
+Same (x, y[, offsets]) conventions as speed_estimator. Image y grows
+downwards, so the ball falls towards the bounce (y increasing) and
+rises after it: the bounce is the first clear local maximum of y.
+"""
+import numpy as np
+
+from src.analytics.speed_estimator import _first_per_segment, as_offsets, segment_ids
+
+# bounce row / frame height thresholds, as BallTracker.classify_pitch
+PITCH_CLASSES = (
+    (0.75, "YORKER"),
+    (0.55, "FULL"),
+    (0.35, "GOOD"),
+)
+
+# bounce distance from the striker's stumps (m), with a PitchCalibration
+PITCH_LENGTHS_M = (
+    (2.0, "YORKER"),
+    (6.0, "FULL"),
+    (8.0, "GOOD"),
+)
+
+
+def detect_bounces(y, offsets=None, after=None, span=3, min_drop=3.0):
+    """
+    Bounce index per delivery, -1 where none.
+
+    A point is a bounce if it is the largest y within ±`span` samples of
+    its delivery, the ball fell at least `min_drop` px over the `span`
+    samples before it and rose at least `min_drop` px over the `span`
+    after it. Three-sample wiggles from detector jitter do not pass.
+    `after` (per-delivery index, e.g. release) ignores earlier points.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    offsets = as_offsets(n, offsets)
+    seg = segment_ids(offsets)
+    idx = np.arange(n)
+
+    cand = np.ones(n, dtype=bool)
+    for k in range(1, span + 1):
+        for j in (idx - k, idx + k):
+            inside = (j >= 0) & (j < n)
+            jj = np.clip(j, 0, max(n - 1, 0))
+            same = inside & (seg[jj] == seg)
+            # neighbours must exist on both sides and not be higher (larger y)
+            cand &= same & (y >= y[jj])
+
+    before = np.clip(idx - span, 0, None)
+    after_i = np.clip(idx + span, None, n - 1)
+    cand &= (y - y[before] >= min_drop) & (y - y[after_i] >= min_drop)
+
+    if after is not None:
+        after = np.asarray(after, dtype=np.int64)
+        cand &= idx >= np.maximum(after, 0)[seg]
+
+    return _first_per_segment(cand, offsets)
+
+
+def classify_pitch(bounce_y, frame_height):
+    """Pitch length class per bounce row; None where there is no bounce."""
+    ratio = np.asarray(bounce_y, dtype=np.float64) / frame_height
+    labels = np.full(ratio.shape, "SHORT", dtype=object)
+    for threshold, label in reversed(PITCH_CLASSES):
+        labels[ratio > threshold] = label
+    labels[~np.isfinite(ratio)] = None
+    return labels
+
+
+def classify_pitch_m(distance):
+    """Pitch length class per bounce distance from the stumps in metres."""
+    distance = np.asarray(distance, dtype=np.float64)
+    labels = np.full(distance.shape, "SHORT", dtype=object)
+    for threshold, label in reversed(PITCH_LENGTHS_M):
+        labels[distance < threshold] = label
+    labels[~np.isfinite(distance)] = None
+    return labels
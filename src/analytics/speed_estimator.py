@@ -0,0 +1,182 @@
+"""
+Array-based speed analytics over whole trajectories.
+
+Every function takes the (t, x, y) columns of one delivery, or of many
+deliveries concatenated with `offsets` (delivery k is
+offsets[k]:offsets[k+1], the save_trajectories layout), and works in a
+handful of NumPy passes: differences never cross a delivery boundary.
+"""
+import numpy as np
+
+from src.utils.geometry import perspective_scale
+
+MPS_TO_KMPH = 3.6
+
+
+def as_offsets(n, offsets=None):
+    """Single delivery → [0, n]."""
+    if offsets is None:
+        return np.array([0, n], dtype=np.int64)
+    return np.asarray(offsets, dtype=np.int64)
+
+
+def segment_ids(offsets):
+    """Delivery index of every point."""
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+def speed_profile(t, x, y, offsets=None, meters_per_pixel=20.12 / 520,
+                  frame_height=None, perspective_gain=1.5, lag=3, max_kmph=180.0,
+                  calibration=None):
+    """
+    Speed (km/h) at every point from the displacement over `lag` samples,
+    centred on the point (time-based, so gaps between detections are fine).
+    The metres / pixel factor is scaled by image row like TrackStage when
+    `frame_height` is known (a scalar, or per point with 0 for unknown).
+    With a PitchCalibration, distances are measured on the pitch plane
+    (PitchCalibration.to_pitch) instead. Edges of each delivery and implausible
+    values (> max_kmph, i.e. association glitches) are NaN.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(t)
+    offsets = as_offsets(n, offsets)
+    seg = segment_ids(offsets)
+
+    speed = np.full(n, np.nan)
+    if n <= lag:
+        return speed
+
+    i = np.arange(n - lag)
+    j = i + lag
+    ok = seg[i] == seg[j]
+    i, j = i[ok], j[ok]
+
+    dt = t[j] - t[i]
+    mid = i + lag // 2
+    if calibration is not None:
+        x, y = calibration.to_pitch(x, y)
+    dist = np.hypot(x[j] - x[i], y[j] - y[i])
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mpp = 1.0
+        if calibration is None:
+            heights = np.asarray(frame_height)[mid] if np.ndim(frame_height) else frame_height
+            mpp = _meters_per_pixel(y[mid], meters_per_pixel, heights, perspective_gain)
+        kmph = dist / dt * mpp * MPS_TO_KMPH
+    kmph[~(dt > 0) | (kmph > max_kmph)] = np.nan
+    speed[mid] = kmph
+    return speed
+
+
+def velocity_speed(x, y, vx, vy, meters_per_pixel=20.12 / 520, frame_height=None,
+                   perspective_gain=1.5, max_kmph=180.0, calibration=None):
+    """
+    Speed (km/h) at every point from a velocity estimate (px/s), e.g. the
+    rts_smooth velocities, with the same metres / pixel handling as
+    speed_profile. With a PitchCalibration the velocity is carried onto
+    the pitch plane over a short step. NaN where the velocity is unknown
+    or implausible.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    vx = np.asarray(vx, dtype=np.float64)
+    vy = np.asarray(vy, dtype=np.float64)
+
+    with np.errstate(invalid="ignore"):
+        if calibration is not None:
+            step = 1e-3             # s; the homography is smooth at this scale
+            X0, Y0 = calibration.to_pitch(x, y)
+            X1, Y1 = calibration.to_pitch(x + vx * step, y + vy * step)
+            kmph = np.hypot(X1 - X0, Y1 - Y0) / step * MPS_TO_KMPH
+        else:
+            mpp = _meters_per_pixel(y, meters_per_pixel, frame_height, perspective_gain)
+            kmph = np.hypot(vx, vy) * mpp * MPS_TO_KMPH
+        kmph[~(kmph <= max_kmph)] = np.nan
+    return kmph
+
+
+def _meters_per_pixel(y, meters_per_pixel, frame_height, perspective_gain):
+    """Per-point metres / pixel: perspective-scaled where the frame height is known."""
+    if np.ndim(frame_height):
+        h = np.asarray(frame_height, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return meters_per_pixel * np.where(
+                h > 0, perspective_scale(y, h, perspective_gain), 1.0
+            )
+    if frame_height:
+        return meters_per_pixel * perspective_scale(y, frame_height, perspective_gain)
+    return meters_per_pixel
+
+
+def _first_per_segment(mask, offsets):
+    """Index of the first True in each segment, -1 where there is none."""
+    n = offsets[-1]
+    idx = np.where(mask, np.arange(n), n)
+    first = np.full(len(offsets) - 1, -1, dtype=np.int64)
+    nonempty = np.diff(offsets) > 0
+    if nonempty.any():
+        best = np.minimum.reduceat(idx, offsets[:-1][nonempty])
+        best[best >= offsets[1:][nonempty]] = -1
+        first[nonempty] = best
+    return first
+
+
+def release_points(speed, offsets=None, release_kmph=30.0, hits=3):
+    """
+    First index per delivery where speed stays above `release_kmph` for
+    `hits` consecutive samples (the same trigger as DeliverySegmenter),
+    -1 where the ball never released.
+    """
+    offsets = as_offsets(len(speed), offsets)
+    if len(speed) == 0:
+        return np.full(len(offsets) - 1, -1, dtype=np.int64)
+    above = np.nan_to_num(speed, nan=0.0) > release_kmph
+
+    # runs of `hits` Trues ending at each index, not crossing a boundary
+    full = np.convolve(above, np.ones(hits, dtype=np.int64))[:len(above)] == hits
+    ends = np.flatnonzero(full)
+    starts = ends - (hits - 1)
+    seg = segment_ids(offsets)
+    ends = ends[(starts >= 0) & (seg[np.maximum(starts, 0)] == seg[ends])]
+
+    run = np.zeros(len(above), dtype=bool)
+    run[ends] = True
+    end = _first_per_segment(run, offsets)
+    return np.where(end >= 0, end - (hits - 1), -1)
+
+
+def release_speeds(speed, release, offsets=None, window=5):
+    """Median speed over the `window` samples from each release index (NaN if none)."""
+    offsets = as_offsets(len(speed), offsets)
+    release = np.asarray(release, dtype=np.int64)
+    idx = release[:, None] + np.arange(window)
+    valid = (release[:, None] >= 0) & (idx < offsets[1:, None])
+    vals = np.where(valid, speed[np.clip(idx, 0, max(len(speed) - 1, 0))], np.nan)
+
+    out = np.full(len(release), np.nan)
+    has = np.isfinite(vals).any(axis=1)
+    out[has] = np.nanmedian(vals[has], axis=1)
+    return out
+
+
+def speed_summary(speed, offsets=None):
+    """Per-delivery (max, mean) km/h over the valid profile samples."""
+    offsets = as_offsets(len(speed), offsets)
+    nonempty = np.diff(offsets) > 0
+    starts = offsets[:-1][nonempty]
+
+    valid = np.isfinite(speed)
+    total = np.add.reduceat(np.where(valid, speed, 0.0), starts) if len(starts) else []
+    count = np.add.reduceat(valid.astype(np.int64), starts) if len(starts) else []
+    peak = np.fmax.reduceat(speed, starts) if len(starts) else []
+
+    k = len(offsets) - 1
+    max_kmph = np.full(k, np.nan)
+    mean_kmph = np.full(k, np.nan)
+    max_kmph[nonempty] = peak
+    with np.errstate(invalid="ignore"):
+        mean_kmph[nonempty] = np.where(np.asarray(count) > 0,
+                                       np.asarray(total) / np.maximum(count, 1), np.nan)
+    return max_kmph, mean_kmph
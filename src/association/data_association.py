@@ -1,21 +1,166 @@
 import numpy as np
 
+# chi-square 99% quantile, 2 dof
+GATE_99 = 9.21
+
+
+def _centres(detections):
+    if isinstance(detections, np.ndarray):
+        return detections[:, :2].astype(float)
+    return np.asarray([d[:2] for d in detections], dtype=float)
+
+
 def associate_ball(detections, predicted_pos, max_dist=120):
-    if not detections:
+    if len(detections) == 0:
         return None
 
     if predicted_pos is None:
         return detections[0]
 
-    px, py = predicted_pos
-    best, best_dist = None, float("inf")
+    xy = _centres(detections)
+    dist = np.hypot(xy[:, 0] - predicted_pos[0], xy[:, 1] - predicted_pos[1])
+
+    best = int(np.argmin(dist))
+    if dist[best] >= max_dist:
+        return None
+    return detections[best]
+
+
+# ---------------- multi-track ----------------
+def mahalanobis_cost(pred_xy, pred_cov, det_xy):
+    """
+    Squared Mahalanobis distance of every detection to every track.
+
+    pred_xy:  (T, 2) predicted positions
+    pred_cov: (T, 2, 2) innovation covariances S = H P H^T + R
+    det_xy:   (D, 2) detection centres
+    Returns (T, D).
+    """
+    pred_xy = np.asarray(pred_xy, dtype=float).reshape(-1, 2)
+    S = np.asarray(pred_cov, dtype=float).reshape(-1, 2, 2)
+    det_xy = np.asarray(det_xy, dtype=float).reshape(-1, 2)
+
+    # closed-form 2x2 inverse per track
+    a, b, c, d = S[:, 0, 0], S[:, 0, 1], S[:, 1, 0], S[:, 1, 1]
+    det = a * d - b * c
+
+    dx = det_xy[None, :, 0] - pred_xy[:, None, 0]
+    dy = det_xy[None, :, 1] - pred_xy[:, None, 1]
+    return (
+        d[:, None] * dx * dx - (b + c)[:, None] * dx * dy + a[:, None] * dy * dy
+    ) / det[:, None]
+
+
+def linear_assignment(cost):
+    """
+    Minimum-cost assignment (Hungarian / shortest augmenting path),
+    vectorized over columns. Works on rectangular matrices.
+    Returns (rows, cols) index arrays of the matched pairs.
+    """
+    cost = np.asarray(cost, dtype=float)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+
+    n, m = cost.shape
+    if n == 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    p = np.zeros(m + 1, dtype=int)      # p[j]: 1-based row matched to column j
+    way = np.zeros(m + 1, dtype=int)
+
+    for i in range(1, n + 1):
+        p[0] = i
+        j0 = 0
+        minv = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+
+        while True:
+            used[j0] = True
+            i0 = p[j0]
+
+            free = ~used[1:]
+            cur = cost[i0 - 1] - u[i0] - v[1:]
+            better = free & (cur < minv[1:])
+            minv[1:][better] = cur[better]
+            way[1:][better] = j0
+
+            masked = np.where(free, minv[1:], np.inf)
+            j1 = int(np.argmin(masked)) + 1
+            delta = masked[j1 - 1]
+
+            cols = np.flatnonzero(used)
+            u[p[cols]] += delta
+            v[cols] -= delta
+            minv[1:][free] -= delta
+
+            j0 = j1
+            if p[j0] == 0:
+                break
+
+        while j0:
+            j1 = way[j0]
+            p[j0] = p[j1]
+            j0 = j1
+
+    cols = np.flatnonzero(p[1:])
+    rows = p[1:][cols] - 1
+    if transposed:
+        rows, cols = cols, rows
+
+    order = np.argsort(rows)
+    return rows[order], cols[order]
+
+
+def associate_tracks(detections, pred_xy, pred_cov, gate=GATE_99):
+    """
+    Global track × detection assignment with Mahalanobis gating.
+
+    detections: (D, >=2) array or list of (cx, cy, ...) tuples
+    pred_xy:    (T, 2) predicted track positions
+    pred_cov:   (T, 2, 2) innovation covariances (position block of P plus R)
+
+    Detections outside every track's gate are dropped before the
+    assignment is solved, so hundreds of clutter candidates cost little.
+
+    Returns (matches [(track, det), ...], unmatched_tracks, unmatched_dets).
+    """
+    T = len(pred_xy)
+    D = len(detections)
+    if T == 0 or D == 0:
+        return [], list(range(T)), list(range(D))
+
+    det_xy = _centres(detections)
+    cost = mahalanobis_cost(pred_xy, pred_cov, det_xy)
+
+    inside = cost <= gate
+    cand = np.flatnonzero(inside.any(axis=0))
+    if len(cand) == 0:
+        return [], list(range(T)), list(range(D))
 
-    for det in detections:
-        cx, cy = det[0], det[1]
-        dist = np.hypot(cx - px, cy - py)
+    # a track whose only gated detection is gated by no other track is an
+    # isolated pair: matched directly, only the contested rest is solved
+    inside = inside[:, cand]
+    alone = inside & (inside.sum(axis=1) == 1)[:, None] & (inside.sum(axis=0) == 1)[None, :]
+    rows, cols = np.nonzero(alone)
+    matches = [(int(r), int(cand[c])) for r, c in zip(rows, cols)]
 
-        if dist < best_dist and dist < max_dist:
-            best = det
-            best_dist = dist
+    rest_t = np.flatnonzero(inside.any(axis=1) & ~alone.any(axis=1))
+    rest_d = np.flatnonzero(~alone.any(axis=0))
+    if len(rest_t) and len(rest_d):
+        gated = inside[np.ix_(rest_t, rest_d)]
+        sub = np.where(gated, cost[np.ix_(rest_t, cand[rest_d])], 1e9)
+        rows, cols = linear_assignment(sub)
+        ok = gated[rows, cols]
+        matches += [(int(rest_t[r]), int(cand[rest_d[c]])) for r, c in zip(rows[ok], cols[ok])]
+        matches.sort()
 
-    return best
+    matched_t = {t for t, _ in matches}
+    matched_d = {d for _, d in matches}
+    return (
+        matches,
+        [t for t in range(T) if t not in matched_t],
+        [d for d in range(D) if d not in matched_d]
+    )
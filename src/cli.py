@@ -0,0 +1,469 @@
+"""
+Single entry point, configured from configs/{yolo,kalman,tracker}.yaml.
+
+    python -m src.cli track data/samples/test_video.mp4 --json out.json
+    python -m src.cli track data/samples/test_video.mp4 --show        # live window, no export
+    python -m src.cli track data/samples/test_video.mp4 --procs 3     # multi-process, shared memory
+    python -m src.cli batch data/raw/videos --out outputs/json --workers 4
+    python -m src.cli replay data/samples/test_video.mp4 --cache outputs/cache
+    python -m src.cli export deliveries.jsonl --json deliveries.json
+    python -m src.cli analyze out.json
+    python -m src.cli analyze outputs/json/*.json --recompute --out recomputed.json
+    python -m src.cli calibrate clip.mp4 --out outputs/calibration/main   # stumps → homography
+    python -m src.cli live rtsp://camera/stream --max-latency 0.2      # live source, drops stale frames
+
+Any config value can be overridden: --set yolo.conf=0.3 --set tracker.association=gated
+--metrics prints per-stage p50/p95/p99 latencies at exit; --metrics-out PATH dumps them.
+
+Only `track`, `batch`, `live` and `calibrate` (from stumps) load the model.
+Heavy modules are imported inside the command that needs them, so
+replay / export / analyze never touch ultralytics / torch.
+"""
+import argparse
+import json
+import sys
+
+
+# -------- commands --------
+def cmd_track(args, cfg):
+    from src.pipeline.runner import format_report
+    from src.utils.config import build_detector, motion_gate_kwargs, track_kwargs
+
+    tracker = cfg["tracker"]
+    cache = None
+    if args.cache:
+        from src.detection.cache import DetectionCache
+        cache = DetectionCache(args.cache)
+        cached = cache.load(args.video, cfg["yolo"]["model"], cfg["yolo"]["conf"])
+        if cached is not None:
+            return _replay(cached, args, cfg)
+
+    if args.show:
+        return _track_gui(args, cfg)
+    if args.procs:
+        return _track_shm(args, cfg)
+
+    from src.pipeline.offline import run_headless
+
+    gate = None
+    gate_kwargs = motion_gate_kwargs(cfg)
+    if gate_kwargs is not None:
+        from src.detection.motion_gate import MotionGate
+        gate = MotionGate(**gate_kwargs)
+
+    detector = build_detector(cfg)
+    report = run_headless(
+        args.video, detector, args.json, video_out=args.out_video,
+        queue_size=tracker["queue_size"], track_kwargs=track_kwargs(cfg),
+        guided=cfg["yolo"]["roi"]["enabled"], max_stride=tracker["max_stride"],
+        cache=cache, stream_path=args.stream, motion_gate=gate,
+        segmenter=_segmenter(cfg), writer=args.writer
+    )
+    print(format_report(report))
+    print(f"{report['video_s']:.1f}s of video → {report['realtime_x']:.2f}x real time, "
+          f"{report['deliveries']} deliveries → {args.json}")
+    if "detect_skip_ratio" in report:
+        print(f"detector skipped on {100 * report['detect_skip_ratio']:.1f}% of frames")
+    if "gate_skip_ratio" in report:
+        print(f"motion gate: no inference on {100 * report['gate_skip_ratio']:.1f}% of frames, "
+              f"detector load {100 * report['detector_load']:.1f}% of full-frame")
+    if "idle_ratio" in report:
+        print(f"idle (reduced-cost) on {100 * report['idle_ratio']:.1f}% of frames")
+    return 0
+
+
+def _track_gui(args, cfg):
+    import cv2
+
+    from src.pipeline.runner import PipelineRunner, format_report
+    from src.pipeline.stages import (
+        decode_frames, DetectStage, GuidedDetectStage, RenderStage, TrackStage
+    )
+    from src.tracking.scheduler import AdaptiveStrideScheduler
+    from src.utils.config import build_detector, track_kwargs
+    from src.utils.frame_pool import FramePool
+
+    tracker = cfg["tracker"]
+    detector = build_detector(cfg)
+    cap = cv2.VideoCapture(args.video)
+    assert cap.isOpened(), "❌ Failed to open video"
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+
+    track = TrackStage(fps=fps, **track_kwargs(cfg))
+    stride = tracker["max_stride"]
+    if cfg["yolo"]["roi"]["enabled"] or stride > 1:
+        scheduler = AdaptiveStrideScheduler(max_stride=stride) if stride > 1 else None
+        stages = [("detect+track", GuidedDetectStage(detector, track, scheduler))]
+    else:
+        stages = [("detect", DetectStage(detector)), ("track", track)]
+
+    render = RenderStage(fps=fps)
+    runner = PipelineRunner(
+        source=("decode", decode_frames(cap, fps, FramePool.for_capture(cap))),
+        stages=stages,
+        sink=("render", render),
+        queue_size=tracker["queue_size"]
+    )
+    try:
+        report = runner.run()
+    finally:
+        cap.release()
+        render.close()
+
+    print(format_report(report))
+    return 0
+
+
+def _track_shm(args, cfg):
+    import functools
+    from src.detection.yolo_detector import YoloBallDetector
+    from src.pipeline.shm_ring import run_shm
+    from src.utils.config import detector_kwargs, track_kwargs
+
+    # frames reach the detectors out of order: no search window
+    kwargs = dict(detector_kwargs(cfg), roi_mode=False)
+    report = run_shm(
+        args.video, functools.partial(YoloBallDetector, cfg["yolo"]["model"], **kwargs),
+        args.json, workers=args.procs, threads_per_worker=args.threads,
+        video_out=args.out_video, track_kwargs=track_kwargs(cfg),
+        stream_path=args.stream, segmenter=_segmenter(cfg)
+    )
+    print(f"{report['frames']} frames in {report['wall_s']:.2f}s → {report['fps']:.1f} FPS "
+          f"({report['workers']} detector processes, {report['slots']} ring slots)")
+    print(f"{report['video_s']:.1f}s of video → {report['realtime_x']:.2f}x real time, "
+          f"{report['deliveries']} deliveries → {args.json}")
+    return 0
+
+
+def _segmenter(cfg):
+    from src.utils.config import segmenter_kwargs
+
+    kwargs = segmenter_kwargs(cfg)
+    if kwargs is None:
+        return None
+    from src.tracking.segmenter import DeliverySegmenter
+    return DeliverySegmenter(**kwargs)
+
+
+def cmd_batch(args, cfg):
+    from src.pipeline.batch import run_batch
+    from src.utils.config import (
+        detector_kwargs, motion_gate_kwargs, segmenter_kwargs, track_kwargs
+    )
+
+    def on_done(entry):
+        if entry["status"] == "ok":
+            print(f"✅ {entry['video']}  {entry['wall_s']:.1f}s "
+                  f"({entry['realtime_x']:.2f}x real time, {entry['deliveries']} deliveries)")
+        else:
+            print(f"❌ {entry['video']}  {entry['error']}")
+
+    manifest = run_batch(
+        args.source, args.out, cfg["yolo"]["model"],
+        workers=args.workers, threads_per_worker=args.threads,
+        conf=cfg["yolo"]["conf"], write_videos=args.videos,
+        guided=cfg["yolo"]["roi"]["enabled"], max_stride=cfg["tracker"]["max_stride"],
+        detector_kwargs=detector_kwargs(cfg), track_kwargs=track_kwargs(cfg),
+        motion_gate=motion_gate_kwargs(cfg), segmenter=segmenter_kwargs(cfg),
+        on_done=on_done
+    )
+    print(f"{manifest['num_videos']} videos, {manifest['num_failed']} failed, "
+          f"{manifest['total_wall_s']:.1f}s with {manifest['workers']} workers "
+          f"→ {args.out}/manifest.json")
+    return 1 if manifest["num_failed"] else 0
+
+
+def cmd_replay(args, cfg):
+    from src.detection.cache import DetectionCache
+
+    cached = DetectionCache(args.cache).load(
+        args.video, cfg["yolo"]["model"], cfg["yolo"]["conf"]
+    )
+    if cached is None:
+        print(f"❌ No cached detections for {args.video} at conf {cfg['yolo']['conf']}")
+        return 1
+    return _replay(cached, args, cfg)
+
+
+def _replay(cached, args, cfg):
+    from src.pipeline.offline import replay_cached
+    from src.utils.config import track_kwargs
+
+    report = replay_cached(
+        cached, args.json, track_kwargs=track_kwargs(cfg),
+        stream_path=getattr(args, "stream", None), segmenter=_segmenter(cfg),
+        ball_class_id=cfg["yolo"]["ball_class_id"]
+    )
+    print(f"replayed {report['frames']} frames from {cached.path} "
+          f"in {report['wall_s']:.2f}s ({report['realtime_x']:.0f}x real time), "
+          f"{report['deliveries']} deliveries → {args.json}")
+    return 0
+
+
+def cmd_export(args, cfg):
+    from src.export.delivery_stream import iter_deliveries, read_header
+    from src.utils.json_exporter import write_json
+
+    header = read_header(args.stream)
+    header = {k: header[k] for k in ("video_id", "fps", "pitch_length_meters", "frame_height")
+              if k in header}
+    write_json(args.json, header, iter_deliveries(args.stream), indent=args.indent)
+    print(f"✅ {args.stream} → {args.json}")
+    return 0
+
+
+def _load_deliveries(path):
+    if path.endswith(".jsonl"):
+        from src.export.delivery_stream import iter_deliveries
+        return iter_deliveries(path)
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return data
+    if "deliveries" not in data:
+        raise SystemExit(f"❌ {path} is not a delivery export (no 'deliveries' key)")
+    return data["deliveries"]
+
+
+def cmd_calibrate(args, cfg):
+    import cv2
+    import numpy as np
+
+    from src.utils.geometry import PitchCalibration, stump_boxes
+
+    cap = cv2.VideoCapture(args.video)
+    assert cap.isOpened(), f"❌ Cannot open video: {args.video}"
+    size = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    if args.points:
+        cap.release()
+        with open(args.points) as f:
+            calib = PitchCalibration.from_points(json.load(f), size)
+    else:
+        from src.utils.config import build_detector
+
+        # stumps are static: a spread of frames is enough
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        detector = build_detector(cfg)
+        raw = []
+        for index in np.linspace(0, max(total - 1, 0), args.frames).astype(int):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+            ok, frame = cap.read()
+            if ok:
+                raw.append(detector.detect_raw(frame))
+        cap.release()
+        striker, bowler = stump_boxes(raw, args.stump_class, args.striker)
+        calib = PitchCalibration.from_stumps(striker, bowler, size)
+
+    calib.save(args.out)
+    rows = calib.rows
+    print(f"✅ {args.out}: {size[0]}x{size[1]}, metres/pixel "
+          f"{rows[0]:.4f} (top) … {rows[-1]:.4f} (bottom)")
+    print(f"   set tracker.calibration={args.out} to use it")
+    return 0
+
+
+def _recompute(args, cfg):
+    import time
+
+    from src.analytics.archive import analyze, load_archive, to_records
+    from src.utils.geometry import PitchCalibration
+
+    tracker = cfg["tracker"]
+    seg = tracker.get("segmenter", {})
+    calib_dir = args.calibration or tracker["calibration"]
+    t0 = time.perf_counter()
+    calibration = PitchCalibration.load(calib_dir) if calib_dir else None
+    try:
+        archive = load_archive(args.paths, fps=args.fps, frame_height=args.frame_height)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    results = analyze(
+        archive, meters_per_pixel=tracker["meters_per_pixel"],
+        perspective_gain=tracker["perspective_gain"],
+        release_kmph=seg.get("release_kmph", 30.0), release_hits=seg.get("release_hits", 3),
+        calibration=calibration
+    )
+    records = to_records(results)
+    elapsed = time.perf_counter() - t0
+
+    released = [r["release_kmph"] for r in records if r["release_kmph"] is not None]
+    pitches = {}
+    for r in records:
+        pitches[r["pitch"]] = pitches.get(r["pitch"], 0) + 1
+
+    print(f"{len(records)} deliveries ({len(archive['x'])} points) "
+          f"recomputed in {elapsed * 1000:.1f} ms")
+    if released:
+        print(f"release speed: avg {sum(released) / len(released):.1f} km/h, "
+              f"max {max(released):.1f} km/h")
+    for pitch, n in sorted(pitches.items(), key=lambda kv: -kv[1]):
+        print(f"  {pitch}: {n}")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(records, f, indent=4)
+        print(f"✅ {args.out}")
+    return 0
+
+
+def cmd_analyze(args, cfg):
+    if args.recompute:
+        return _recompute(args, cfg)
+    assert len(args.paths) == 1, "❌ Several files need --recompute"
+    args.path = args.paths[0]
+
+    count = 0
+    speeds = []
+    pitches = {}
+    for d in _load_deliveries(args.path):
+        count += 1
+        speed = d.get("speed", {}).get("release_kmph", d.get("release_speed_kmph"))
+        if speed is not None:
+            speeds.append(speed)
+        pitch = d.get("pitch", {}).get("type", d.get("pitch_type"))
+        pitches[pitch] = pitches.get(pitch, 0) + 1
+
+    print(f"{count} deliveries in {args.path}")
+    if speeds:
+        print(f"release speed: avg {sum(speeds) / len(speeds):.1f} km/h, "
+              f"max {max(speeds):.1f} km/h")
+    for pitch, n in sorted(pitches.items(), key=lambda kv: -kv[1]):
+        print(f"  {pitch}: {n}")
+    return 0
+
+
+def cmd_live(args, cfg):
+    from src.pipeline.live import StreamStats, track_stream
+    from src.utils.config import build_detector, track_kwargs
+
+    detector = build_detector(cfg)
+    source = int(args.source) if args.source.isdigit() else args.source
+    stats = StreamStats()
+    stream = track_stream(
+        source, detector, realtime=args.realtime, max_latency=args.max_latency,
+        track_kwargs=track_kwargs(cfg), segmenter=_segmenter(cfg), stats=stats
+    )
+    try:
+        for result in stream:
+            for event in result["events"]:
+                print(f"[{result['timestamp']:8.2f}s] {event:<8} "
+                      f"{result['speed']:6.1f} km/h  latency {result['latency_ms']:.0f} ms")
+            if args.limit and stats.processed >= args.limit:
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stream.close()
+
+    report = stats.as_dict()
+    latency = report["latency"]
+    print(f"{report['processed']}/{report['grabbed']} frames processed at {report['fps']} fps, "
+          f"{100 * report['drop_ratio']:.1f}% dropped")
+    if latency["count"]:
+        print(f"glass-to-result latency p50 {latency['p50_ms']} ms, "
+              f"p95 {latency['p95_ms']} ms, p99 {latency['p99_ms']} ms")
+    return 0
+
+
+# -------- parser --------
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m src.cli")
+    parser.add_argument("--config-dir", default="configs")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a config value, e.g. yolo.conf=0.3")
+    parser.add_argument("--metrics", action="store_true",
+                        help="print per-stage latency histograms at exit")
+    parser.add_argument("--metrics-out", default=None,
+                        help="also dump the metrics summary as JSON")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("track", help="tracking of one video (headless unless --show)")
+    p.add_argument("video")
+    p.add_argument("--show", action="store_true",
+                   help="display the overlay in a window instead of exporting")
+    p.add_argument("--json", default="ball_tracking.json")
+    p.add_argument("--out-video", default=None)
+    p.add_argument("--writer", default="process", choices=("process", "ffmpeg", "inline"),
+                   help="annotated-video encoder (child process by default)")
+    p.add_argument("--stream", default=None, help="append-only .jsonl delivery log")
+    p.add_argument("--cache", default=None,
+                   help="detection cache directory; replays on a hit")
+    p.add_argument("--procs", type=int, default=0,
+                   help="decoder + N detector processes sharing frames through shared memory")
+    p.add_argument("--threads", type=int, default=1, help="threads per detector process")
+    p.set_defaults(func=cmd_track)
+
+    p = sub.add_parser("batch", help="process a directory of videos in parallel")
+    p.add_argument("source")
+    p.add_argument("--out", default="outputs/json")
+    p.add_argument("--workers", type=int, default=None)
+    p.add_argument("--threads", type=int, default=1)
+    p.add_argument("--videos", action="store_true", help="also write annotated MP4s")
+    p.set_defaults(func=cmd_batch)
+
+    p = sub.add_parser("replay", help="re-run tracking from cached detections (no model)")
+    p.add_argument("video")
+    p.add_argument("--cache", default="outputs/cache")
+    p.add_argument("--json", default="ball_tracking.json")
+    p.add_argument("--stream", default=None)
+    p.set_defaults(func=cmd_replay)
+
+    p = sub.add_parser("export", help="convert a .jsonl delivery stream to JSON")
+    p.add_argument("stream")
+    p.add_argument("--json", default="ball_tracking.json")
+    p.add_argument("--indent", type=int, default=4)
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("analyze", help="summarise a delivery .json / .jsonl")
+    p.add_argument("paths", nargs="+", metavar="path")
+    p.add_argument("--recompute", action="store_true",
+                   help="re-derive speed / release / bounce / pitch from the stored "
+                        "trajectories (.json / .jsonl / .npz), no video needed")
+    p.add_argument("--fps", type=float, default=None,
+                   help="for files that do not record it (.npz, old exports)")
+    p.add_argument("--frame-height", type=int, default=None,
+                   help="for files that do not record it (perspective scale, pitch class)")
+    p.add_argument("--out", default=None, help="write the recomputed records as JSON")
+    p.add_argument("--calibration", default=None,
+                   help="PitchCalibration directory (default: tracker.calibration)")
+    p.set_defaults(func=cmd_analyze)
+
+    p = sub.add_parser("calibrate",
+                       help="fit the pixel → pitch homography of a camera angle")
+    p.add_argument("video", help="a clip from the camera (frame size, stump detection)")
+    p.add_argument("--out", required=True, help="calibration directory to write")
+    p.add_argument("--points", default=None,
+                   help="JSON {landmark: [x, y]} of clicked points instead of the stumps")
+    p.add_argument("--frames", type=int, default=30, help="frames sampled for stumps")
+    p.add_argument("--stump-class", type=int, default=1)
+    p.add_argument("--striker", default="bottom", choices=("bottom", "top"),
+                   help="image end the batter is at")
+    p.set_defaults(func=cmd_calibrate)
+
+    p = sub.add_parser("live", help="track a camera / RTSP stream, dropping stale frames")
+    p.add_argument("source", help="camera index, stream URL or video file")
+    p.add_argument("--max-latency", type=float, default=None,
+                   help="seconds; older frames are skipped instead of processed")
+    p.add_argument("--realtime", action=argparse.BooleanOptionalAction, default=None,
+                   help="replay at the native frame rate (default: on for files)")
+    p.add_argument("--limit", type=int, default=0, help="stop after N processed frames")
+    p.set_defaults(func=cmd_live)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.metrics or args.metrics_out:
+        from src.utils.metrics import enable_at_exit
+        enable_at_exit(args.metrics_out)
+
+    from src.utils.config import load_config
+    cfg = load_config(args.config_dir, args.set)
+    return args.func(args, cfg)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+"""
+Inference backends for YoloBallDetector.
+
+Every backend maps BGR frames to raw boxes in frame coordinates:
+
+    backend.predict(frame, conf, imgsz=None) -> (xyxy (N, 4), cls (N,), conf (N,))
+    backend.predict_batch(frames, conf)       -> [(xyxy, cls, conf), ...]
+
+- "ultralytics": the .pt model through ultralytics.YOLO (PyTorch)
+- "onnx":        exported .onnx through ONNX Runtime (CPU), own letterbox + NMS
+- "openvino":    .onnx / .xml through OpenVINO, same pre / post-processing
+
+Runtimes are imported only when a backend is built.
+"""
+import abc
+import os
+
+import cv2
+import numpy as np
+
+
+def _empty_raw():
+    return np.zeros((0, 4), np.float32), np.zeros(0, np.int16), np.zeros(0, np.float32)
+
+
+# ---------------- pre-processing ----------------
+def letterbox(frame, imgsz=640, stride=32, pad_value=114):
+    """
+    Resize keeping aspect ratio and pad to a `stride`-multiple square
+    of side `imgsz`, then BGR→RGB, HWC→NCHW and /255 in a single
+    blobFromImage pass. Returns (blob (1, 3, S, S) float32, scale, (pad_x, pad_y)).
+    """
+    h, w = frame.shape[:2]
+    side = int(np.ceil(imgsz / stride) * stride)
+    scale = min(side / h, side / w)
+
+    nw, nh = int(round(w * scale)), int(round(h * scale))
+    pad_x, pad_y = (side - nw) // 2, (side - nh) // 2
+
+    img = frame
+    if (nw, nh) != (w, h):
+        img = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+    img = cv2.copyMakeBorder(
+        img, pad_y, side - nh - pad_y, pad_x, side - nw - pad_x,
+        cv2.BORDER_CONSTANT, value=(pad_value,) * 3
+    )
+
+    blob = cv2.dnn.blobFromImage(img, 1 / 255.0, swapRB=True)
+    return blob, scale, (pad_x, pad_y)
+
+
+class Letterboxer:
+    """
+    letterbox() into reused buffers: the frame is resized straight into
+    the interior of a padded canvas (the border is only repainted when
+    the geometry changes), then BGR→RGB, HWC→CHW and /255 happen in one
+    numpy pass into a preallocated float32 blob. Same output as
+    letterbox(); nothing is allocated per frame.
+
+    The returned blob is overwritten by the next call.
+    """
+
+    _INV255 = np.float32(1 / 255.0)
+
+    def __init__(self, stride=32, pad_value=114):
+        self.stride = stride
+        self.pad_value = pad_value
+        self._buffers = {}      # side -> (canvas, blob, geometry)
+
+    def __call__(self, frame, imgsz=640):
+        h, w = frame.shape[:2]
+        side = int(np.ceil(imgsz / self.stride) * self.stride)
+        scale = min(side / h, side / w)
+        nw, nh = int(round(w * scale)), int(round(h * scale))
+        pad_x, pad_y = (side - nw) // 2, (side - nh) // 2
+
+        if side not in self._buffers:
+            self._buffers[side] = [
+                np.empty((side, side, 3), np.uint8),
+                np.empty((1, 3, side, side), np.float32),
+                None
+            ]
+        buffers = self._buffers[side]
+        canvas, blob, geometry = buffers
+
+        if geometry != (nw, nh):
+            canvas[:] = self.pad_value
+            buffers[2] = (nw, nh)
+
+        inner = canvas[pad_y:pad_y + nh, pad_x:pad_x + nw]
+        if (nw, nh) != (w, h):
+            cv2.resize(frame, (nw, nh), dst=inner, interpolation=cv2.INTER_LINEAR)
+        else:
+            inner[:] = frame
+
+        np.multiply(canvas.transpose(2, 0, 1)[::-1], self._INV255, out=blob[0])
+        return blob, scale, (pad_x, pad_y)
+
+
+# ---------------- post-processing ----------------
+def nms(boxes, scores, iou=0.45):
+    """Greedy NMS, IoU of the kept box against all remaining at once."""
+    if len(boxes) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = np.argsort(-scores, kind="stable")
+
+    keep = []
+    while len(order):
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+
+        w = (np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest])).clip(0)
+        h = (np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest])).clip(0)
+        inter = w * h
+        overlap = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[overlap <= iou]
+
+    return np.asarray(keep, dtype=np.int64)
+
+
+def decode_yolo(output, conf, scale, pad, iou=0.45, max_det=300):
+    """
+    YOLOv8 head output (1, 4 + num_classes, N) — cx, cy, w, h in
+    letterbox pixels, then per-class scores — to raw boxes in frame
+    coordinates. Class-aware NMS via the per-class offset trick.
+    """
+    pred = output[0]
+    scores = pred[4:]
+    cls = scores.argmax(axis=0)
+    best = scores[cls, np.arange(scores.shape[1])]
+
+    keep = best >= conf
+    if not keep.any():
+        return _empty_raw()
+
+    cx, cy, w, h = pred[:4, keep]
+    cls = cls[keep]
+    best = best[keep]
+
+    xyxy = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    offset = cls[:, None].astype(np.float32) * 4096.0
+    idx = nms(xyxy + offset, best, iou)[:max_det]
+
+    xyxy = xyxy[idx]
+    xyxy[:, [0, 2]] -= pad[0]
+    xyxy[:, [1, 3]] -= pad[1]
+    xyxy /= scale
+    return xyxy.astype(np.float32), cls[idx].astype(np.int16), best[idx].astype(np.float32)
+
+
+# ---------------- backends ----------------
+class UltralyticsBackend:
+    name = "ultralytics"
+
+    def __init__(self, model_path):
+        from ultralytics import YOLO
+        self.model = YOLO(model_path)
+
+    @staticmethod
+    def _raw(results):
+        if results.boxes is None or len(results.boxes) == 0:
+            return _empty_raw()
+
+        return (
+            results.boxes.xyxy.cpu().numpy().astype(np.float32),
+            results.boxes.cls.cpu().numpy().astype(np.int16),
+            results.boxes.conf.cpu().numpy().astype(np.float32)
+        )
+
+    def predict(self, frame, conf, imgsz=None):
+        kwargs = {"imgsz": imgsz} if imgsz else {}
+        return self._raw(self.model(frame, conf=conf, verbose=False, **kwargs)[0])
+
+    def predict_batch(self, frames, conf):
+        return [self._raw(r) for r in self.model(list(frames), conf=conf, verbose=False)]
+
+
+class _LetterboxBackend(abc.ABC):
+    """Shared letterbox → run → decode path for the exported-model runtimes."""
+
+    def __init__(self, imgsz=640, iou=0.45):
+        self.imgsz = imgsz
+        self.iou = iou
+        self.dynamic = False
+        self.letterbox = Letterboxer()
+
+    @abc.abstractmethod
+    def _run(self, blob):
+        """Raw (B, 4 + nc, anchors) model output for a letterboxed blob."""
+
+    def predict(self, frame, conf, imgsz=None):
+        size = imgsz if (imgsz and self.dynamic) else self.imgsz
+        blob, scale, pad = self.letterbox(frame, size)
+        return decode_yolo(self._run(blob), conf, scale, pad, self.iou)
+
+    def predict_batch(self, frames, conf):
+        if not self.dynamic:
+            return [self.predict(f, conf) for f in frames]
+
+        boxes = [letterbox(f, self.imgsz) for f in frames]
+        out = self._run(np.concatenate([b[0] for b in boxes]))
+        return [
+            decode_yolo(out[i:i + 1], conf, scale, pad, self.iou)
+            for i, (_, scale, pad) in enumerate(boxes)
+        ]
+
+
+class OnnxBackend(_LetterboxBackend):
+    name = "onnx"
+
+    def __init__(self, model_path, imgsz=640, iou=0.45, threads=None):
+        import onnxruntime as ort
+        super().__init__(imgsz, iou)
+
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            opts.intra_op_num_threads = threads
+
+        self.session = ort.InferenceSession(
+            model_path, sess_options=opts, providers=["CPUExecutionProvider"]
+        )
+        inp = self.session.get_inputs()[0]
+        self.input_name = inp.name
+
+        # fixed-shape exports dictate the input size
+        if isinstance(inp.shape[2], int):
+            self.imgsz = inp.shape[2]
+        else:
+            self.dynamic = True
+
+    def _run(self, blob):
+        return self.session.run(None, {self.input_name: blob})[0]
+
+
+class OpenVinoBackend(_LetterboxBackend):
+    name = "openvino"
+
+    def __init__(self, model_path, imgsz=640, iou=0.45, threads=None):
+        import openvino as ov
+        super().__init__(imgsz, iou)
+
+        core = ov.Core()
+        model = core.read_model(model_path)
+        shape = model.inputs[0].get_partial_shape()
+        if shape[2].is_static:
+            self.imgsz = shape[2].get_length()
+        else:
+            self.dynamic = True
+
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if threads:
+            config["INFERENCE_NUM_THREADS"] = threads
+        self.compiled = core.compile_model(model, "CPU", config)
+        self.output = self.compiled.outputs[0]
+
+    def _run(self, blob):
+        return self.compiled(blob)[self.output]
+
+
+BACKENDS = {
+    "ultralytics": UltralyticsBackend,
+    "onnx": OnnxBackend,
+    "openvino": OpenVinoBackend,
+}
+
+
+def make_backend(model_path, backend="auto", **kwargs):
+    """
+    backend="auto" picks by extension: .pt → ultralytics,
+    .onnx → onnx, .xml (OpenVINO IR) → openvino.
+    `kwargs` (imgsz, iou, threads) go to the exported-model backends.
+    """
+    if backend == "auto":
+        ext = os.path.splitext(model_path)[1].lower()
+        backend = {".onnx": "onnx", ".xml": "openvino"}.get(ext, "ultralytics")
+
+    assert backend in BACKENDS, f"❌ Unknown backend: {backend}"
+    if backend == "ultralytics":
+        return UltralyticsBackend(model_path)
+    return BACKENDS[backend](model_path, **kwargs)
+
+
+# ---------------- export / quantize ----------------
+def export_onnx(model_path, imgsz=640, dynamic=False):
+    """Export a .pt to .onnx next to it (via ultralytics); returns the path."""
+    from ultralytics import YOLO
+    return YOLO(model_path).export(format="onnx", imgsz=imgsz, dynamic=dynamic, simplify=True)
+
+
+def quantize_int8(onnx_path, out_path, frames, imgsz=640):
+    """
+    Static INT8 quantization with ONNX Runtime, calibrated on `frames`
+    (a few hundred real match frames, letterboxed like at inference).
+    """
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    )
+
+    class _Reader(CalibrationDataReader):
+        def __init__(self):
+            import onnxruntime as ort
+            name = ort.InferenceSession(
+                onnx_path, providers=["CPUExecutionProvider"]
+            ).get_inputs()[0].name
+            self._it = ({name: letterbox(f, imgsz)[0]} for f in frames)
+
+        def get_next(self):
+            return next(self._it, None)
+
+    quantize_static(
+        onnx_path, out_path, _Reader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True
+    )
+    return out_path
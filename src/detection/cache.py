@@ -0,0 +1,201 @@
+import glob
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from src.detection.yolo_detector import BallBoxFilter, in_region, to_tuples
+
+
+def file_digest(path, chunk=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(chunk)
+            if not block:
+                break
+            h.update(block)
+    return h.hexdigest()
+
+
+class DetectionCache:
+    """
+    On-disk cache of raw per-frame YOLO boxes.
+
+    Layout: <root>/<video sha256[:16]>/<weights sha256[:16]>/conf_<conf>.npz
+
+    A cache recorded at a low confidence threshold holds every box a
+    higher threshold would return, so `find` serves a request from the
+    highest recorded threshold that is still <= the requested one.
+    """
+
+    def __init__(self, root="outputs/cache"):
+        self.root = root
+        self._index_path = os.path.join(root, "digests.json")
+        self._index = None
+
+    # ---------------- keys ----------------
+    def digest(self, path):
+        """sha256 of a file, memoised on (abs path, size, mtime)."""
+        if self._index is None:
+            self._index = {}
+            if os.path.exists(self._index_path):
+                with open(self._index_path) as f:
+                    self._index = json.load(f)
+
+        st = os.stat(path)
+        key = f"{os.path.abspath(path)}|{st.st_size}|{st.st_mtime_ns}"
+        if key not in self._index:
+            self._index[key] = file_digest(path)
+            os.makedirs(self.root, exist_ok=True)
+            with open(self._index_path, "w") as f:
+                json.dump(self._index, f, indent=1)
+        return self._index[key]
+
+    def _dir(self, video_path, weights_path):
+        return os.path.join(
+            self.root,
+            self.digest(video_path)[:16],
+            self.digest(weights_path)[:16]
+        )
+
+    @staticmethod
+    def _conf_name(conf):
+        return f"conf_{conf:.4f}.npz"
+
+    # ---------------- lookup ----------------
+    def find(self, video_path, weights_path, conf):
+        """Path of the best cache able to serve `conf`, or None."""
+        best, best_conf = None, -1.0
+        for path in glob.glob(os.path.join(self._dir(video_path, weights_path), "conf_*.npz")):
+            c = float(os.path.basename(path)[5:-4])
+            if best_conf < c <= conf + 1e-9:
+                best, best_conf = path, c
+        return best
+
+    def load(self, video_path, weights_path, conf):
+        path = self.find(video_path, weights_path, conf)
+        return CachedDetections(path, conf) if path else None
+
+    def writer(self, video_path, weights_path, conf, **meta):
+        path = os.path.join(self._dir(video_path, weights_path), self._conf_name(conf))
+        meta.update({
+            "video": os.path.abspath(video_path),
+            "weights": os.path.abspath(weights_path),
+            "conf": conf
+        })
+        return CacheWriter(path, meta)
+
+
+class CacheWriter:
+    """Collects raw boxes frame by frame, writes one .npz on close()."""
+
+    def __init__(self, path, meta):
+        self.path = path
+        self.meta = meta
+        self._frames = {}       # frame index → (xyxy, cls, conf)
+
+    def append(self, frame_index, xyxy, cls, conf):
+        self._frames[frame_index] = (xyxy, cls, conf)
+
+    def close(self):
+        n = max(self._frames) + 1 if self._frames else 0
+
+        # counts[i] = boxes in frame i, -1 = frame never ran through the model
+        counts = np.full(n, -1, dtype=np.int32)
+        xyxy, cls, conf = [], [], []
+        for i in range(n):
+            if i not in self._frames:
+                continue
+            b, c, s = self._frames[i]
+            counts[i] = len(b)
+            xyxy.append(np.asarray(b, np.float32).reshape(-1, 4))
+            cls.append(np.asarray(c, np.int16).reshape(-1))
+            conf.append(np.asarray(s, np.float32).reshape(-1))
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp = self.path + ".tmp.npz"
+        np.savez_compressed(
+            tmp,
+            counts=counts,
+            xyxy=np.concatenate(xyxy) if xyxy else np.zeros((0, 4), np.float32),
+            cls=np.concatenate(cls) if cls else np.zeros(0, np.int16),
+            conf=np.concatenate(conf) if conf else np.zeros(0, np.float32),
+            meta=np.array(json.dumps(self.meta))
+        )
+        os.replace(tmp, self.path)
+        return self.path
+
+
+class CachedDetections:
+    """Raw boxes of one cached run, re-thresholded at `conf`."""
+
+    def __init__(self, path, conf):
+        data = np.load(path)
+        self.path = path
+        self.conf = conf
+        self.meta = json.loads(str(data["meta"]))
+
+        self.counts = data["counts"]
+        self.offsets = np.zeros(len(self.counts) + 1, dtype=np.int64)
+        np.cumsum(np.maximum(self.counts, 0), out=self.offsets[1:])
+
+        keep = data["conf"] >= conf
+        self._xyxy = data["xyxy"]
+        self._cls = data["cls"]
+        self._conf = data["conf"]
+        self._keep = keep
+
+    def __len__(self):
+        return len(self.counts)
+
+    def raw(self, frame_index):
+        if frame_index >= len(self.counts) or self.counts[frame_index] < 0:
+            raise LookupError(f"frame {frame_index} is not in {self.path}")
+
+        a, b = self.offsets[frame_index], self.offsets[frame_index + 1]
+        keep = self._keep[a:b]
+        return self._xyxy[a:b][keep], self._cls[a:b][keep], self._conf[a:b][keep]
+
+
+# ---------------- detectors ----------------
+class RecordingDetector:
+    """
+    Wraps YoloBallDetector and records every frame's raw boxes.
+    Always runs full-frame inference so the cache is complete; region
+    requests (motion gate) are answered from that frame's full result.
+    """
+
+    def __init__(self, detector, writer):
+        self.detector = detector
+        self.writer = writer
+        self._last = (None, None)       # (frame_index, raw boxes)
+
+    def _raw(self, frame, frame_index):
+        if frame_index is None or self._last[0] != frame_index:
+            raw = self.detector.detect_raw(frame)
+            self.writer.append(frame_index, *raw)
+            self._last = (frame_index, raw)
+        return self._last[1]
+
+    def detect(self, frame, *args, frame_index=None, **kwargs):
+        return to_tuples(self.detector.filter_boxes(*self._raw(frame, frame_index)))
+
+    def detect_region(self, frame, roi, frame_index=None):
+        return in_region(self.detector.filter_boxes(*self._raw(frame, frame_index)), roi)
+
+
+class CachedDetector(BallBoxFilter):
+    """Drop-in detector that replays cached boxes; never loads the model."""
+
+    def __init__(self, cached, conf=None, ball_class_id=0):
+        super().__init__(conf=cached.conf if conf is None else conf,
+                         ball_class_id=ball_class_id)
+        self.cached = cached
+
+    def detect(self, frame=None, *args, frame_index=None, **kwargs):
+        return to_tuples(self.filter_boxes(*self.cached.raw(frame_index)))
+
+    def detect_region(self, frame, roi, frame_index=None):
+        return in_region(self.filter_boxes(*self.cached.raw(frame_index)), roi)
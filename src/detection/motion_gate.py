@@ -0,0 +1,204 @@
+import math
+
+import cv2
+import numpy as np
+
+from src.detection.yolo_detector import to_tuples
+from src.utils.metrics import metrics
+
+SKIP = "skip"          # nothing small and moving: no inference
+REGIONS = "regions"    # crops around the moving blobs only
+FULL = "full"          # too many blobs / warm-up: whole frame
+GLOBAL = "global"      # camera cut or pan: most pixels changed
+
+
+class MotionGate:
+    """
+    Cheap pre-detector check on a downscaled grayscale frame.
+
+    Two-frame-back differencing (min of |f_t - f_t-1| and |f_t - f_t-2|)
+    keeps only pixels that differ from *both* previous frames, i.e. where
+    something is now that was not there before. Connected blobs of
+    ball-like size become candidate regions; big blobs (players,
+    umpires) and sub-threshold noise are ignored.
+    """
+
+    def __init__(self, width=320, diff_threshold=15, min_area=1, max_area_frac=0.002,
+                 max_changed=0.05, max_regions=4, pad=24, roi_min=128, roi_max=640,
+                 on_global=SKIP, log_path=None):
+        self.width = width
+        self.diff_threshold = diff_threshold
+        self.min_area = min_area
+        self.max_area_frac = max_area_frac
+        self.max_changed = max_changed        # changed-pixel fraction of a cut / pan
+        self.max_regions = max_regions
+        self.pad = pad                        # full-res px around a blob
+        self.roi_min = roi_min
+        self.roi_max = roi_max
+        self.on_global = on_global            # SKIP or FULL
+
+        self._p1 = None
+        self._p2 = None
+        self.stats = dict.fromkeys((SKIP, REGIONS, FULL, GLOBAL), 0)
+
+        # per-frame decision log for tuning: frame,decision,blobs,changed
+        self._log = open(log_path, "w", buffering=1 << 16) if log_path else None
+        if self._log:
+            self._log.write("frame,decision,blobs,changed\n")
+
+    # ------------------------------------
+    def _small_gray(self, frame):
+        h, w = frame.shape[:2]
+        scale = min(1.0, self.width / w)
+        small = frame
+        if scale < 1.0:
+            small = cv2.resize(frame, (self.width, max(1, round(h * scale))),
+                               interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY), scale
+
+    def _square(self, x0, y0, x1, y1, frame_w, frame_h):
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        side = max(self.roi_min, x1 - x0 + 2 * self.pad, y1 - y0 + 2 * self.pad)
+        side = int(math.ceil(side / 32) * 32)
+        sx, sy = min(side, frame_w), min(side, frame_h)
+        rx = int(min(max(cx - sx // 2, 0), frame_w - sx))
+        ry = int(min(max(cy - sy // 2, 0), frame_h - sy))
+        return [rx, ry, rx + sx, ry + sy]
+
+    def _merge(self, regions, frame_w, frame_h):
+        merged = True
+        while merged and len(regions) > 1:
+            merged = False
+            for i in range(len(regions)):
+                for j in range(i + 1, len(regions)):
+                    a, b = regions[i], regions[j]
+                    if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                        box = (min(a[0], b[0]), min(a[1], b[1]),
+                               max(a[2], b[2]), max(a[3], b[3]))
+                        regions[i] = self._square(*box, frame_w, frame_h)
+                        del regions[j]
+                        merged = True
+                        break
+                if merged:
+                    break
+        return regions
+
+    def check(self, frame, frame_index=None):
+        """
+        Returns (decision, regions): regions is a list of full-frame
+        (x0, y0, x1, y1) crops for REGIONS, otherwise None.
+        """
+        gray, scale = self._small_gray(frame)
+        p1, p2 = self._p1, self._p2
+        self._p2, self._p1 = p1, gray
+
+        blobs = 0
+        changed = 0.0
+        regions = None
+        if p2 is None or p2.shape != gray.shape:
+            decision = FULL
+        else:
+            motion = cv2.min(cv2.absdiff(gray, p1), cv2.absdiff(gray, p2))
+            _, mask = cv2.threshold(motion, self.diff_threshold, 255, cv2.THRESH_BINARY)
+            changed = cv2.countNonZero(mask) / mask.size
+
+            if changed > self.max_changed:
+                decision = self.on_global if self.on_global == FULL else GLOBAL
+            else:
+                _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+                area = stats[1:, cv2.CC_STAT_AREA]
+                max_area = max(self.min_area, self.max_area_frac * mask.size)
+                small = stats[1:][(area >= self.min_area) & (area <= max_area)]
+                blobs = len(small)
+
+                if blobs == 0:
+                    decision = SKIP
+                elif blobs > self.max_regions:
+                    decision = FULL
+                else:
+                    decision, regions = REGIONS, self._regions(small, scale, frame.shape)
+                    if regions is None:
+                        decision = FULL
+
+        self.stats[decision] += 1
+        metrics.count("gate_" + decision)
+        if self._log:
+            self._log.write(f"{frame_index},{decision},{blobs},{changed:.5f}\n")
+        return decision, regions
+
+    def _regions(self, stats, scale, shape):
+        h, w = shape[:2]
+        inv = 1.0 / scale
+        regions = []
+        for x, y, bw, bh, _ in stats:
+            regions.append(self._square(
+                x * inv, y * inv, (x + bw) * inv, (y + bh) * inv, w, h
+            ))
+        regions = self._merge(regions, w, h)
+        if any(r[2] - r[0] > self.roi_max or r[3] - r[1] > self.roi_max for r in regions):
+            return None
+        return [tuple(r) for r in regions]
+
+    # ------------------------------------
+    def frames(self):
+        return sum(self.stats.values())
+
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+
+
+class MotionGatedDetector:
+    """
+    Wraps YoloBallDetector. While a track is live (a prediction is
+    passed in) every frame goes to the detector as before; otherwise
+    the MotionGate decides whether to skip, crop or run full-frame.
+    """
+
+    def __init__(self, detector, gate):
+        self.detector = detector
+        self.gate = gate
+        self.model_path = detector.model_path
+        self.conf = detector.conf
+
+        self.frames = 0
+        self.skipped = 0
+        self.load = 0.0       # detector pixels, in full frames
+
+    def detect(self, frame, predicted_pos=None, *args, frame_index=None, **kwargs):
+        # keep the differencing history current even when not gating
+        decision, regions = self.gate.check(frame, frame_index)
+        self.frames += 1
+
+        h, w = frame.shape[:2]
+        if predicted_pos is not None:
+            dets = self.detector.detect(frame, predicted_pos, *args,
+                                        frame_index=frame_index, **kwargs)
+            roi = getattr(self.detector, "last_roi", None)
+            self.load += 1.0 if roi is None else (roi[2] - roi[0]) * (roi[3] - roi[1]) / (w * h)
+            return dets
+
+        if decision in (SKIP, GLOBAL):
+            self.skipped += 1
+            return []
+        if decision == FULL:
+            self.load += 1.0
+            return self.detector.detect(frame, frame_index=frame_index,
+                                        imgsz=kwargs.get("imgsz"))
+
+        self.load += sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in regions) / (w * h)
+        dets = np.concatenate([self.detector.detect_region(frame, roi, frame_index=frame_index)
+                               for roi in regions])
+        return to_tuples(dets)
+
+    def skip_ratio(self):
+        """Frames where the detector did not run at all."""
+        return self.skipped / self.frames if self.frames else 0.0
+
+    def load_ratio(self):
+        """Detector pixels relative to full-frame inference on every frame."""
+        return self.load / self.frames if self.frames else 0.0
+
+    def close(self):
+        self.gate.close()
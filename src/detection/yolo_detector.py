@@ -1,9 +1,36 @@
-from ultralytics import YOLO
 import math
+import numpy as np
 
-class YoloBallDetector:
-    def __init__(self, model_path, conf=0.01, ball_class_id=0):
-        self.model = YOLO(model_path)
+from src.detection.backends import make_backend
+from src.utils.metrics import metrics
+
+# detection array columns: cx, cy, x1, y1, x2, y2, conf
+DET_COLUMNS = 7
+
+
+def empty_detections():
+    return np.zeros((0, DET_COLUMNS), dtype=np.float32)
+
+
+def to_tuples(dets):
+    """(M, 7) array → [(cx, cy, x1, y1, x2, y2, conf), ...] with int pixels."""
+    return [
+        (int(cx), int(cy), int(x1), int(y1), int(x2), int(y2), float(conf))
+        for cx, cy, x1, y1, x2, y2, conf in dets
+    ]
+
+
+def in_region(dets, roi):
+    """Rows of an (M, 7) array whose centre lies in roi = (x0, y0, x1, y1)."""
+    x0, y0, x1, y1 = roi
+    cx, cy = dets[:, 0], dets[:, 1]
+    return dets[(cx >= x0) & (cx < x1) & (cy >= y0) & (cy < y1)]
+
+
+class BallBoxFilter:
+    """Class / confidence / size / shape filter shared by every detector."""
+
+    def __init__(self, conf=0.01, ball_class_id=0):
         self.conf = conf
         self.ball_class_id = ball_class_id
 
@@ -13,45 +40,168 @@ class YoloBallDetector:
         self.min_ratio = 0.6
         self.max_ratio = 1.4
 
-    def detect(self, frame, predicted_pos=None):
-        results = self.model(frame, conf=self.conf, verbose=False)[0]
+    # ------------------------------------
+    def filter_boxes(self, xyxy, cls, conf):
+        """
+        Vectorized class / size / shape filter.
+        xyxy: (N, 4), cls: (N,), conf: (N,)
+        Returns (M, 7) float32 array [cx, cy, x1, y1, x2, y2, conf]
+        """
+        xyxy = np.asarray(xyxy, dtype=np.float32).reshape(-1, 4)
+        if len(xyxy) == 0:
+            return empty_detections()
+
+        cls = np.asarray(cls).reshape(-1)
+        conf = np.asarray(conf, dtype=np.float32).reshape(-1)
+
+        # same integer box convention as the per-box path
+        boxes = np.trunc(xyxy)
+        w = boxes[:, 2] - boxes[:, 0]
+        h = boxes[:, 3] - boxes[:, 1]
 
-        detections = []
+        keep = (cls.astype(np.int64) == self.ball_class_id) & (w > 0) & (h > 0)
+        keep &= conf >= self.conf
 
-        if results.boxes is None:
-            return detections
+        area = w * h
+        ratio = np.divide(w, h, out=np.zeros_like(w), where=h > 0)
 
-        for box, cls, conf in zip(
-            results.boxes.xyxy,
-            results.boxes.cls,
-            results.boxes.conf
-        ):
-            if int(cls) != self.ball_class_id:
-                continue
+        # ❌ AREA FILTER
+        keep &= (area >= self.min_area) & (area <= self.max_area)
 
-            x1, y1, x2, y2 = map(int, box.tolist())
-            w = x2 - x1
-            h = y2 - y1
+        # ❌ ASPECT RATIO FILTER
+        keep &= (ratio >= self.min_ratio) & (ratio <= self.max_ratio)
 
-            if w <= 0 or h <= 0:
-                continue
+        boxes = boxes[keep]
+        out = np.empty((len(boxes), DET_COLUMNS), dtype=np.float32)
+        out[:, 0] = np.floor((boxes[:, 0] + boxes[:, 2]) / 2)
+        out[:, 1] = np.floor((boxes[:, 1] + boxes[:, 3]) / 2)
+        out[:, 2:6] = boxes
+        out[:, 6] = conf[keep]
+        return out
 
-            area = w * h
-            ratio = w / h
 
-            # ❌ AREA FILTER
-            if area < self.min_area or area > self.max_area:
-                continue
+class YoloBallDetector(BallBoxFilter):
+    def __init__(self, model_path, conf=0.01, ball_class_id=0, batch_size=16,
+                 roi_mode=False, roi_min=128, roi_max=640, roi_sigma=3.0,
+                 max_roi_misses=3, backend="auto", imgsz=640, iou=0.45, threads=None):
+        """
+        backend: "auto" (by file extension), "ultralytics" (.pt),
+                 "onnx" or "openvino" (exported model; imgsz / iou / threads
+                 apply to these). See src/detection/backends.py.
+        """
+        super().__init__(conf=conf, ball_class_id=ball_class_id)
+        self.backend = make_backend(
+            model_path, backend, imgsz=imgsz, iou=iou, threads=threads
+        )
+        self.model_path = model_path
+        self.batch_size = batch_size
 
-            # ❌ ASPECT RATIO FILTER
-            if ratio < self.min_ratio or ratio > self.max_ratio:
-                continue
+        # 🎯 SEARCH WINDOW (crop around the predicted position)
+        self.roi_mode = roi_mode
+        self.roi_min = roi_min            # px, smallest crop side
+        self.roi_max = roi_max            # px, largest crop side
+        self.roi_sigma = roi_sigma        # how many position std-devs to cover
+        self.max_roi_misses = max_roi_misses
+        self.roi_misses = 0
+        self.last_roi = None              # (x0, y0, x1, y1) or None for full frame
 
-            cx = (x1 + x2) // 2
-            cy = (y1 + y2) // 2
+    # ------------------------------------
+    def _filter(self, raw):
+        with metrics.timer("filter"):
+            return self.filter_boxes(*raw)
 
-            detections.append(
-                (cx, cy, x1, y1, x2, y2, float(conf))
+    def detect_raw(self, frame, imgsz=None):
+        """
+        Full-frame inference, unfiltered: (xyxy (N, 4), cls (N,), conf (N,)).
+        Only the model's own `conf` threshold has been applied.
+        """
+        with metrics.timer("infer"):
+            return self.backend.predict(frame, self.conf, imgsz=imgsz)
+
+    # ------------------------------------
+    def search_window(self, frame_shape, predicted_pos, velocity=None,
+                      covariance=None, dt=1/30):
+        """
+        Square crop (x0, y0, x1, y1) centred on `predicted_pos`.
+
+        The side grows with the distance the ball can travel in `dt`
+        (velocity in px/s) and with the position uncertainty
+        (`covariance`: 2x2 position block or the full 4x4 Kalman P).
+        Sides are multiples of 32 so the crop is fed at native resolution.
+        """
+        h, w = frame_shape[:2]
+        px, py = predicted_pos
+
+        half = self.roi_min / 2
+        if velocity is not None:
+            half += math.hypot(velocity[0], velocity[1]) * dt
+        if covariance is not None:
+            cov = np.asarray(covariance)
+            half += self.roi_sigma * math.sqrt(max(cov[0, 0], cov[1, 1], 0.0))
+
+        side = int(math.ceil(min(2 * half, self.roi_max) / 32) * 32)
+        side_x = min(side, w)
+        side_y = min(side, h)
+
+        x0 = int(min(max(px - side_x // 2, 0), w - side_x))
+        y0 = int(min(max(py - side_y // 2, 0), h - side_y))
+        return x0, y0, x0 + side_x, y0 + side_y
+
+    def detect_region(self, frame, roi, frame_index=None):
+        """
+        Filtered detections (N, 7) inside the crop `roi` = (x0, y0, x1, y1),
+        in full-frame coordinates; the crop is inferred at its own size.
+        """
+        x0, y0, x1, y1 = roi
+        crop = frame[y0:y1, x0:x1]
+        imgsz = int(math.ceil(max(x1 - x0, y1 - y0) / 32) * 32)
+        with metrics.timer("infer"):
+            xyxy, cls, conf = self.backend.predict(crop, self.conf, imgsz=imgsz)
+
+        with metrics.timer("filter"):
+            # back to full-frame coordinates
+            xyxy = xyxy + np.array([x0, y0, x0, y0], dtype=xyxy.dtype)
+            return self.filter_boxes(xyxy, cls, conf)
+
+    def detect(self, frame, predicted_pos=None, velocity=None, covariance=None,
+               dt=1/30, frame_index=None, imgsz=None):
+        """
+        Ball detections for one frame as (cx, cy, x1, y1, x2, y2, conf).
+        `frame_index` is unused here; cache-aware wrappers key on it.
+        `imgsz` lowers the full-frame inference size (idle mode).
+        """
+        use_roi = (
+            self.roi_mode
+            and predicted_pos is not None
+            and self.roi_misses < self.max_roi_misses
+        )
+
+        if use_roi:
+            self.last_roi = self.search_window(
+                frame.shape, predicted_pos, velocity, covariance, dt
             )
+            dets = self.detect_region(frame, self.last_roi)
+            # consecutive crop misses → next call searches the full frame
+            self.roi_misses = 0 if len(dets) else self.roi_misses + 1
+            metrics.count("roi_frames")
+        else:
+            self.last_roi = None
+            dets = self._filter(self.detect_raw(frame, imgsz))
+            if len(dets):
+                self.roi_misses = 0
+
+        return to_tuples(dets)
+
+    def detect_batch(self, frames):
+        """
+        Run the model on a list of frames in chunks of `batch_size`.
+        Returns one (M, 7) array per frame (see DET_COLUMNS).
+        """
+        out = []
+        for start in range(0, len(frames), self.batch_size):
+            chunk = list(frames[start:start + self.batch_size])
+            with metrics.timer("infer_batch"):
+                raws = self.backend.predict_batch(chunk, self.conf)
+            out.extend(self._filter(r) for r in raws)
 
-        return detections
+        return out
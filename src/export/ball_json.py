@@ -1,11 +1,19 @@
 import json
 
+from src.export.delivery_stream import DeliveryStreamWriter, iter_deliveries
+from src.trajectory.trajectory_builder import TrajectoryBuffer, save_trajectories
+
 class BallJSONExporter:
-    def __init__(self):
+    def __init__(self, stream_path=None, video_id=None, fps=None):
         self.deliveries = []
         self.current_ball = None
         self.ball_id = 0
 
+        # append-only .jsonl: finished balls go to disk, not memory
+        self.stream = None
+        if stream_path is not None:
+            self.stream = DeliveryStreamWriter(stream_path, video_id=video_id, fps=fps)
+
     def start_ball(self):
         self.ball_id += 1
         self.current_ball = {
@@ -14,16 +22,13 @@ class BallJSONExporter:
             "release_speed_kmph": None,
             "bounce": None,
             "pitch_type": None,
-            "trajectory": []
+            # columnar until written
+            "trajectory": TrajectoryBuffer()
         }
 
-    def add_position(self, frame_idx, x, y):
+    def add_position(self, frame_idx, x, y, vx=None, vy=None, conf=None):
         if self.current_ball:
-            self.current_ball["trajectory"].append({
-                "frame": frame_idx,
-                "x": int(x),
-                "y": int(y)
-            })
+            self.current_ball["trajectory"].append(frame_idx, x, y, vx, vy, conf)
 
     def set_release(self, frame_idx, x, y):
         self.current_ball["release"] = {
@@ -46,9 +51,44 @@ class BallJSONExporter:
 
     def end_ball(self):
         if self.current_ball:
-            self.deliveries.append(self.current_ball)
+            if self.stream is not None:
+                self.stream.write(self._ball_json(self.current_ball))
+            else:
+                self.deliveries.append(self.current_ball)
             self.current_ball = None
 
-    def save(self, path="balls.json"):
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+
+    @staticmethod
+    def _ball_json(ball):
+        out = dict(ball)
+        out["trajectory"] = ball["trajectory"].to_points(("frame", "x", "y"))
+        return out
+
+    def to_list(self):
+        return [self._ball_json(b) for b in self.deliveries]
+
+    def save(self, path="balls.json", binary_path=None):
+        """Writes one ball at a time; same output as json.dump(indent=2)."""
+        if self.stream is not None:
+            assert binary_path is None, "❌ binary_path needs in-memory trajectories"
+            self.close()
+            records = iter_deliveries(self.stream.path)
+        else:
+            records = (self._ball_json(b) for b in self.deliveries)
+
         with open(path, "w") as f:
-            json.dump(self.deliveries, f, indent=2)
+            n = 0
+            for n, ball in enumerate(records, 1):
+                body = json.dumps(ball, indent=2)
+                f.write(("[\n" if n == 1 else ",\n") + "  " + body.replace("\n", "\n  "))
+            f.write("\n]" if n else "[]")
+
+        if binary_path is not None:
+            save_trajectories(
+                binary_path,
+                [b["trajectory"] for b in self.deliveries],
+                [b["ball_id"] for b in self.deliveries]
+            )
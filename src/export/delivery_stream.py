@@ -0,0 +1,90 @@
+import json
+import os
+import time
+
+FORMAT = "deliveries-jsonl/1"
+
+
+class DeliveryStreamWriter:
+    """
+    Append-only JSON Lines delivery log.
+
+    Line 1 is a header ({"type": "header", "video_id", "fps",
+    "pitch_length_meters", ...}); every following line is one finished
+    delivery. Writes are buffered and fsync'd every `fsync_every` records
+    or `fsync_interval` seconds, so a crash loses at most that much.
+    """
+
+    def __init__(self, path, video_id=None, fps=None, pitch_length=20.12,
+                 fsync_every=10, fsync_interval=5.0, buffer_size=1 << 16, frame_height=None):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.count = 0
+
+        self._f = open(path, "w", buffering=buffer_size)
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+        header = {
+            "type": "header",
+            "format": FORMAT,
+            "video_id": video_id,
+            "fps": fps,
+            "pitch_length_meters": pitch_length
+        }
+        if frame_height is not None:
+            header["frame_height"] = frame_height
+        self._write_line(header)
+        self.sync()
+
+    def _write_line(self, obj):
+        self._f.write(json.dumps(obj, separators=(",", ":")) + "\n")
+
+    def write(self, delivery):
+        self._write_line(delivery)
+        self.count += 1
+        self._pending += 1
+
+        if (self._pending >= self.fsync_every or
+                time.monotonic() - self._last_sync >= self.fsync_interval):
+            self.sync()
+
+    def sync(self):
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._f.closed:
+            self.sync()
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_header(path):
+    with open(path) as f:
+        header = json.loads(f.readline())
+    assert header.get("type") == "header", f"❌ Not a delivery stream: {path}"
+    return header
+
+
+def iter_deliveries(path):
+    """
+    Lazily yield delivery records. A truncated last line (the writer was
+    killed mid-write) is skipped rather than raising.
+    """
+    with open(path) as f:
+        header = json.loads(f.readline())
+        assert header.get("type") == "header", f"❌ Not a delivery stream: {path}"
+
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            yield json.loads(line)
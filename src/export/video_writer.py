@@ -0,0 +1,159 @@
+"""
+Annotated-video encoding in a separate process.
+
+ProcessVideoWriter has the cv2.VideoWriter surface (write / release /
+isOpened) so ExportStage can use either. write() copies the finished
+frame into a shared-memory ring slot and returns; a child process
+encodes it with cv2.VideoWriter ("opencv") or pipes it to a local
+ffmpeg ("ffmpeg", libx264). Encoding never runs on the tracking /
+export thread and does not hold its GIL.
+
+write() only blocks when all `slots` frames are still waiting to be
+encoded (backpressure instead of unbounded memory).
+"""
+import multiprocessing as mp
+import queue
+import shutil
+import subprocess
+import traceback
+
+from src.pipeline.shm_ring import FrameRing
+
+_POLL = 0.1
+
+
+def _open_opencv(path, fps, width, height, codec):
+    import cv2
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*codec), fps, (width, height))
+    if not writer.isOpened():
+        raise IOError(f"cv2.VideoWriter could not open {path}")
+    return writer.write, writer.release
+
+
+def _open_ffmpeg(path, fps, width, height, codec):
+    exe = shutil.which("ffmpeg")
+    if exe is None:
+        raise FileNotFoundError("ffmpeg not found on PATH")
+
+    proc = subprocess.Popen([
+        exe, "-loglevel", "error", "-y",
+        "-f", "rawvideo", "-pix_fmt", "bgr24", "-s", f"{width}x{height}", "-r", str(fps),
+        "-i", "-",
+        "-c:v", "libx264", "-preset", "veryfast", "-pix_fmt", "yuv420p", path
+    ], stdin=subprocess.PIPE)
+
+    def write(frame):
+        proc.stdin.write(frame.data)
+
+    def release():
+        proc.stdin.close()
+        if proc.wait() != 0:
+            raise IOError(f"ffmpeg exited with {proc.returncode}")
+
+    return write, release
+
+
+BACKENDS = {"opencv": _open_opencv, "ffmpeg": _open_ffmpeg}
+
+
+def _writer_main(path, fps, width, height, backend, codec, ring_spec, ready_q, free_q, status_q):
+    ring = FrameRing(*ring_spec)
+    try:
+        write, release = BACKENDS[backend](path, fps, width, height, codec)
+        status_q.put(("ok",))
+        frames = 0
+        while True:
+            slot = ready_q.get()
+            if slot is None:
+                break
+            write(ring.view(slot))
+            free_q.put(slot)
+            frames += 1
+        release()
+        status_q.put(("done", frames))
+    except BaseException:
+        status_q.put(("error", traceback.format_exc()))
+    finally:
+        ring.close()
+
+
+class ProcessVideoWriter:
+    def __init__(self, path, fps, size, backend="opencv", codec="mp4v", slots=8):
+        assert backend in BACKENDS, f"❌ Unknown video writer backend: {backend}"
+        width, height = size
+        self.path = path
+        self.frames = 0
+        self._ring = FrameRing((height, width, 3), slots)
+
+        ctx = mp.get_context("spawn")
+        self._ready, self._free, self._status = ctx.Queue(), ctx.Queue(), ctx.Queue()
+        for slot in range(slots):
+            self._free.put(slot)
+
+        self._proc = ctx.Process(
+            target=_writer_main, name="video-writer", daemon=True,
+            args=(path, fps, width, height, backend, codec, self._ring.spec(),
+                  self._ready, self._free, self._status)
+        )
+        self._proc.start()
+
+        # surface open failures here, like cv2.VideoWriter.isOpened()
+        self.error = None
+        msg = self._wait_status()
+        self._opened = msg[0] == "ok"
+        if not self._opened:
+            self.error = msg[1]
+            self._shutdown()
+
+    def isOpened(self):
+        return self._opened
+
+    def _wait_status(self):
+        while True:
+            try:
+                return self._status.get(timeout=_POLL)
+            except queue.Empty:
+                if not self._proc.is_alive():
+                    return ("error", f"writer process exited with {self._proc.exitcode}")
+
+    def _check(self):
+        try:
+            msg = self._status.get_nowait()
+        except queue.Empty:
+            msg = None
+        if msg is not None and msg[0] == "error":
+            self.error = msg[1]
+        if self.error is not None or not self._proc.is_alive():
+            raise RuntimeError(f"❌ Video writer for {self.path} failed:\n{self.error}")
+
+    def write(self, frame):
+        while True:
+            try:
+                slot = self._free.get(timeout=_POLL)
+                break
+            except queue.Empty:
+                self._check()
+
+        self._ring.view(slot)[:] = frame
+        self._ready.put(slot)
+        self.frames += 1
+
+    def release(self):
+        if self._proc is None:
+            return
+        self._ready.put(None)
+        msg = self._wait_status() if self.error is None else ("error", self.error)
+        self._shutdown()
+        if msg[0] == "error":
+            raise RuntimeError(f"❌ Video writer for {self.path} failed:\n{msg[1]}")
+
+    def _shutdown(self):
+        self._proc.join(timeout=10)
+        if self._proc.is_alive():
+            self._proc.terminate()
+            self._proc.join()
+        self._proc = None
+        for q in (self._ready, self._free, self._status):
+            q.cancel_join_thread()
+            q.close()
+        self._ring.close()
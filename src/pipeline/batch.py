@@ -0,0 +1,200 @@
+import glob
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing as mp
+
+from src.utils.metrics import metrics
+
+VIDEO_EXTS = (".mp4", ".avi", ".mov", ".mkv", ".m4v")
+
+# one detector per worker process, loaded by the pool initializer
+_detector = None
+_options = None
+
+
+def find_videos(source):
+    """`source` is a directory (searched recursively) or a glob pattern."""
+    if os.path.isdir(source):
+        pattern = os.path.join(source, "**", "*")
+        paths = glob.glob(pattern, recursive=True)
+    else:
+        paths = glob.glob(source, recursive=True)
+
+    return sorted(
+        p for p in paths
+        if os.path.isfile(p) and p.lower().endswith(VIDEO_EXTS)
+    )
+
+
+def _output_names(videos):
+    """<stem>.json per video; repeated stems get a numeric suffix."""
+    seen = {}
+    names = []
+    for path in videos:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        n = seen.get(stem, 0)
+        seen[stem] = n + 1
+        names.append(stem if n == 0 else f"{stem}_{n}")
+    return names
+
+
+# ---------------- worker side ----------------
+def _limit_threads(threads):
+    # must run before torch / BLAS are imported in this process
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+
+    import cv2
+    cv2.setNumThreads(threads)
+
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _init_worker(model_path, threads, detector_kwargs, options):
+    global _detector, _options
+    _limit_threads(threads)
+
+    from src.detection.yolo_detector import YoloBallDetector
+    _detector = YoloBallDetector(model_path=model_path, **detector_kwargs)
+    _options = options
+    if options["metrics"]:
+        metrics.enable()
+
+
+def _process_video(video_path, json_path, video_out):
+    """Returns (manifest entry, this video's Metrics or None)."""
+    from src.pipeline.offline import run_headless
+
+    entry = {
+        "video": video_path,
+        "json": json_path,
+        "status": "ok",
+        "error": None,
+        "worker_pid": os.getpid()
+    }
+
+    # search-window state must not leak between videos
+    _detector.roi_misses = 0
+
+    gate = None
+    if _options["motion_gate"] is not None:
+        from src.detection.motion_gate import MotionGate
+        gate_kwargs = dict(_options["motion_gate"])
+        if gate_kwargs.get("log_path"):
+            gate_kwargs["log_path"] = os.path.splitext(json_path)[0] + "_gate.csv"
+        gate = MotionGate(**gate_kwargs)
+
+    segmenter = None
+    if _options["segmenter"] is not None:
+        from src.tracking.segmenter import DeliverySegmenter
+        segmenter = DeliverySegmenter(**_options["segmenter"])
+
+    metrics.reset()
+    t0 = time.perf_counter()
+    try:
+        report = run_headless(
+            video_path, _detector, json_path, video_out=video_out,
+            guided=_options["guided"], max_stride=_options["max_stride"],
+            track_kwargs=_options["track_kwargs"], motion_gate=gate,
+            segmenter=segmenter
+        )
+        entry.update({
+            "frames": report["frames"],
+            "fps": report["fps"],
+            "video_s": report["video_s"],
+            "realtime_x": report["realtime_x"],
+            "deliveries": report["deliveries"],
+        })
+        if "gate_skip_ratio" in report:
+            entry["gate_skip_ratio"] = report["gate_skip_ratio"]
+    except Exception as e:
+        entry["status"] = "failed"
+        entry["error"] = f"{type(e).__name__}: {e}"
+
+    entry["wall_s"] = round(time.perf_counter() - t0, 3)
+    return entry, metrics if metrics.enabled else None
+
+
+# ---------------- driver ----------------
+def run_batch(source, out_dir, model_path, workers=None, threads_per_worker=1,
+              conf=0.2, write_videos=False, guided=False, max_stride=1,
+              detector_kwargs=None, track_kwargs=None, motion_gate=None, segmenter=None,
+              on_done=None):
+    """
+    Process every video under `source` in a pool of worker processes.
+
+    Each worker loads the YOLO weights once and reuses them for all of
+    its videos. Per-video delivery JSON goes to `out_dir/<stem>.json`;
+    `out_dir/manifest.json` records timing and failure status per video.
+    `motion_gate` / `segmenter`: MotionGate / DeliverySegmenter kwargs;
+    fresh instances are built per video.
+    With metrics enabled here, each video's worker timers / counters are
+    merged into this process' `metrics`.
+    """
+    videos = find_videos(source)
+    os.makedirs(out_dir, exist_ok=True)
+
+    workers = workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+    workers = min(workers, max(1, len(videos)))
+
+    kwargs = {"conf": conf, "ball_class_id": 0, "roi_mode": guided}
+    kwargs.update(detector_kwargs or {})
+    options = {
+        "guided": guided, "max_stride": max_stride,
+        "track_kwargs": track_kwargs, "motion_gate": motion_gate,
+        "segmenter": segmenter, "metrics": metrics.enabled
+    }
+
+    jobs = []
+    for path, name in zip(videos, _output_names(videos)):
+        json_path = os.path.join(out_dir, name + ".json")
+        video_out = os.path.join(out_dir, name + "_tracked.mp4") if write_videos else None
+        jobs.append((path, json_path, video_out))
+
+    t0 = time.perf_counter()
+    entries = []
+    if jobs:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(model_path, threads_per_worker, kwargs, options)
+        ) as pool:
+            futures = {pool.submit(_process_video, *job): job for job in jobs}
+
+            for fut in as_completed(futures):
+                path, json_path, _ = futures[fut]
+                try:
+                    entry, worker_metrics = fut.result()
+                    metrics.merge(worker_metrics)
+                except Exception as e:      # worker died / failed to start
+                    entry = {
+                        "video": path, "json": json_path, "status": "failed",
+                        "error": f"{type(e).__name__}: {e}", "wall_s": None
+                    }
+                entries.append(entry)
+                if on_done is not None:
+                    on_done(entry)
+
+    entries.sort(key=lambda e: e["video"])
+    manifest = {
+        "model": model_path,
+        "source": source,
+        "workers": workers,
+        "threads_per_worker": threads_per_worker,
+        "total_wall_s": round(time.perf_counter() - t0, 3),
+        "num_videos": len(entries),
+        "num_failed": sum(e["status"] != "ok" for e in entries),
+        "videos": entries
+    }
+
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return manifest
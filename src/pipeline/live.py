@@ -0,0 +1,282 @@
+"""
+Streaming API for live sources (RTSP / camera / a file replayed live).
+
+    for result in track_stream("rtsp://camera/stream", detector):
+        print(result["position"], result["events"], result["latency_ms"])
+
+    async for result in track_stream_async(0, detector):    # webcam 0
+        ...
+
+A grabber thread reads the source as fast as it delivers frames and
+keeps only the newest one. Whenever detection + tracking is slower than
+the source, the frames it could not get to are dropped instead of
+queued, so latency stays at about one processing time instead of
+growing without bound. The tracker still sees every dropped frame's
+real timestamp: it coasts through them on the Kalman prediction (as
+with adaptive stride) while the ball is in view, or counts them as
+misses once it is lost, then the next processed frame updates the
+filter with its true dt. Bounces are only taken from measured frames.
+
+Latency is glass-to-result: from when the frame became available (the
+grab time for live sources; the frame's presentation time for a file
+replayed at its native rate) to when its result is yielded.
+"""
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+
+import cv2
+
+from src.pipeline.stages import FramePacket, GuidedDetectStage, TrackStage
+from src.tracking.segmenter import DeliverySegmenter
+from src.utils.frame_pool import FramePool
+from src.utils.metrics import Histogram, metrics
+
+
+def open_source(source):
+    """Camera index (int or digit string), file path or stream URL → (cap, is_file)."""
+    if isinstance(source, int) or (isinstance(source, str) and source.isdigit()):
+        cap = cv2.VideoCapture(int(source))
+    else:
+        cap = cv2.VideoCapture(source)
+    assert cap.isOpened(), f"❌ Failed to open source: {source}"
+    return cap, isinstance(source, str) and os.path.isfile(source)
+
+
+# ---------------- grabber ----------------
+class FrameGrabber:
+    """
+    Reads `cap` on a thread into a single "latest frame" slot.
+
+    realtime: pace reads at the source's own timestamps (a file standing
+    in for a camera). Live sources are paced by the device already.
+    """
+
+    def __init__(self, cap, fps=30, realtime=False):
+        self.cap = cap
+        self.fps = fps
+        self.realtime = realtime
+        self.pool = FramePool.for_capture(cap)
+
+        self.grabbed = 0
+        self.dropped = 0
+        self.done = False
+        self.error = None
+
+        self._latest = None
+        self._skipped = []          # timestamps of frames overwritten unseen
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="grabber", daemon=True)
+
+    def start(self):
+        self._t0 = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=5)
+        with self._cond:
+            if self._latest is not None:
+                self._latest.release()
+                self._latest = None
+
+    def _run(self):
+        index = 0
+        try:
+            while not self._stop.is_set():
+                if self.pool is not None:
+                    ok, frame = self.pool.read(self.cap)
+                else:
+                    ok, frame = self.cap.read()
+                if not ok:
+                    break
+
+                ts = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                if self.realtime:
+                    if ts <= 0 and index > 0:
+                        ts = index / self.fps
+                    # glass time: when the frame would be on screen
+                    shown = self._t0 + ts
+                    delay = shown - time.perf_counter()
+                    if delay > 0:
+                        self._stop.wait(delay)
+                else:
+                    shown = time.perf_counter()
+                    if ts <= 0:         # no container clock (camera / some RTSP)
+                        ts = shown - self._t0
+
+                packet = FramePacket(index, ts, frame, pool=self.pool)
+                packet.captured = shown
+                self._publish(packet)
+                index += 1
+        except BaseException as e:
+            self.error = e
+        finally:
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+    def _publish(self, packet):
+        with self._cond:
+            self.grabbed += 1
+            if self._latest is not None:
+                self._skipped.append(self._latest.timestamp)
+                self._latest.release()
+                self.dropped += 1
+            self._latest = packet
+            self._cond.notify()
+
+    def get(self):
+        """Newest unseen frame and the timestamps skipped before it; None at the end."""
+        with self._cond:
+            while self._latest is None and not self.done:
+                self._cond.wait(0.1)
+            if self.error is not None:
+                raise RuntimeError(f"❌ Frame grabber failed: {self.error!r}") from self.error
+            if self._latest is None:
+                return None
+            packet, skipped = self._latest, self._skipped
+            self._latest, self._skipped = None, []
+            return packet, skipped
+
+
+# ---------------- stats ----------------
+class StreamStats:
+    def __init__(self):
+        self.latency = Histogram()
+        self.processed = 0
+        self.dropped = 0          # never processed: overtaken by a newer frame
+        self.late = 0             # picked up but already over the latency budget
+        self.grabbed = 0
+        self.wall_s = 0.0
+
+    def as_dict(self):
+        return {
+            "grabbed": self.grabbed,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "late": self.late,
+            "drop_ratio": round((self.dropped + self.late) / self.grabbed, 3)
+            if self.grabbed else 0.0,
+            "fps": round(self.processed / self.wall_s, 2) if self.wall_s else 0.0,
+            "latency": self.latency.to_dict()
+        }
+
+
+def _result(packet, track, events, dropped, latency):
+    return {
+        "index": packet.index,
+        "timestamp": packet.timestamp,
+        "position": track["position"],
+        "velocity": track["velocity"],
+        "speed": track["speed"],
+        "release_speed": track["release_speed"],
+        "max_speed": track["max_speed"],
+        "pitch_type": track["pitch_type"],
+        "detections": packet.detections,
+        "events": events,
+        "dropped": dropped,
+        "latency_ms": round(1000 * latency, 3)
+    }
+
+
+# ---------------- API ----------------
+def track_stream(source, detector, fps=None, realtime=None, max_latency=None,
+                 track_kwargs=None, segmenter=None, stats=None):
+    """
+    Generator of per-frame results for a live `source` (camera index,
+    RTSP / HTTP URL or file path).
+
+    realtime: replay at the native frame rate; default True for files
+              (stand-in for a camera), False for live sources.
+    max_latency: budget in seconds; a frame already older than this when
+                 the detector gets to it is skipped (coasted) too.
+    segmenter: DeliverySegmenter for the `events` list (default: one that
+               keeps full detection cost while IDLE).
+    stats: a StreamStats to fill in (latency histogram, drop counts).
+
+    Each result: index, timestamp, position, velocity, speed,
+    release_speed, max_speed, pitch_type, detections, events (delivery
+    events since the previous result), dropped (frames skipped since the
+    previous result), latency_ms.
+    """
+    cap, is_file = open_source(source)
+    fps = fps or cap.get(cv2.CAP_PROP_FPS) or 30
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    if realtime is None:
+        realtime = is_file
+    if segmenter is None:
+        segmenter = DeliverySegmenter(idle_stride=1, idle_imgsz=None)
+    stats = stats if stats is not None else StreamStats()
+
+    track = TrackStage(fps=fps, segmenter=segmenter, **(track_kwargs or {}))
+    stage = GuidedDetectStage(detector, track)
+    grabber = FrameGrabber(cap, fps, realtime).start()
+    t0 = time.perf_counter()
+
+    try:
+        skipped = []
+        in_view = False
+        while True:
+            item = grabber.get()
+            if item is None:
+                break
+            packet, overtaken = item
+            skipped += overtaken
+            stats.dropped += len(overtaken)
+
+            if max_latency is not None and time.perf_counter() - packet.captured > max_latency:
+                stats.late += 1
+                skipped.append(packet.timestamp)
+                packet.release()
+                continue
+
+            # catch the tracker up through the frames we never looked at:
+            # coast while the ball is in view, count misses once it is lost
+            # (so a vanished ball still ends its delivery on time)
+            events = []
+            for ts in skipped:
+                skip = track.step([], height, ts, coast=in_view)
+                events += skip.get("segment", {}).get("events", [])
+
+            with metrics.timer("live"):
+                stage(packet)
+            events += packet.track.get("segment", {}).get("events", [])
+
+            latency = time.perf_counter() - packet.captured
+            stats.latency.record(latency)
+            metrics.record("glass_to_result", latency)
+            stats.processed += 1
+            in_view = packet.track["matched"] is not None
+            result = _result(packet, packet.track, events, len(skipped), latency)
+            skipped = []
+            packet.release()
+            yield result
+    finally:
+        grabber.stop()
+        cap.release()
+        stats.grabbed = grabber.grabbed
+        stats.wall_s = time.perf_counter() - t0
+
+
+async def track_stream_async(source, detector, **kwargs):
+    """
+    Async counterpart of track_stream. Blocking reads and inference run
+    on one worker thread, so the event loop stays free meanwhile.
+    """
+    loop = asyncio.get_running_loop()
+    done = object()
+    stream = track_stream(source, detector, **kwargs)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as worker:
+        try:
+            while True:
+                result = await loop.run_in_executor(worker, next, stream, done)
+                if result is done:
+                    break
+                yield result
+        finally:
+            await loop.run_in_executor(worker, stream.close)
@@ -0,0 +1,183 @@
+import os
+import time
+
+import cv2
+
+from src.detection.cache import RecordingDetector, CachedDetector
+from src.detection.motion_gate import MotionGatedDetector
+from src.pipeline.runner import PipelineRunner
+from src.pipeline.stages import (
+    FramePacket, decode_frames, DetectStage, TrackStage, GuidedDetectStage, ExportStage
+)
+from src.tracking.scheduler import AdaptiveStrideScheduler
+from src.utils.frame_pool import FramePool
+from src.utils.json_exporter import BallJSONExporter
+from src.visualization.renderer import OverlayRenderer
+from src.utils.metrics import metrics
+
+
+def open_video_writer(path, fps, width, height, mode="process"):
+    """
+    mode: "inline"  — cv2.VideoWriter, encodes on the calling thread
+          "process" — OpenCV encoder in a child process (ProcessVideoWriter)
+          "ffmpeg"  — local ffmpeg / libx264 fed from a child process
+    """
+    if mode == "inline":
+        writer = cv2.VideoWriter(
+            path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height)
+        )
+    else:
+        from src.export.video_writer import ProcessVideoWriter
+        backend = "ffmpeg" if mode == "ffmpeg" else "opencv"
+        writer = ProcessVideoWriter(path, fps, (width, height), backend=backend)
+    assert writer.isOpened(), (
+        f"❌ Failed to open video writer: {path}\n{getattr(writer, 'error', '') or ''}"
+    )
+    return writer
+
+
+def run_headless(video_path, detector, json_path, video_out=None,
+                 queue_size=16, track_kwargs=None, guided=False, max_stride=1,
+                 cache=None, stream_path=None, motion_gate=None, segmenter=None,
+                 writer="process"):
+    """
+    Process a video with no display as fast as possible.
+
+    Writes the delivery JSON to `json_path` and, if `video_out` is given,
+    an annotated MP4. Returns the pipeline report extended with
+    `video_s` (media duration) and `realtime_x` (media seconds / wall seconds).
+    `guided` runs detection inside the track stage so the detector gets
+    the current prediction (needed for search-window mode).
+    `max_stride` > 1 enables adaptive detection stride with Kalman coasting.
+    `cache` (DetectionCache) records every frame's raw boxes for replay;
+    recording forces full-frame detection on every frame.
+    `stream_path` appends each finished delivery to a .jsonl as it happens,
+    so a crash mid-video keeps everything already finalized.
+    `motion_gate` (MotionGate) skips or crops inference on frames with no
+    small moving blob while no track is live; ignored when recording a cache.
+    `segmenter` (DeliverySegmenter) drives the exporter from explicit
+    delivery states and runs IDLE frames at reduced stride / resolution.
+    `writer` picks the annotated-video encoder (see open_video_writer).
+    """
+    cap = cv2.VideoCapture(video_path)
+    assert cap.isOpened(), f"❌ Failed to open video: {video_path}"
+
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    exporter = BallJSONExporter(
+        os.path.basename(video_path), fps, stream_path=stream_path, frame_height=height
+    )
+    video_writer = None
+    if video_out:
+        video_writer = open_video_writer(video_out, fps, width, height, writer)
+    export = ExportStage(exporter, video_writer, OverlayRenderer(fps))
+
+    recorder = None
+    if cache is not None:
+        recorder = cache.writer(
+            video_path, detector.model_path, detector.conf,
+            fps=fps, width=width, height=height
+        )
+        detector = RecordingDetector(detector, recorder)
+        guided, max_stride = False, 1
+    elif motion_gate is not None:
+        # guided, so the gate knows when a track is live
+        detector = MotionGatedDetector(detector, motion_gate)
+        guided = True
+
+    track = TrackStage(fps=fps, segmenter=segmenter, **(track_kwargs or {}))
+    if segmenter is not None and cache is None:
+        guided = True
+    scheduler = AdaptiveStrideScheduler(max_stride=max_stride) if max_stride > 1 else None
+    if guided or scheduler is not None:
+        stages = [("detect+track", GuidedDetectStage(detector, track, scheduler))]
+    else:
+        stages = [("detect", DetectStage(detector)), ("track", track)]
+
+    # frames are recycled: ExportStage (the sink) releases each buffer
+    pool = FramePool.for_capture(cap)
+    runner = PipelineRunner(
+        source=("decode", decode_frames(cap, fps, pool)),
+        stages=stages,
+        sink=("export", export),
+        queue_size=queue_size
+    )
+
+    try:
+        report = runner.run()
+    finally:
+        cap.release()
+        export.close()
+        exporter.close()        # flush + fsync the stream, also on errors
+        if motion_gate is not None:
+            motion_gate.close()
+
+    exporter.save(json_path)
+    if recorder is not None:
+        report["cache"] = recorder.close()
+
+    _add_summary(report, fps, exporter)
+    if pool is not None:
+        report["frame_buffers"] = pool.allocated
+    if scheduler is not None:
+        report["detect_skip_ratio"] = round(scheduler.skip_ratio(), 3)
+    if isinstance(detector, MotionGatedDetector):
+        report["gate_skip_ratio"] = round(detector.skip_ratio(), 3)
+        report["detector_load"] = round(detector.load_ratio(), 3)
+        report["gate_decisions"] = dict(motion_gate.stats)
+    if segmenter is not None:
+        report["idle_ratio"] = round(segmenter.idle_ratio(), 3)
+        report["segment_frames"] = dict(segmenter.stats)
+    return report
+
+
+def replay_cached(cached, json_path, track_kwargs=None, stream_path=None, segmenter=None,
+                  ball_class_id=0):
+    """
+    Re-run tracking, association and analytics from a detection cache
+    (CachedDetections) without decoding the video or loading the model.
+    `ball_class_id` must match the live detector's (yolo.ball_class_id).
+    """
+    meta = cached.meta
+    fps = meta["fps"]
+
+    exporter = BallJSONExporter(
+        os.path.basename(meta["video"]), fps, stream_path=stream_path,
+        frame_height=meta["height"]
+    )
+    export = ExportStage(exporter)
+    track = TrackStage(fps=fps, segmenter=segmenter, **(track_kwargs or {}))
+    detector = CachedDetector(cached, ball_class_id=ball_class_id)
+
+    t0 = time.perf_counter()
+    try:
+        for i in range(len(cached)):
+            packet = FramePacket(i, i / fps, None, height=meta["height"])
+            metrics.count("frames")
+            packet.detections = detector.detect(frame_index=i)
+            export(track(packet))
+    finally:
+        export.close()
+        exporter.close()
+    wall = time.perf_counter() - t0
+
+    exporter.save(json_path)
+
+    report = {
+        "wall_s": round(wall, 4),
+        "frames": len(cached),
+        "fps": round(len(cached) / wall, 2) if wall > 0 else 0.0,
+        "cache": cached.path
+    }
+    _add_summary(report, fps, exporter)
+    return report
+
+
+def _add_summary(report, fps, exporter):
+    report["video_s"] = round(report["frames"] / fps, 3)
+    report["realtime_x"] = (
+        round(report["video_s"] / report["wall_s"], 2) if report["wall_s"] > 0 else 0.0
+    )
+    report["deliveries"] = exporter.num_deliveries
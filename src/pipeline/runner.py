@@ -0,0 +1,204 @@
+import queue
+import threading
+import time
+
+_END = object()
+
+
+class StageStats:
+    def __init__(self, name):
+        self.name = name
+        self.items = 0
+        self.busy = 0.0      # seconds spent inside the stage function
+
+    def as_dict(self, wall):
+        return {
+            "items": self.items,
+            "busy_s": round(self.busy, 4),
+            "busy_pct": round(100.0 * self.busy / wall, 1) if wall > 0 else 0.0,
+            "ms_per_item": round(1000.0 * self.busy / self.items, 3) if self.items else 0.0
+        }
+
+
+class PipelineRunner:
+    """
+    Runs a frame source and a chain of per-item stages on worker threads
+    connected by bounded FIFO queues.
+
+    source: (name, iterable)
+    stages: [(name, fn), ...]  each fn maps one item to the next
+    sink:   (name, fn) run on the calling thread (GUI calls must live here).
+            Returning False from the sink stops the pipeline.
+
+    One thread per stage + FIFO queues keeps frame order intact.
+    """
+
+    def __init__(self, source, stages, sink=None, queue_size=8):
+        self.source = source
+        self.stages = list(stages)
+        self.sink = sink
+        self.queue_size = queue_size
+
+        self.stats = {}
+        self.wall_time = 0.0
+
+        self._stop = threading.Event()
+        self._error = None
+
+    # ------------------------------------
+    def _put(self, q, item):
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, q):
+        while not self._stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _END
+
+    def _fail(self, exc):
+        if self._error is None:
+            self._error = exc
+        self._stop.set()
+
+    # ------------------------------------
+    def _source_worker(self, iterable, stats, q_out):
+        try:
+            it = iter(iterable)
+            while not self._stop.is_set():
+                t0 = time.perf_counter()
+                try:
+                    item = next(it)
+                except StopIteration:
+                    break
+                stats.busy += time.perf_counter() - t0
+                stats.items += 1
+
+                if not self._put(q_out, item):
+                    break
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(q_out, _END)
+
+    def _stage_worker(self, fn, stats, q_in, q_out):
+        try:
+            while True:
+                item = self._get(q_in)
+                if item is _END:
+                    break
+
+                t0 = time.perf_counter()
+                out = fn(item)
+                stats.busy += time.perf_counter() - t0
+                stats.items += 1
+
+                if not self._put(q_out, out):
+                    break
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._put(q_out, _END)
+
+    # ------------------------------------
+    def run(self):
+        """Run to completion. Returns the per-stage report."""
+        self._stop.clear()
+        self._error = None
+
+        src_name, iterable = self.source
+        self.stats = {src_name: StageStats(src_name)}
+
+        queues = [queue.Queue(maxsize=self.queue_size)]
+        threads = [threading.Thread(
+            target=self._source_worker,
+            args=(iterable, self.stats[src_name], queues[0]),
+            name=src_name, daemon=True
+        )]
+
+        for name, fn in self.stages:
+            self.stats[name] = StageStats(name)
+            q_out = queue.Queue(maxsize=self.queue_size)
+            threads.append(threading.Thread(
+                target=self._stage_worker,
+                args=(fn, self.stats[name], queues[-1], q_out),
+                name=name, daemon=True
+            ))
+            queues.append(q_out)
+
+        t_start = time.perf_counter()
+        for t in threads:
+            t.start()
+
+        try:
+            self._drain(queues[-1])
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._stop.set()
+            for t in threads:
+                t.join()
+            self.wall_time = time.perf_counter() - t_start
+
+        if self._error is not None:
+            raise self._error
+
+        return self.report()
+
+    def _drain(self, q):
+        sink_stats = None
+        if self.sink is not None:
+            sink_name, sink_fn = self.sink
+            sink_stats = self.stats[sink_name] = StageStats(sink_name)
+
+        while True:
+            item = self._get(q)
+            if item is _END:
+                return
+
+            if sink_stats is None:
+                continue
+
+            t0 = time.perf_counter()
+            keep_going = sink_fn(item)
+            sink_stats.busy += time.perf_counter() - t0
+            sink_stats.items += 1
+
+            if keep_going is False:
+                return
+
+    # ------------------------------------
+    def report(self):
+        stages = {
+            name: s.as_dict(self.wall_time) for name, s in self.stats.items()
+        }
+        frames = max((s.items for s in self.stats.values()), default=0)
+        bottleneck = max(self.stats.values(), key=lambda s: s.busy, default=None)
+
+        return {
+            "wall_s": round(self.wall_time, 4),
+            "frames": frames,
+            "fps": round(frames / self.wall_time, 2) if self.wall_time > 0 else 0.0,
+            "bottleneck": bottleneck.name if bottleneck else None,
+            "stages": stages
+        }
+
+
+def format_report(report):
+    lines = [
+        f"{report['frames']} frames in {report['wall_s']:.2f}s "
+        f"→ {report['fps']:.1f} FPS (bottleneck: {report['bottleneck']})"
+    ]
+    for name, s in report["stages"].items():
+        lines.append(
+            f"  {name:<10} busy {s['busy_pct']:5.1f}%  "
+            f"{s['ms_per_item']:7.2f} ms/frame  ({s['items']} items)"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,266 @@
+"""
+Decode and detection in separate processes, frames passed through a
+shared-memory ring instead of pickled queues.
+
+    decoder process ──(slot, index, ts)──▶ detector processes ──(index, slot, dets)──▶ main
+          ▲                                                                               │
+          └──────────────────────────────── free slot ◀───────────────────────────────────┘
+
+- The decoder reads each frame straight into a free ring slot (cap.read(image=slot)).
+- Detector processes run on the slot view in place: no pixel copies, no pickling.
+- The main process reorders results by frame index, runs tracking / export
+  (and draws / writes the annotated video from the slot), then frees the slot.
+
+Only slot / frame indices, timestamps and detection tuples cross the queues.
+A slot is freed by the main process only, so at most `slots` frames are in
+flight and a slow consumer blocks the decoder (backpressure).
+
+With metrics enabled here, the children record their own `read` /
+`infer` / `filter` timers and send them back with their last message.
+
+Detection is stateless per frame here (no search window / stride / motion
+gate): frames reach the detectors out of order and in parallel.
+"""
+import multiprocessing as mp
+import os
+import queue
+import time
+import traceback
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from src.pipeline.stages import FramePacket, TrackStage, ExportStage
+from src.utils.json_exporter import BallJSONExporter
+from src.utils.metrics import metrics
+from src.visualization.renderer import OverlayRenderer
+
+_POLL = 0.1
+
+
+class FrameRing:
+    """`slots` frames of `shape` (uint8) in one SharedMemory block."""
+
+    def __init__(self, shape, slots, name=None):
+        self.shape = tuple(shape)
+        self.slots = slots
+        size = int(np.prod(self.shape)) * slots
+
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.name = self.shm.name
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=self.shm.buf)
+
+    def view(self, slot):
+        return self.frames[slot]
+
+    def spec(self):
+        """What another process needs to attach: FrameRing(*ring.spec())."""
+        return self.shape, self.slots, self.name
+
+    def close(self):
+        if self.owner:
+            self.shm.unlink()
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass        # a slot view is still referenced; the mapping goes with the process
+
+
+def _get(q, stop):
+    while not stop.is_set():
+        try:
+            return q.get(timeout=_POLL)
+        except queue.Empty:
+            continue
+    return None
+
+
+# ---------------- child processes ----------------
+def _decoder(video_path, ring_spec, free_q, ready_q, results, stop, workers, fps,
+             collect=False):
+    if collect:
+        metrics.enable()
+    ring = FrameRing(*ring_spec)
+    cap = cv2.VideoCapture(video_path)
+    index = 0
+    try:
+        while not stop.is_set():
+            slot = _get(free_q, stop)
+            if slot is None:
+                break
+
+            buf = ring.view(slot)
+            with metrics.timer("read"):
+                ok, frame = cap.read(image=buf)
+            if not ok:
+                free_q.put(slot)
+                break
+            if frame is not buf:            # backend did not decode in place
+                buf[:] = frame
+
+            ts = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if ts <= 0 and index > 0:
+                ts = index / fps
+
+            ready_q.put((slot, index, ts))
+            index += 1
+    except BaseException:
+        results.put(("error", "decoder", traceback.format_exc()))
+    finally:
+        cap.release()
+        for _ in range(workers):
+            ready_q.put(None)
+        results.put(("eof", index, metrics if collect else None))
+        ring.close()
+
+
+def _detector_worker(make_detector, threads, ring_spec, ready_q, results, stop,
+                     collect=False):
+    from src.pipeline.batch import _limit_threads
+    _limit_threads(threads)
+    if collect:
+        metrics.enable()
+
+    ring = FrameRing(*ring_spec)
+    try:
+        detector = make_detector()
+        while not stop.is_set():
+            msg = _get(ready_q, stop)
+            if msg is None:
+                break
+            slot, index, ts = msg
+            dets = detector.detect(ring.view(slot), frame_index=index)
+            results.put(("frame", index, ts, slot, dets))
+    except BaseException:
+        results.put(("error", f"detector {os.getpid()}", traceback.format_exc()))
+    finally:
+        results.put(("done", metrics if collect else None))
+        ring.close()
+
+
+# ---------------- driver ----------------
+def run_shm(video_path, make_detector, json_path, workers=2, threads_per_worker=1,
+            slots=None, video_out=None, track_kwargs=None, stream_path=None,
+            segmenter=None):
+    """
+    Track `video_path` with one decoder process, `workers` detector
+    processes and tracking / export in this process.
+
+    `make_detector` is a picklable zero-argument callable that builds the
+    detector inside each worker, e.g. functools.partial(YoloBallDetector, model_path).
+    `slots` (ring size) defaults to 4 per worker + 4.
+    Returns a report like run_headless.
+    """
+    from src.pipeline.offline import open_video_writer, _add_summary
+
+    cap = cv2.VideoCapture(video_path)
+    assert cap.isOpened(), f"❌ Failed to open video: {video_path}"
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+
+    slots = slots or 4 * workers + 4
+    ring = FrameRing((height, width, 3), slots)
+
+    ctx = mp.get_context("spawn")
+    free_q, ready_q, results = ctx.Queue(), ctx.Queue(), ctx.Queue()
+    stop = ctx.Event()
+    for slot in range(slots):
+        free_q.put(slot)
+
+    procs = [ctx.Process(
+        target=_decoder, name="decode",
+        args=(video_path, ring.spec(), free_q, ready_q, results, stop, workers, fps,
+              metrics.enabled)
+    )]
+    for i in range(workers):
+        procs.append(ctx.Process(
+            target=_detector_worker, name=f"detect-{i}",
+            args=(make_detector, threads_per_worker, ring.spec(), ready_q, results, stop,
+                  metrics.enabled)
+        ))
+
+    exporter = BallJSONExporter(
+        os.path.basename(video_path), fps, stream_path=stream_path, frame_height=height
+    )
+    writer = open_video_writer(video_out, fps, width, height) if video_out else None
+    export = ExportStage(exporter, writer, OverlayRenderer(fps))
+    track = TrackStage(fps=fps, segmenter=segmenter, **(track_kwargs or {}))
+
+    pending = {}
+    next_index = 0
+    total = None
+    done = 0
+    t0 = time.perf_counter()
+    try:
+        for p in procs:
+            p.start()
+
+        while total is None or next_index < total or done < workers:
+            try:
+                msg = results.get(timeout=_POLL)
+            except queue.Empty:
+                dead = [p.name for p in procs if p.exitcode not in (None, 0)]
+                assert not dead, f"❌ Process died: {dead}"
+                continue
+
+            kind = msg[0]
+            if kind == "error":
+                raise RuntimeError(f"{msg[1]} failed:\n{msg[2]}")
+            if kind == "eof":
+                total = msg[1]
+                metrics.merge(msg[2])
+            elif kind == "done":
+                done += 1
+                metrics.merge(msg[1])
+            else:
+                _, index, ts, slot, dets = msg
+                pending[index] = (ts, slot, dets)
+
+            # in frame order; free each slot as soon as its frame is exported
+            while next_index in pending:
+                ts, slot, dets = pending.pop(next_index)
+                metrics.count("frames")
+                packet = FramePacket(next_index, ts, ring.view(slot))
+                packet.detections = dets
+                export(track(packet))
+                packet = None
+                free_q.put(slot)
+                next_index += 1
+    finally:
+        stop.set()
+        for p in procs:
+            if p.pid is None:       # never started
+                continue
+            p.join(timeout=5)
+            if p.is_alive():
+                p.terminate()
+                p.join()
+        export.close()
+        exporter.close()
+        for q in (free_q, ready_q, results):
+            q.cancel_join_thread()
+            q.close()
+        ring.close()
+
+    wall = time.perf_counter() - t0
+    exporter.save(json_path)
+
+    report = {
+        "wall_s": round(wall, 4),
+        "frames": next_index,
+        "fps": round(next_index / wall, 2) if wall > 0 else 0.0,
+        "workers": workers,
+        "slots": slots
+    }
+    _add_summary(report, fps, exporter)
+    if segmenter is not None:
+        report["idle_ratio"] = round(segmenter.idle_ratio(), 3)
+    return report
@@ -0,0 +1,513 @@
+import time
+
+import cv2
+import numpy as np
+
+from src.analytics.bounce_detector import classify_pitch_m
+from src.tracking.kalman_filter import BallKalmanFilter
+from src.tracking.segmenter import START, RELEASED, BOUNCED, END, ABORT
+from src.tracking.tracker import BallTracker
+from src.association.data_association import associate_ball, associate_tracks
+from src.utils.geometry import PitchCalibration, perspective_scale
+from src.utils.metrics import metrics
+from src.visualization.renderer import OverlayRenderer
+
+
+class FramePacket:
+    """One frame travelling through the pipeline."""
+    __slots__ = ("index", "timestamp", "frame", "height", "detections", "track", "pool",
+                 "captured")
+
+    def __init__(self, index, timestamp, frame, height=None, pool=None):
+        self.index = index
+        self.timestamp = timestamp      # seconds, from the container
+        self.frame = frame              # None when replaying cached detections
+        self.height = frame.shape[0] if frame is not None else height
+        self.detections = []
+        self.track = None
+        self.pool = pool                # FramePool the frame came from
+        self.captured = None            # perf_counter() when it reached us (live sources)
+
+    def release(self):
+        """Hand the frame buffer back to its pool; the sink calls this last."""
+        if self.pool is not None:
+            self.pool.release(self.frame)
+            self.frame = None
+
+
+# ---------------- decode ----------------
+def decode_frames(cap, fps=30, pool=None):
+    """
+    Yield FramePackets from an opened cv2.VideoCapture.
+    With a FramePool, frames are read into recycled buffers; the sink
+    must call packet.release() once it is done with the frame.
+    """
+    index = 0
+    while True:
+        with metrics.timer("read"):
+            if pool is not None:
+                ret, frame = pool.read(cap)
+            else:
+                ret, frame = cap.read()
+        if not ret:
+            break
+        metrics.count("frames")
+
+        ts = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+        if ts <= 0 and index > 0:
+            ts = index / fps
+
+        yield FramePacket(index, ts, frame, pool=pool)
+        index += 1
+
+
+# ---------------- detect ----------------
+class DetectStage:
+    def __init__(self, detector):
+        self.detector = detector
+
+    def __call__(self, packet):
+        packet.detections = self.detector.detect(packet.frame, frame_index=packet.index)
+        return packet
+
+
+# ---------------- track ----------------
+class TrackStage:
+    """
+    BallTracker + associate_ball + speed / bounce / pitch analytics.
+    A BallKalmanFilter runs alongside on real frame timestamps so the
+    track can coast through frames where detection was skipped.
+    """
+
+    def __init__(self, fps=30, meters_per_pixel=20.12 / 520,
+                 perspective_gain=1.5, max_missed=15, association="nearest",
+                 kalman_kwargs=None, segmenter=None, calibration=None):
+        """
+        association: "nearest" — closest detection to BallTracker.predict()
+                     within 120 px; "gated" — Mahalanobis gate on the Kalman
+                     innovation covariance, then global assignment.
+        kalman_kwargs: q / r / p0 for the BallKalmanFilter.
+        segmenter: DeliverySegmenter; adds track["segment"] (state, events)
+                   and lets ExportStage / GuidedDetectStage follow it.
+        calibration: PitchCalibration (or its cache directory) fitted at
+                     this video's resolution (checked on the first frame,
+                     ValueError otherwise); replaces meters_per_pixel /
+                     perspective_gain with its per-row table and classifies
+                     pitch length in metres from the stumps.
+        """
+        self.tracker = BallTracker(fps=fps)
+        self.kalman = BallKalmanFilter(dt=1 / fps, **(kalman_kwargs or {}))
+        self.meters_per_pixel = meters_per_pixel
+        self.perspective_gain = perspective_gain
+        self.max_missed = max_missed
+        self.association = association
+        self.segmenter = segmenter
+        if isinstance(calibration, str):
+            calibration = PitchCalibration.load(calibration)
+        self.calibration = calibration
+        self._size_checked = calibration is None
+
+        self._last_ts = None
+
+    def _check_size(self, height, width=None):
+        # the row table is only valid at the calibration's resolution
+        if not self._size_checked and height is not None:
+            self.calibration.check_frame(height, width)
+            self._size_checked = True
+
+    def __call__(self, packet):
+        if packet.frame is not None:
+            self._check_size(packet.height, packet.frame.shape[1])
+        packet.track = self.step(
+            packet.detections, packet.height, packet.timestamp
+        )
+        return packet
+
+    def step(self, detections, frame_height, timestamp=None, coast=False):
+        """
+        coast=True: the detector did not run on this frame; advance the
+        track on the Kalman prediction instead of counting a miss.
+        """
+        self._check_size(frame_height)
+        tracker = self.tracker
+        kalman = self.kalman
+        predicted = tracker.predict() if tracker.initialized else None
+
+        dt = tracker.dt
+        if timestamp is not None and self._last_ts is not None:
+            dt = max(timestamp - self._last_ts, 1e-4)
+        self._last_ts = timestamp
+
+        if kalman.initialized:
+            with metrics.timer("kalman"):
+                kalman.predict(dt)
+
+        matched = None
+        coasted = False
+        metrics.count("detections", len(detections))
+        if coast:
+            if kalman.initialized and tracker.initialized:
+                kx, ky = kalman.get_position()
+                tracker.update((int(kx), int(ky)))
+                coasted = True
+        elif len(detections):
+            tracker.missed_frames = 0
+            with metrics.timer("associate"):
+                if not tracker.initialized:
+                    matched = detections[0]
+                elif self.association == "gated" and kalman.initialized:
+                    matched = self._associate_gated(detections)
+                else:
+                    matched = associate_ball(detections, predicted)
+
+            if matched is not None:
+                cx, cy, *_ = matched
+                tracker.update((int(cx), int(cy)))
+
+                with metrics.timer("kalman"):
+                    if kalman.initialized:
+                        kalman.update((cx, cy))
+                    else:
+                        kalman.init(cx, cy)
+        else:
+            tracker.missed_frames += 1
+
+        if coasted:
+            metrics.count("coasted")
+        elif matched is None:
+            metrics.count("misses")
+
+        reset = False
+        if tracker.missed_frames > self.max_missed:
+            tracker.reset()
+            kalman.reset()
+            reset = True
+            metrics.count("track_resets")
+
+        track = {
+            "position": None,
+            "predicted": predicted,
+            "matched": matched,
+            "coasted": coasted,
+            "velocity": (0.0, 0.0),
+            "speed": 0.0,
+            "release_speed": None,
+            "max_speed": 0.0,
+            "bounced": False,
+            "pitch_type": None,
+            "release_point": None,
+            "reset": reset
+        }
+
+        if tracker.initialized:
+            with metrics.timer("analytics"):
+                x, y = tracker.get_position()
+                if self.calibration is not None:
+                    mpp, scale = self.calibration.meters_per_pixel(y), 1.0
+                else:
+                    mpp = self.meters_per_pixel
+                    scale = perspective_scale(y, frame_height, self.perspective_gain)
+
+                track["position"] = (x, y)
+                track["velocity"] = (tracker.vx, tracker.vy)
+                track["speed"] = tracker.get_speed_kmph(mpp, scale)
+
+                if not coasted and tracker.detect_bounce():
+                    tracker.pitch_type = self._classify_pitch(frame_height)
+                    track["bounced"] = True
+
+                track["release_speed"] = tracker.release_speed
+                track["max_speed"] = tracker.max_speed
+                track["pitch_type"] = tracker.pitch_type
+                track["release_point"] = tracker.release_point
+
+        if self.segmenter is not None:
+            seg = self.segmenter
+            state, events = seg.step(track)
+            track["segment"] = {
+                "state": state,
+                "events": events,
+                "release_frame": seg.release_frame,
+                "release_point": seg.release_point
+            }
+
+        return track
+
+    def _classify_pitch(self, frame_height):
+        if self.calibration is None:
+            return self.tracker.classify_pitch(frame_height)
+        # detect_bounce() fires one frame after the lowest point
+        bx, by = self.tracker.positions[-2]
+        return classify_pitch_m([self.calibration.to_pitch(bx, by)[1]])[0]
+
+    def _associate_gated(self, detections):
+        kalman = self.kalman
+        S = kalman.P[:2, :2] + kalman.R
+        matches, _, _ = associate_tracks(
+            detections, kalman.x[:2, 0][None], S[None]
+        )
+        return detections[matches[0][1]] if matches else None
+
+
+# ---------------- detect + track ----------------
+class GuidedDetectStage:
+    """
+    Detection and tracking in one stage so the detector can use the
+    tracker state for the *current* frame. (A separate detect thread
+    would only see a prediction that is several queued frames old.)
+
+    - search-window mode: crop around the Kalman prediction
+      (enable `roi_mode` on the detector)
+    - adaptive stride: with a `scheduler`, skipped frames coast on the filter
+    - idle mode: with a segmenter on the track stage, IDLE frames are
+      detected every `idle_stride` frames at `idle_imgsz`
+    """
+
+    def __init__(self, detector, track_stage, scheduler=None):
+        self.detector = detector
+        self.track_stage = track_stage
+        self.scheduler = scheduler
+
+        self._released = False
+
+    def __call__(self, packet):
+        stage = self.track_stage
+        tracker = stage.tracker
+        kalman = stage.kalman
+
+        run_detector = True
+        extra = {}
+        seg = stage.segmenter
+        if seg is not None and seg.idle:
+            run_detector = packet.index % seg.idle_stride == 0
+            if seg.idle_imgsz:
+                extra["imgsz"] = seg.idle_imgsz
+        elif self.scheduler is not None:
+            run_detector = self.scheduler.should_detect(kalman)
+
+        if run_detector:
+            predicted = velocity = covariance = None
+            horizon = tracker.dt
+            if kalman.initialized:
+                # one step ahead of the filter, on the nominal frame time
+                x, y, vx, vy = kalman.x.flatten()
+                horizon = kalman.dt
+                predicted = (x + vx * horizon, y + vy * horizon)
+                velocity = (vx, vy)
+                covariance = kalman.P
+            elif tracker.initialized:
+                predicted = tracker.predict()
+                velocity = (tracker.vx, tracker.vy)
+                # prediction is from the last matched position
+                horizon = tracker.dt * (tracker.missed_frames + 1)
+
+            packet.detections = self.detector.detect(
+                packet.frame, predicted, velocity=velocity,
+                covariance=covariance, dt=horizon, frame_index=packet.index, **extra
+            )
+        else:
+            packet.detections = []
+
+        packet.track = stage.step(
+            packet.detections, packet.height, packet.timestamp,
+            coast=not run_detector
+        )
+
+        if self.scheduler is not None:
+            self.scheduler.observe(
+                kalman,
+                detected=run_detector,
+                matched=packet.track["matched"] is not None,
+                event=self._is_event(packet.track)
+            )
+
+        return packet
+
+    def _is_event(self, track):
+        if track["reset"] or track["position"] is None:
+            self._released = False
+            return False
+
+        if track["bounced"]:
+            return True
+
+        # full rate until release speed is known, and just after it
+        if track["release_speed"] is None:
+            return True
+        if not self._released:
+            self._released = True
+            return True
+        return False
+
+
+# ---------------- export ----------------
+class ExportStage:
+    """
+    Turns per-frame track results into BallJSONExporter deliveries and,
+    optionally, writes an annotated video. No GUI calls.
+    """
+
+    def __init__(self, exporter, video_writer=None, renderer=None):
+        self.exporter = exporter
+        self.video_writer = video_writer
+        self.renderer = renderer
+        if video_writer is not None and renderer is None:
+            self.renderer = OverlayRenderer()
+
+        self._released = False
+        self._pitch_type = None
+        self._prev = None
+        self._last_index = 0
+
+    def __call__(self, packet):
+        with metrics.timer("export"):
+            self.record(packet.index, packet.track)
+
+        if self.video_writer is not None and packet.frame is not None:
+            # last consumer of the frame: drawing in place is safe here
+            frame = packet.frame
+            with metrics.timer("draw"):
+                self.renderer.update(packet.track)
+                self.renderer.draw(frame, packet.detections, packet.track)
+            with metrics.timer("write"):
+                self.video_writer.write(frame)
+
+        packet.release()
+        return True
+
+    def record(self, index, track):
+        if "segment" in track:
+            return self._record_segmented(index, track)
+
+        exporter = self.exporter
+        self._last_index = index
+
+        if track["reset"] and exporter.current_delivery:
+            self._finalize(index)
+
+        if track["position"] is None:
+            return
+
+        x, y = track["position"]
+        if exporter.current_delivery is None:
+            exporter.start_delivery(index)
+            self._released = False
+            self._pitch_type = None
+            self._prev = None
+
+        matched = track["matched"]
+        if matched is not None:
+            vx, vy = track["velocity"]
+            exporter.add_position(x, y, frame=index, vx=vx, vy=vy, conf=matched[6])
+        exporter.update_speed(track["speed"])
+
+        if track["release_speed"] and not self._released:
+            rx, ry = track["release_point"] or (x, y)
+            exporter.set_release(index, rx, ry, track["release_speed"])
+            self._released = True
+
+        if track["bounced"] and self._prev is not None:
+            exporter.set_bounce(*self._prev)
+            self._pitch_type = track["pitch_type"]
+
+        self._prev = (index, x, y)
+
+    def _record_segmented(self, index, track):
+        """Exporter driven by DeliverySegmenter events instead of track resets."""
+        exporter = self.exporter
+        seg = track["segment"]
+        self._last_index = index
+
+        for event in seg["events"]:
+            if event == END and exporter.current_delivery:
+                self._finalize(index)
+            elif event == ABORT:
+                exporter.discard_delivery()
+            elif event == START:
+                exporter.start_delivery(index)
+                self._pitch_type = None
+                self._prev = None
+            elif event == RELEASED:
+                rx, ry = seg["release_point"]
+                # the tracker's release speed, as in record() and the HUD
+                speed = track["release_speed"] or track["speed"]
+                exporter.set_release(seg["release_frame"], rx, ry, speed)
+            elif event == BOUNCED and self._prev is not None:
+                exporter.set_bounce(*self._prev)
+                self._pitch_type = track["pitch_type"]
+
+        if exporter.current_delivery is None or track["position"] is None:
+            return
+
+        x, y = track["position"]
+        matched = track["matched"]
+        if matched is not None:
+            vx, vy = track["velocity"]
+            exporter.add_position(x, y, frame=index, vx=vx, vy=vy, conf=matched[6])
+        exporter.update_speed(track["speed"])
+        self._prev = (index, x, y)
+
+    def _finalize(self, end_frame):
+        self.exporter.finalize_delivery(end_frame, self._pitch_type)
+
+    def close(self):
+        if self.exporter.current_delivery:
+            self._finalize(self._last_index)
+        if self.video_writer is not None:
+            self.video_writer.release()
+
+
+# ---------------- render ----------------
+class RenderStage:
+    """
+    Draws overlays and shows the frame. Runs on the main thread.
+    The frame is resized once into a reused display buffer and the
+    overlays are drawn there (scaled), so the source frame stays clean
+    and can go straight back to its pool.
+    """
+
+    def __init__(self, window="Cricket Ball Tracking", display_size=(1000, 600),
+                 show=True, fps=30):
+        self.window = window
+        self.display_size = display_size
+        self.show = show
+        self.renderer = OverlayRenderer(fps)
+
+        self._frames = 0
+        self._fps_time = time.time()
+        self._display_fps = 0
+        self._canvas = None
+
+    def __call__(self, packet):
+        self._frames += 1
+        if time.time() - self._fps_time >= 1.0:
+            self._display_fps = self._frames
+            self._frames = 0
+            self._fps_time = time.time()
+
+        frame = packet.frame
+        h, w = frame.shape[:2]
+        dw, dh = self.display_size
+        if self._canvas is None:
+            self._canvas = np.empty((dh, dw, 3), dtype=frame.dtype)
+        canvas = self._canvas
+
+        with metrics.timer("draw"):
+            cv2.resize(frame, (dw, dh), dst=canvas)
+            packet.release()
+
+            self.renderer.update(packet.track)
+            self.renderer.draw(canvas, packet.detections, packet.track,
+                               self._display_fps, scale=(dw / w, dh / h))
+
+        if not self.show:
+            return True
+
+        with metrics.timer("display"):
+            cv2.imshow(self.window, canvas)
+            key = cv2.waitKey(1) & 0xFF
+        return key != ord("q")
+
+    def close(self):
+        if self.show:
+            cv2.destroyAllWindows()
@@ -1,14 +1,22 @@
 import numpy as np
 
+from src.tracking.smoother import rts_smooth
+
 class BallKalmanFilter:
     """
     Kalman Filter for cricket ball tracking
     State: [x, y, vx, vy]
     Measurement: [x, y]
+
+    Constant-velocity model with H = [I 0], so predict / update are
+    written out in closed form (2x2 innovation inverse, block updates of P)
+    and work in place on preallocated buffers. `x` and `P` are updated in
+    place — read them freely, but don't rebind them.
     """
 
-    def __init__(self, dt=1/30):
+    def __init__(self, dt=1/30, q=0.1, r=10.0, p0=500.0):
         self.dt = dt
+        self.p0 = p0
 
         # -------- State --------
         # x = [x, y, vx, vy]
@@ -20,47 +28,124 @@ class BallKalmanFilter:
             [0, 1, 0, dt],
             [0, 0, 1,  0],
             [0, 0, 0,  1]
-        ])
+        ], dtype=float)
 
         # -------- Measurement Model --------
         self.H = np.array([
             [1, 0, 0, 0],
             [0, 1, 0, 0]
-        ])
+        ], dtype=float)
 
         # -------- Covariances --------
-        self.P = np.eye(4) * 500        # Initial uncertainty
-        self.R = np.eye(2) * 10         # Measurement noise
-        self.Q = np.eye(4) * 0.1        # Process noise
+        self.P = np.eye(4) * p0         # Initial uncertainty
+        self.R = np.eye(2) * r          # Measurement noise
+        self.Q = np.eye(4) * q          # Process noise
 
         self.initialized = False
 
+        # last innovation and its normalised squared size (chi-square, 2 dof)
+        self.innovation = np.zeros((2, 1))
+        self.nis = 0.0
+
+        # -------- Scratch buffers / views --------
+        self._F = self.F.copy()         # transition for the current dt
+        self._FT = self._F.T
+        self._P_top = self.P[0:2, :]    # = H P
+        self._P_left = self.P[:, 0:2]   # = P H^T
+
+        self._t41 = np.empty((4, 1))
+        self._t44 = np.empty((4, 4))
+        self._S_inv = np.empty((2, 2))
+        self._K = np.empty((4, 2))
+
     # ------------------------------------
     def init(self, x, y):
         """Initialize filter with first detection"""
-        self.x = np.array([[x], [y], [0], [0]])
+        self.x[:, 0] = (x, y, 0.0, 0.0)
+        self._reset_P()
         self.initialized = True
 
+    def reset(self):
+        self.x.fill(0.0)
+        self._reset_P()
+        self.initialized = False
+
+    def _reset_P(self):
+        self.P.fill(0.0)
+        self.P.flat[::5] = self.p0
+
     # ------------------------------------
-    def predict(self):
-        """Predict next state"""
-        self.x = self.F @ self.x
-        self.P = self.F @ self.P @ self.F.T + self.Q
-        return self.x[:2].flatten()
+    def predict(self, dt=None):
+        """
+        Predict next state.
+        dt: real time since the last step (s). Defaults to the nominal
+        frame time; process noise is scaled by dt / nominal dt.
+        """
+        if dt is None:
+            dt = self.dt
+
+        F = self._F
+        if F[0, 2] != dt:
+            F[0, 2] = F[1, 3] = dt
+
+        # x = F x
+        np.dot(F, self.x, out=self._t41)
+        np.copyto(self.x, self._t41)
+
+        # P = F P F^T + Q
+        np.dot(F, self.P, out=self._t44)
+        np.dot(self._t44, self._FT, out=self.P)
+
+        if dt == self.dt:
+            np.add(self.P, self.Q, out=self.P)
+        else:
+            np.multiply(self.Q, dt / self.dt, out=self._t44)
+            np.add(self.P, self._t44, out=self.P)
+
+        return self.x[0, 0], self.x[1, 0]
 
     # ------------------------------------
     def update(self, z):
         """
         z: measurement [x, y]
         """
-        z = np.array(z).reshape(2, 1)
+        if isinstance(z, np.ndarray):
+            zx, zy = float(z.flat[0]), float(z.flat[1])
+        else:
+            zx, zy = z
+
+        P, R = self.P, self.R
+        y0 = zx - self.x[0, 0]
+        y1 = zy - self.x[1, 0]
+
+        # S = H P H^T + R, inverted in closed form
+        a = P[0, 0] + R[0, 0]
+        b = P[0, 1] + R[0, 1]
+        c = P[1, 0] + R[1, 0]
+        d = P[1, 1] + R[1, 1]
+        det = a * d - b * c
+        i00, i01, i10, i11 = d / det, -b / det, -c / det, a / det
+
+        S_inv = self._S_inv
+        S_inv[0, 0] = i00
+        S_inv[0, 1] = i01
+        S_inv[1, 0] = i10
+        S_inv[1, 1] = i11
 
-        y = z - (self.H @ self.x)
-        S = self.H @ self.P @ self.H.T + self.R
-        K = self.P @ self.H.T @ np.linalg.inv(S)
+        self.innovation[0, 0] = y0
+        self.innovation[1, 0] = y1
+        self.nis = float(y0 * (i00 * y0 + i01 * y1) + y1 * (i10 * y0 + i11 * y1))
 
-        self.x = self.x + K @ y
-        self.P = (np.eye(4) - K @ self.H) @ self.P
+        # K = P H^T S^-1
+        np.dot(self._P_left, S_inv, out=self._K)
+
+        # x = x + K y
+        np.dot(self._K, self.innovation, out=self._t41)
+        np.add(self.x, self._t41, out=self.x)
+
+        # P = (I - K H) P = P - K (H P)
+        np.dot(self._K, self._P_top, out=self._t44)
+        np.subtract(P, self._t44, out=P)
 
     # ------------------------------------
     def get_position(self):
@@ -68,3 +153,133 @@ class BallKalmanFilter:
 
     def get_velocity(self):
         return self.x[2, 0], self.x[3, 0]
+
+    def get_state(self):
+        return self.x.flatten()
+
+    def position_std(self):
+        """Largest 1-sigma position uncertainty (px)."""
+        return float(np.sqrt(max(self.P[0, 0], self.P[1, 1])))
+
+    # ------------------------------------
+    def smooth(self, measurements, timestamps=None):
+        """Offline RTS pass over a whole delivery with this filter's noise model."""
+        return rts_smooth(
+            measurements, timestamps, dt=self.dt,
+            q=self.Q[0, 0], r=self.R[0, 0], p0=self.p0
+        )
+
+
+class BatchKalmanFilter:
+    """
+    N independent constant-velocity tracks in one set of arrays.
+
+    x: (N, 4) states, P: (N, 4, 4) covariances. `predict` and `update`
+    run over all tracks in a single vectorized call, in place.
+    """
+
+    def __init__(self, n, dt=1/30, q=0.1, r=10.0, p0=500.0):
+        self.n = n
+        self.dt = dt
+        self.p0 = p0
+
+        self.x = np.zeros((n, 4))
+        self.P = np.zeros((n, 4, 4))
+        self.P[:, range(4), range(4)] = p0
+        self.Q = np.eye(4) * q
+        self.R = np.eye(2) * r
+
+        self.innovation = np.zeros((n, 2))
+        self.nis = np.zeros(n)
+
+        # -------- Scratch buffers --------
+        self._t2 = np.empty((n, 2))
+        self._t24 = np.empty((n, 2, 4))
+        self._t42 = np.empty((n, 4, 2))
+        self._t44 = np.empty((n, 4, 4))
+        self._t41 = np.empty((n, 4, 1))
+        self._S = np.empty((n, 2, 2))
+        self._S_inv = np.empty((n, 2, 2))
+        self._det = np.empty(n)
+        self._tmp = np.empty(n)
+        self._K = np.empty((n, 4, 2))
+        self._missing = np.empty((n, 1), dtype=bool)
+
+    # ------------------------------------
+    def init(self, idx, xy):
+        """(Re)start tracks `idx` at positions `xy` (M, 2) with zero velocity."""
+        self.x[idx, 0:2] = xy
+        self.x[idx, 2:4] = 0.0
+        self.P[idx] = np.eye(4) * self.p0
+
+    # ------------------------------------
+    def predict(self, dt=None):
+        """dt: scalar or (N,) per-track time step (s)."""
+        if dt is None:
+            dt = self.dt
+
+        x, P = self.x, self.P
+        if np.ndim(dt) == 0:
+            dt_x = dt_p = dt
+            q_scale = dt / self.dt
+        else:
+            dt = np.asarray(dt, dtype=float)
+            dt_x = dt[:, None]
+            dt_p = dt[:, None, None]
+            q_scale = (dt / self.dt)[:, None, None]
+
+        np.multiply(x[:, 2:4], dt_x, out=self._t2)
+        np.add(x[:, 0:2], self._t2, out=x[:, 0:2])
+
+        np.multiply(P[:, 2:4, :], dt_p, out=self._t24)
+        np.add(P[:, 0:2, :], self._t24, out=P[:, 0:2, :])
+        np.multiply(P[:, :, 2:4], dt_p, out=self._t42)
+        np.add(P[:, :, 0:2], self._t42, out=P[:, :, 0:2])
+
+        np.multiply(self.Q, q_scale, out=self._t44)
+        np.add(P, self._t44, out=P)
+        return x[:, 0:2]
+
+    # ------------------------------------
+    def update(self, z):
+        """
+        z: (N, 2) measurements. Rows containing NaN are treated as
+        missing and leave their track untouched.
+        """
+        x, P = self.x, self.P
+        y, S, S_inv, det = self.innovation, self._S, self._S_inv, self._det
+
+        np.subtract(z, x[:, 0:2], out=y)
+        np.isnan(y[:, 0:1], out=self._missing)
+        np.copyto(y, 0.0, where=self._missing)
+
+        # S = H P H^T + R, inverted in closed form per track
+        np.add(P[:, 0:2, 0:2], self.R, out=S)
+        np.multiply(S[:, 0, 0], S[:, 1, 1], out=det)
+        np.multiply(S[:, 0, 1], S[:, 1, 0], out=self._tmp)
+        np.subtract(det, self._tmp, out=det)
+
+        np.divide(S[:, 1, 1], det, out=S_inv[:, 0, 0])
+        np.divide(S[:, 0, 0], det, out=S_inv[:, 1, 1])
+        np.divide(S[:, 0, 1], det, out=S_inv[:, 0, 1])
+        np.negative(S_inv[:, 0, 1], out=S_inv[:, 0, 1])
+        np.divide(S[:, 1, 0], det, out=S_inv[:, 1, 0])
+        np.negative(S_inv[:, 1, 0], out=S_inv[:, 1, 0])
+
+        np.einsum("ni,nij,nj->n", y, S_inv, y, out=self.nis)
+
+        # K = P H^T S^-1, zeroed for missing measurements
+        np.matmul(P[:, :, 0:2], S_inv, out=self._K)
+        np.copyto(self._K, 0.0, where=self._missing[:, :, None])
+
+        # x = x + K y
+        np.matmul(self._K, y[:, :, None], out=self._t41)
+        np.add(x, self._t41[:, :, 0], out=x)
+
+        # P = P - K (H P)
+        np.matmul(self._K, P[:, 0:2, :], out=self._t44)
+        np.subtract(P, self._t44, out=P)
+
+    # ------------------------------------
+    def position_std(self):
+        return np.sqrt(np.maximum(self.P[:, 0, 0], self.P[:, 1, 1]))
@@ -0,0 +1,351 @@
+"""
+Several balls at once (nets, training drills): every live track in one
+set of arrays instead of one BallTracker + BallKalmanFilter per ball.
+
+    tracker = MultiBallTracker(fps=30)
+    for detections in frames:
+        events = tracker.step(detections, frame_height)
+        for track_id, event in events: ...
+        snapshot = tracker.tracks()
+    tracker.finish()
+    tracker.deliveries      # release / max speed, bounce, pitch per delivery
+
+Per-slot arrays (capacity doubles when full): Kalman state / covariance
+in a BatchKalmanFilter, plus ids, age, hits, misses, speeds, delivery
+state and bounce bookkeeping. Each frame is one batched predict, one
+gated global assignment (associate_tracks), one batched update, and
+masked array ops for births, retirements and delivery events; Python
+only loops over the events themselves.
+
+Per-track delivery lifecycle (segmenter state names):
+
+    RUN_UP → FLIGHT (release) → POST_BOUNCE (bounce) → IDLE (delivery over)
+
+RUN_UP → FLIGHT when speed stays above release_kmph for release_hits
+frames; FLIGHT → POST_BOUNCE once the filtered vertical velocity has
+gone from falling to rising (both beyond min_turn); post_bounce_frames later (or
+max_flight_frames without a bounce) the delivery ENDs and the track
+keeps following the ball silently until it is lost. A track lost while
+in RUN_UP is an ABORT, lost in FLIGHT / POST_BOUNCE an END.
+"""
+import numpy as np
+
+from src.analytics.bounce_detector import classify_pitch, classify_pitch_m
+from src.association.data_association import GATE_99, associate_tracks, linear_assignment
+from src.tracking.kalman_filter import BatchKalmanFilter
+from src.tracking.segmenter import (
+    IDLE, RUN_UP, FLIGHT, POST_BOUNCE, START, RELEASED, BOUNCED, END, ABORT
+)
+from src.utils.geometry import perspective_scale
+
+STATES = (RUN_UP, FLIGHT, POST_BOUNCE, IDLE)
+_RUN_UP, _FLIGHT, _POST_BOUNCE, _IDLE = range(4)
+
+
+class MultiBallTracker:
+    def __init__(self, fps=30, capacity=8, max_missed=15, gate=GATE_99, max_dist=80.0,
+                 meters_per_pixel=20.12 / 520, perspective_gain=1.5, calibration=None,
+                 release_kmph=30.0, release_hits=3, post_bounce_frames=20,
+                 max_flight_frames=90, min_turn=30.0, init_speed_std=600.0,
+                 accel_std=1500.0, kalman_kwargs=None):
+        """
+        gate / max_dist: tracks are matched on the Mahalanobis gate
+                  first; tracks and detections left over are then paired
+                  by nearest distance up to max_dist px (the bounce
+                  itself is far outside a constant-velocity gate).
+        init_speed_std: px/s, 1-sigma of a new track's unknown velocity.
+                  BatchKalmanFilter's p0 alone (~22 px/s) makes the
+                  gate lose a fast ball on its second or third frame.
+        accel_std: px/s^2, process noise as white acceleration (gravity,
+                  swing) instead of kalman_kwargs["q"] on the diagonal,
+                  which cannot follow a falling ball.
+        min_turn: px/s the vertical velocity must reach on both sides of
+                  the turn for it to count as a bounce (filters jitter).
+        calibration: PitchCalibration; as TrackStage.
+        """
+        self.fps = fps
+        self.dt = 1.0 / fps
+        self.max_missed = max_missed
+        self.gate = gate
+        self.max_dist = max_dist
+        self.meters_per_pixel = meters_per_pixel
+        self.perspective_gain = perspective_gain
+        self.calibration = calibration
+        self.release_kmph = release_kmph
+        self.release_hits = release_hits
+        self.post_bounce_frames = post_bounce_frames
+        self.max_flight_frames = max_flight_frames
+        self.min_turn = min_turn
+        self.init_speed_std = init_speed_std
+        self.accel_std = accel_std
+        self.kalman_kwargs = dict(kalman_kwargs or {})
+
+        self.frame = -1
+        self.next_id = 0
+        self.deliveries = []        # one summary per ENDed delivery
+        self._last_ts = None
+        self._allocate(capacity)
+
+    # ---------------- storage ----------------
+    def _allocate(self, capacity):
+        old = getattr(self, "kf", None)
+        n = 0 if old is None else old.n
+
+        kf = BatchKalmanFilter(capacity, dt=self.dt, **self.kalman_kwargs)
+        if self.accel_std is not None:
+            dt = self.dt
+            g = np.array([[dt * dt / 2, 0], [0, dt * dt / 2], [dt, 0], [0, dt]])
+            kf.Q[:] = g @ g.T * self.accel_std ** 2
+        cols = {
+            "alive": (bool, False),
+            "ids": (np.int64, -1),
+            "age": (np.int64, 0),
+            "hits": (np.int64, 0),
+            "misses": (np.int64, 0),
+            "state": (np.int8, _RUN_UP),
+            "since": (np.int64, 0),         # frames in the current state
+            "fast": (np.int64, 0),          # consecutive frames above release_kmph
+            "speed": (np.float64, 0.0),
+            "max_speed": (np.float64, 0.0),
+            "release_speed": (np.float64, np.nan),
+            "fall_vy": (np.float64, 0.0),   # fastest downward vy since release
+            "low_frame": (np.int64, -1),
+            "bounce_frame": (np.int64, -1),
+        }
+        arrays = {k: np.full(capacity, fill, dtype=dt) for k, (dt, fill) in cols.items()}
+        arrays["low"] = np.zeros((capacity, 2))     # lowest point (max y) in flight
+        arrays["bounce"] = np.full((capacity, 2), np.nan)
+        arrays["pitch"] = np.full(capacity, None, dtype=object)
+
+        if old is not None:
+            kf.x[:n] = old.x
+            kf.P[:n] = old.P
+            for k, a in arrays.items():
+                a[:n] = getattr(self, k)
+        self.kf = kf
+        for k, a in arrays.items():
+            setattr(self, k, a)
+
+        self._z = np.empty((capacity, 2))
+
+    @property
+    def capacity(self):
+        return self.kf.n
+
+    def __len__(self):
+        return int(self.alive.sum())
+
+    # ---------------- per frame ----------------
+    def step(self, detections, frame_height, timestamp=None):
+        """
+        detections: (cx, cy, ...) tuples or an (N, >=2) array.
+        Returns [(track_id, event), ...] for this frame.
+        """
+        self.frame += 1
+        if self.frame == 0 and self.calibration is not None:
+            self.calibration.check_frame(frame_height)
+        dt = self.dt
+        if timestamp is not None and self._last_ts is not None:
+            dt = max(timestamp - self._last_ts, 1e-4)
+        self._last_ts = timestamp
+
+        events = []
+        kf = self.kf
+        kf.predict(dt)
+
+        live = np.flatnonzero(self.alive)
+        det_xy = (np.asarray([d[:2] for d in detections], dtype=np.float64).reshape(-1, 2)
+                  if not isinstance(detections, np.ndarray) else
+                  detections[:, :2].astype(np.float64))
+
+        # -------- associate + update --------
+        matches, left, spare = associate_tracks(
+            det_xy, kf.x[live, 0:2], kf.P[live, 0:2, 0:2] + kf.R, self.gate
+        )
+        if left and spare:
+            extra, spare = self._nearest(kf.x[live[left], 0:2], det_xy[spare], spare)
+            matches += [(left[t], d) for t, d in extra]
+
+        z = self._z
+        z.fill(np.nan)
+        matched = np.zeros(self.capacity, dtype=bool)
+        if matches:
+            t, d = np.array(matches).T
+            z[live[t]] = det_xy[d]
+            matched[live[t]] = True
+        kf.update(z)
+
+        self.age[live] += 1
+        self.hits[matched] += 1
+        self.misses[matched] = 0
+        self.misses[live] += ~matched[live]
+        self.since[live] += 1
+
+        # -------- retire lost tracks --------
+        lost = live[self.misses[live] > self.max_missed]
+        self._close(lost, events)
+        self.alive[lost] = False
+
+        self._analytics(matched, frame_height, events)
+
+        # -------- births (may grow the arrays) --------
+        if spare:
+            self._spawn(det_xy[spare], events)
+        return events
+
+    def _nearest(self, pred_xy, det_xy, det_idx):
+        """Second pass: Euclidean assignment within max_dist."""
+        dist = np.hypot(det_xy[None, :, 0] - pred_xy[:, None, 0],
+                        det_xy[None, :, 1] - pred_xy[:, None, 1])
+        inside = dist < self.max_dist
+        rows, cols = linear_assignment(np.where(inside, dist, 1e9))
+        ok = inside[rows, cols]
+        pairs = [(int(r), det_idx[c]) for r, c in zip(rows[ok], cols[ok])]
+        used = {det_idx[c] for c in cols[ok]}
+        return pairs, [d for d in det_idx if d not in used]
+
+    def _spawn(self, xy, events):
+        free = np.flatnonzero(~self.alive)
+        if len(free) < len(xy):
+            self._allocate(max(2 * self.capacity, self.capacity + len(xy)))
+            free = np.flatnonzero(~self.alive)
+        idx = free[:len(xy)]
+
+        self.kf.init(idx, xy)
+        self.kf.P[idx, 2, 2] = self.kf.P[idx, 3, 3] = self.init_speed_std ** 2
+        ids = self.next_id + np.arange(len(xy))
+        self.next_id += len(xy)
+
+        self.alive[idx] = True
+        self.ids[idx] = ids
+        for k in ("age", "hits", "misses", "since", "fast"):
+            getattr(self, k)[idx] = 0
+        self.hits[idx] = 1
+        self.state[idx] = _RUN_UP
+        self.speed[idx] = self.max_speed[idx] = self.fall_vy[idx] = 0.0
+        self.release_speed[idx] = np.nan
+        self.low[idx] = xy
+        self.low_frame[idx] = self.bounce_frame[idx] = -1
+        self.bounce[idx] = np.nan
+        self.pitch[idx] = None
+        events.extend((int(i), START) for i in ids)
+
+    def _analytics(self, matched, frame_height, events):
+        live = np.flatnonzero(self.alive)
+        if not len(live):
+            return
+        x = self.kf.x[live]
+        y = x[:, 1]
+        vy = x[:, 3]
+
+        # -------- speed --------
+        if self.calibration is not None:
+            rows = np.clip(y.astype(np.int64), 0, self.calibration.size[1] - 1)
+            mpp = self.calibration.rows[rows]
+        else:
+            mpp = self.meters_per_pixel * perspective_scale(y, frame_height, self.perspective_gain)
+        speed = np.hypot(x[:, 2], x[:, 3]) * mpp * 3.6
+        self.speed[live] = speed
+        self.max_speed[live] = np.maximum(self.max_speed[live], speed)
+
+        state = self.state[live]
+        since = self.since[live]
+        ids = self.ids[live]
+
+        # -------- release --------
+        fast = np.where(speed > self.release_kmph, self.fast[live] + 1, 0)
+        self.fast[live] = fast
+        released = (state == _RUN_UP) & (fast >= self.release_hits)
+        if released.any():
+            r = live[released]
+            self.release_speed[r] = speed[released]
+            self.state[r] = _FLIGHT
+            self.since[r] = 0
+            self.low[r] = x[released, 0:2]
+            self.low_frame[r] = self.frame
+            self.fall_vy[r] = 0.0
+
+        # -------- bounce --------
+        flying = (state == _FLIGHT) & ~released
+        m = matched[live]
+        z = self._z[live]
+        lower = flying & m & (z[:, 1] > self.low[live, 1])
+        self.low[live[lower]] = z[lower]
+        self.low_frame[live[lower]] = self.frame
+
+        fall_vy = np.where(flying & m, np.maximum(self.fall_vy[live], vy), self.fall_vy[live])
+        self.fall_vy[live] = fall_vy
+        turned = flying & m & (fall_vy > self.min_turn) & (vy < -self.min_turn)
+        if turned.any():
+            b = live[turned]
+            # the turn shows in the filter a few frames late; the
+            # lowest measured point is the bounce itself
+            self.bounce[b] = self.low[b]
+            self.bounce_frame[b] = self.low_frame[b]
+            self.state[b] = _POST_BOUNCE
+            self.since[b] = 0
+            if self.calibration is not None:
+                self.pitch[b] = classify_pitch_m(self.calibration.to_pitch(*self.low[b].T)[1])
+            else:
+                self.pitch[b] = classify_pitch(self.low[b, 1], frame_height)
+
+        # -------- end of delivery --------
+        done = (((state == _POST_BOUNCE) & (since >= self.post_bounce_frames))
+                | (flying & ~turned & (since >= self.max_flight_frames)))
+
+        for k in np.flatnonzero(released | turned):
+            if released[k]:
+                events.append((int(ids[k]), RELEASED))
+            if turned[k]:
+                events.append((int(ids[k]), BOUNCED))
+        if done.any():
+            self._close(live[done], events)
+
+    # ---------------- reporting ----------------
+    def tracks(self):
+        """Snapshot of the live tracks as arrays (one row per track)."""
+        live = np.flatnonzero(self.alive)
+        x = self.kf.x[live]
+        return {
+            "id": self.ids[live].copy(),
+            "position": x[:, 0:2].copy(),
+            "velocity": x[:, 2:4].copy(),
+            "state": np.array(STATES, dtype=object)[self.state[live]],
+            "age": self.age[live].copy(),
+            "hits": self.hits[live].copy(),
+            "misses": self.misses[live].copy(),
+            "speed": self.speed[live].copy(),
+            "max_speed": self.max_speed[live].copy(),
+            "release_speed": self.release_speed[live].copy(),
+            "bounce": self.bounce[live].copy(),
+            "bounce_frame": self.bounce_frame[live].copy(),
+            "pitch": self.pitch[live].copy(),
+        }
+
+    def _close(self, idx, events):
+        """END (with a summary in `deliveries`) or ABORT for slots `idx`."""
+        for i in idx:
+            track_id = int(self.ids[i])
+            if self.state[i] == _RUN_UP:
+                events.append((track_id, ABORT))
+            elif self.state[i] != _IDLE:
+                events.append((track_id, END))
+                bounced = self.bounce_frame[i] >= 0
+                self.deliveries.append({
+                    "track_id": track_id,
+                    "release_kmph": round(float(self.release_speed[i]), 2),
+                    "max_kmph": round(float(self.max_speed[i]), 2),
+                    "bounce_frame": int(self.bounce_frame[i]) if bounced else None,
+                    "bounce_px": ({"x": int(self.bounce[i, 0]), "y": int(self.bounce[i, 1])}
+                                  if bounced else None),
+                    "pitch": self.pitch[i]
+                })
+            self.state[i] = _IDLE
+
+    def finish(self):
+        """End of footage: close every open delivery. Returns the events."""
+        events = []
+        live = np.flatnonzero(self.alive)
+        self._close(live, events)
+        self.alive[live] = False
+        return events
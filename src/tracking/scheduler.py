@@ -0,0 +1,84 @@
+class AdaptiveStrideScheduler:
+    """
+    Decides on which frames the detector runs.
+
+    While the track is confident the stride grows up to `max_stride` and
+    BallKalmanFilter coasts on the frames in between. Any sign of trouble
+    (large innovation, growing covariance, a missed keyframe) or a
+    release / bounce event drops straight back to every frame.
+    """
+
+    def __init__(self, max_stride=3, promote_after=5, nis_gate=9.21,
+                 max_pos_std=12.0, event_hold=10):
+        self.max_stride = max_stride
+        self.promote_after = promote_after   # good keyframes before stride += 1
+        self.nis_gate = nis_gate             # chi-square 99%, 2 dof
+        self.max_pos_std = max_pos_std       # px
+        self.event_hold = event_hold         # frames at full rate after an event
+
+        self.stride = 1
+        self.since_detect = 0
+        self.good_updates = 0
+        self.hold = 0
+
+        # stats
+        self.frames = 0
+        self.detections_run = 0
+
+    # ------------------------------------
+    def should_detect(self, kalman):
+        if not kalman.initialized or self.stride == 1 or self.hold > 0:
+            return True
+        return self.since_detect + 1 >= self.stride
+
+    def observe(self, kalman, detected, matched, event=False):
+        """
+        Feed back the outcome of one frame.
+        detected: detector ran on this frame
+        matched:  a detection was associated to the track
+        event:    release / bounce (or about to happen)
+        """
+        self.frames += 1
+        if detected:
+            self.detections_run += 1
+            self.since_detect = 0
+        else:
+            self.since_detect += 1
+
+        if self.hold > 0:
+            self.hold -= 1
+
+        if event:
+            self.hold = self.event_hold
+            self._demote()
+            return
+
+        if not kalman.initialized:
+            self._demote()
+            return
+
+        if kalman.position_std() > self.max_pos_std:
+            self._demote()
+            return
+
+        if not detected:
+            return
+
+        if not matched or kalman.nis > self.nis_gate:
+            self._demote()
+            return
+
+        self.good_updates += 1
+        if self.good_updates >= self.promote_after:
+            self.stride = min(self.stride + 1, self.max_stride)
+            self.good_updates = 0
+
+    def _demote(self):
+        self.stride = 1
+        self.good_updates = 0
+
+    # ------------------------------------
+    def skip_ratio(self):
+        if self.frames == 0:
+            return 0.0
+        return 1.0 - self.detections_run / self.frames
@@ -0,0 +1,138 @@
+IDLE = "IDLE"
+RUN_UP = "RUN_UP"
+RELEASE = "RELEASE"
+FLIGHT = "FLIGHT"
+BOUNCE = "BOUNCE"
+POST_BOUNCE = "POST_BOUNCE"
+
+STATES = (IDLE, RUN_UP, RELEASE, FLIGHT, BOUNCE, POST_BOUNCE)
+
+# events emitted on transitions
+START = "start"
+RELEASED = "release"
+BOUNCED = "bounce"
+END = "end"
+ABORT = "abort"        # ended before any release: not a delivery
+
+
+class DeliverySegmenter:
+    """
+    Explicit delivery lifecycle on top of the per-frame track results:
+
+        IDLE → RUN_UP → RELEASE → FLIGHT → BOUNCE → POST_BOUNCE → IDLE
+
+    - IDLE → RUN_UP:      a new track picks up the ball
+    - RUN_UP → RELEASE:   speed > release_kmph for release_hits frames in a row
+    - FLIGHT → BOUNCE:    the tracker flags a bounce
+    - POST_BOUNCE → IDLE: post_bounce_frames later
+    - any → IDLE:         track reset (ball lost), or no bounce within max_flight_frames;
+                          from RUN_UP this is an ABORT (no release, nothing to export)
+
+    While IDLE the detect stage may run at `idle_stride` / `idle_imgsz`
+    (see GuidedDetectStage); everything else runs at full cost.
+    idle_imgsz defaults to None (full size, stride-only idle mode): a
+    reduced inference size has not been validated on the real weights,
+    and at 320 px a ~10 px ball in 1080p shrinks below 2 px, so IDLE
+    might never see the ball to leave it.
+    """
+
+    def __init__(self, release_kmph=30.0, release_hits=3, post_bounce_frames=20,
+                 max_flight_frames=90, max_runup_frames=300, idle_stride=3, idle_imgsz=None):
+        self.release_kmph = release_kmph
+        self.release_hits = release_hits
+        self.post_bounce_frames = post_bounce_frames
+        self.max_flight_frames = max_flight_frames
+        self.max_runup_frames = max_runup_frames
+        self.idle_stride = idle_stride
+        self.idle_imgsz = idle_imgsz
+
+        self.state = IDLE
+        self.frame = -1
+        self.deliveries = 0
+        self.stats = dict.fromkeys(STATES, 0)
+
+        self.release_frame = None
+        self.release_point = None
+        self._hits = 0
+        self._hit_start = None
+        self._since = 0
+        self._wait_reset = False
+
+    @property
+    def idle(self):
+        return self.state == IDLE
+
+    def _to(self, state):
+        self.state = state
+        self._since = 0
+
+    def _end(self, events, track_live):
+        if self.state == RUN_UP:
+            events.append(ABORT)
+            self.deliveries -= 1
+        else:
+            events.append(END)
+        self._to(IDLE)
+        # the same ball is still tracked after its delivery ended:
+        # don't start another delivery on it
+        self._wait_reset = track_live
+
+    def step(self, track):
+        """Advance one frame. Returns (state, events)."""
+        self.frame += 1
+        self._since += 1
+        events = []
+        live = track["position"] is not None
+
+        if track["reset"] or not live:
+            self._wait_reset = False
+            if self.state != IDLE:
+                self._end(events, False)
+
+        state = self.state
+        if state == IDLE:
+            if live and track["matched"] is not None and not self._wait_reset:
+                self._to(RUN_UP)
+                self._hits = 0
+                self.release_frame = self.release_point = None
+                self.deliveries += 1
+                events.append(START)
+
+        elif state == RUN_UP:
+            if track["speed"] > self.release_kmph:
+                if self._hits == 0:
+                    self._hit_start = (self.frame, track["position"])
+                self._hits += 1
+            else:
+                self._hits = 0
+
+            if self._hits >= self.release_hits:
+                self.release_frame, self.release_point = self._hit_start
+                self._to(RELEASE)
+                events.append(RELEASED)
+            elif self._since > self.max_runup_frames:
+                self._end(events, True)
+
+        elif state == RELEASE:
+            self._to(FLIGHT)
+
+        elif state == FLIGHT:
+            if track["bounced"]:
+                self._to(BOUNCE)
+                events.append(BOUNCED)
+            elif self._since > self.max_flight_frames:
+                self._end(events, True)
+
+        elif state == BOUNCE:
+            self._to(POST_BOUNCE)
+
+        elif state == POST_BOUNCE:
+            if self._since >= self.post_bounce_frames:
+                self._end(events, True)
+
+        self.stats[self.state] += 1
+        return self.state, events
+
+    def idle_ratio(self):
+        n = sum(self.stats.values())
+        return self.stats[IDLE] / n if n else 0.0
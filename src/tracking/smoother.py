@@ -0,0 +1,305 @@
+import numpy as np
+
+
+def _process_noise(h, dt, q, accel_std):
+    """Per-axis Q = [[qa, qb], [qb, qc]] over a step of h seconds."""
+    if accel_std is None:
+        qk = q * (h / dt)
+        return qk, 0.0, qk
+    s2 = accel_std * accel_std
+    return s2 * h ** 4 / 4, s2 * h ** 3 / 2, s2 * h * h
+
+
+def rts_smooth(measurements, timestamps=None, dt=1/30, q=0.1, r=10.0, p0=500.0,
+               offsets=None, accel_std=None, init_speed_std=None):
+    """
+    Rauch–Tung–Striebel smoother over a whole delivery.
+
+    Same constant-velocity model as BallKalmanFilter (Q = q*I, R = r*I,
+    P0 = p0*I), run forward then backward over every frame.
+
+    measurements: (T, 2) pixel positions, NaN rows for frames without a
+                  detection
+    timestamps:   optional (T,) seconds; otherwise frames are `dt` apart
+
+    offsets:      many deliveries concatenated (delivery k is
+                  offsets[k]:offsets[k+1], the analytics layout), smoothed
+                  independently in one pass (see rts_smooth_batch)
+    accel_std:    px/s^2; process noise as white acceleration instead of
+                  q*I (as MultiBallTracker). Q = q*I mostly jitters the
+                  position and keeps the velocity nearly constant, so use
+                  this when the smoothed velocities are wanted (speed).
+    init_speed_std: px/s, 1-sigma of the unknown initial velocity
+                  (default sqrt(p0), as BallKalmanFilter.init)
+
+    Returns (positions (T, 2), velocities (T, 2), covariances (T, 4, 4)),
+    state order [x, y, vx, vy]. Frames before the first measurement are NaN.
+
+    With Q, R and P0 diagonal the x and y axes are independent and share
+    one covariance recursion (it does not depend on the measured values),
+    so the 2x2 covariance / gain arithmetic is done once per frame on
+    plain floats and applied to both axes. The recursion stays
+    sequential in time: an associative-scan form needs log2(T) levels of
+    batched 4x4 products per pass, which in NumPy cost about as much as
+    this loop for one delivery (~0.2 ms for 45 frames, ~0.6 ms for 150).
+    Archives are vectorized across deliveries instead (offsets).
+    """
+    if offsets is not None:
+        return rts_smooth_batch(measurements, offsets, timestamps, dt, q, r, p0,
+                                accel_std=accel_std, init_speed_std=init_speed_std)
+
+    z = np.asarray(measurements, dtype=float).reshape(-1, 2)
+    T = len(z)
+
+    positions = np.full((T, 2), np.nan)
+    velocities = np.full((T, 2), np.nan)
+    covariances = np.full((T, 4, 4), np.nan)
+
+    valid = ~np.isnan(z).any(axis=1)
+    if not valid.any():
+        return positions, velocities, covariances
+
+    start = int(np.argmax(valid))
+    n = T - start
+
+    if timestamps is None:
+        steps = [dt] * n
+    else:
+        steps = np.diff(np.asarray(timestamps, dtype=float)[start:], prepend=0.0)
+        steps = np.maximum(steps, 1e-4).tolist()
+
+    zx = z[start:, 0].tolist()
+    zy = z[start:, 1].tolist()
+    has = valid[start:].tolist()
+
+    # -------- forward pass --------
+    # starts like BallKalmanFilter.init at the first detection;
+    # per-axis covariance [[a, b], [b, c]]; means (px, vx), (py, vy)
+    fa, fb, fc = [0.0] * n, [0.0] * n, [0.0] * n          # filtered
+    pa, pb, pc = [0.0] * n, [0.0] * n, [0.0] * n          # predicted
+    fpx, fvx, fpy, fvy = [0.0] * n, [0.0] * n, [0.0] * n, [0.0] * n
+    ppx, ppy = [0.0] * n, [0.0] * n                        # predicted positions
+
+    c0 = p0 if init_speed_std is None else init_speed_std ** 2
+    a, b, c = p0, 0.0, c0
+    px, vx, py, vy = zx[0], 0.0, zy[0], 0.0
+    pa[0], pb[0], pc[0] = a, b, c
+    ppx[0], ppy[0] = px, py
+
+    for k in range(n):
+        if k > 0:
+            h = steps[k]
+            qa, qb, qc = _process_noise(h, dt, q, accel_std)
+            a, b, c = a + 2 * h * b + h * h * c + qa, b + h * c + qb, c + qc
+            px += h * vx
+            py += h * vy
+            pa[k], pb[k], pc[k] = a, b, c
+            ppx[k], ppy[k] = px, py
+
+        if k > 0 and has[k]:
+            s = a + r
+            k0, k1 = a / s, b / s
+            ex, ey = zx[k] - px, zy[k] - py
+            px, vx = px + k0 * ex, vx + k1 * ex
+            py, vy = py + k0 * ey, vy + k1 * ey
+            a, b, c = a - k0 * a, b - k0 * b, c - k1 * b
+
+        fa[k], fb[k], fc[k] = a, b, c
+        fpx[k], fvx[k], fpy[k], fvy[k] = px, vx, py, vy
+
+    # -------- backward pass --------
+    sa, sb, sc = list(fa), list(fb), list(fc)
+    spx, svx, spy, svy = list(fpx), list(fvx), list(fpy), list(fvy)
+
+    for k in range(n - 2, -1, -1):
+        h = steps[k + 1]
+        A, B, C = pa[k + 1], pb[k + 1], pc[k + 1]
+        det = A * C - B * B
+
+        # G = P_f F^T P_pred^-1
+        m00, m01 = fa[k] + h * fb[k], fb[k]
+        m10, m11 = fb[k] + h * fc[k], fc[k]
+        g00 = (m00 * C - m01 * B) / det
+        g01 = (m01 * A - m00 * B) / det
+        g10 = (m10 * C - m11 * B) / det
+        g11 = (m11 * A - m10 * B) / det
+
+        # means
+        dpx = spx[k + 1] - ppx[k + 1]
+        dvx = svx[k + 1] - fvx[k]
+        dpy = spy[k + 1] - ppy[k + 1]
+        dvy = svy[k + 1] - fvy[k]
+        spx[k] = fpx[k] + g00 * dpx + g01 * dvx
+        svx[k] = fvx[k] + g10 * dpx + g11 * dvx
+        spy[k] = fpy[k] + g00 * dpy + g01 * dvy
+        svy[k] = fvy[k] + g10 * dpy + g11 * dvy
+
+        # covariance: P_s = P_f + G (P_s[k+1] - P_pred[k+1]) G^T
+        da, db, dc = sa[k + 1] - A, sb[k + 1] - B, sc[k + 1] - C
+        t00 = g00 * da + g01 * db
+        t01 = g00 * db + g01 * dc
+        t10 = g10 * da + g11 * db
+        t11 = g10 * db + g11 * dc
+        sa[k] = fa[k] + t00 * g00 + t01 * g01
+        sb[k] = fb[k] + t00 * g10 + t01 * g11
+        sc[k] = fc[k] + t10 * g10 + t11 * g11
+
+    # -------- assemble --------
+    positions[start:, 0] = spx
+    positions[start:, 1] = spy
+    velocities[start:, 0] = svx
+    velocities[start:, 1] = svy
+
+    a, b, c = np.array(sa), np.array(sb), np.array(sc)
+    cov = covariances[start:]
+    cov.fill(0.0)
+    cov[:, 0, 0] = cov[:, 1, 1] = a
+    cov[:, 2, 2] = cov[:, 3, 3] = c
+    cov[:, 0, 2] = cov[:, 2, 0] = cov[:, 1, 3] = cov[:, 3, 1] = b
+
+    return positions, velocities, covariances
+
+
+def rts_smooth_batch(measurements, offsets, timestamps=None, dt=1/30, q=0.1, r=10.0,
+                     p0=500.0, accel_std=None, init_speed_std=None, covariances=True):
+    """
+    rts_smooth over many deliveries at once, same results per delivery.
+
+    The deliveries are laid side by side (longest, K) and every frame
+    step of the forward / backward recursion is one set of array
+    operations over all of them, so an archive costs about as many
+    NumPy passes as its longest delivery has frames.
+    covariances=False skips building the (N, 4, 4) array (returns None).
+    """
+    z = np.asarray(measurements, dtype=float).reshape(-1, 2)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    N = len(z)
+    K = len(offsets) - 1
+
+    positions = np.full((N, 2), np.nan)
+    velocities = np.full((N, 2), np.nan)
+    cov_out = np.full((N, 4, 4), np.nan) if covariances else None
+    if N == 0 or K == 0:
+        return positions, velocities, cov_out
+
+    # -------- (L, K) layout: one row per frame step --------
+    lengths = np.diff(offsets)
+    L = int(lengths.max())
+    seg = np.repeat(np.arange(K), lengths)
+    flat = (np.arange(N) - offsets[seg]) * K + seg
+
+    zx = np.full(L * K, np.nan)
+    zy = np.full(L * K, np.nan)
+    zx[flat] = z[:, 0]
+    zy[flat] = z[:, 1]
+    zx, zy = zx.reshape(L, K), zy.reshape(L, K)
+    has = ~(np.isnan(zx) | np.isnan(zy))
+    zx, zy = np.nan_to_num(zx), np.nan_to_num(zy)       # masked by `has` below
+
+    steps = np.full((L, K), dt)
+    if timestamps is not None:
+        ts = np.full(L * K, np.nan)
+        ts[flat] = np.asarray(timestamps, dtype=float)
+        steps[1:] = np.maximum(np.nan_to_num(np.diff(ts.reshape(L, K), axis=0), nan=dt), 1e-4)
+
+    # -------- forward pass --------
+    shape = (L, K)
+    fa, fb, fc = np.empty(shape), np.empty(shape), np.empty(shape)
+    pa, pb, pc = np.empty(shape), np.empty(shape), np.empty(shape)
+    fpx, fvx, fpy, fvy = np.empty(shape), np.empty(shape), np.empty(shape), np.empty(shape)
+    ppx, ppy = np.empty(shape), np.empty(shape)
+    started = np.zeros(shape, dtype=bool)
+
+    c0 = p0 if init_speed_std is None else init_speed_std ** 2
+    a, b, c = np.full(K, p0), np.zeros(K), np.full(K, c0)
+    px, vx, py, vy = np.full(K, np.nan), np.zeros(K), np.full(K, np.nan), np.zeros(K)
+    live = np.zeros(K, dtype=bool)
+
+    for k in range(L):
+        # predict (rows not started yet are NaN and get reset below)
+        h = steps[k]
+        qa, qb, qc = _process_noise(h, dt, q, accel_std)
+        a, b, c = a + 2 * h * b + h * h * c + qa, b + h * c + qb, c + qc
+        px = px + h * vx
+        py = py + h * vy
+
+        # first measurement: initialise like BallKalmanFilter.init
+        init = has[k] & ~live
+        if init.any():
+            a, b, c = np.where(init, p0, a), np.where(init, 0.0, b), np.where(init, c0, c)
+            px, py = np.where(init, zx[k], px), np.where(init, zy[k], py)
+            vx, vy = np.where(init, 0.0, vx), np.where(init, 0.0, vy)
+            live = live | init
+        pa[k], pb[k], pc[k] = a, b, c
+        ppx[k], ppy[k] = px, py
+
+        upd = has[k] & ~init
+        s = a + r
+        k0 = a / s * upd
+        k1 = b / s * upd
+        ex = zx[k] - px
+        ey = zy[k] - py
+        px, vx = px + k0 * ex, vx + k1 * ex
+        py, vy = py + k0 * ey, vy + k1 * ey
+        a, b, c = a - k0 * a, b - k0 * b, c - k1 * b
+
+        fa[k], fb[k], fc[k] = a, b, c
+        fpx[k], fvx[k], fpy[k], fvy[k] = px, vx, py, vy
+        started[k] = live
+
+    # -------- backward pass --------
+    sa, sb, sc = fa.copy(), fb.copy(), fc.copy()
+    spx, svx, spy, svy = fpx.copy(), fvx.copy(), fpy.copy(), fvy.copy()
+    last = lengths - 1
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for k in range(L - 2, -1, -1):
+            go = started[k] & (k < last)
+            if not go.any():
+                continue
+            h = steps[k + 1]
+            A, B, C = pa[k + 1], pb[k + 1], pc[k + 1]
+            det = (A * C - B * B) / go      # inf where not smoothed: zero gain
+
+            m00, m01 = fa[k] + h * fb[k], fb[k]
+            m10, m11 = fb[k] + h * fc[k], fc[k]
+            g00 = (m00 * C - m01 * B) / det
+            g01 = (m01 * A - m00 * B) / det
+            g10 = (m10 * C - m11 * B) / det
+            g11 = (m11 * A - m10 * B) / det
+
+            dpx = spx[k + 1] - ppx[k + 1]
+            dvx = svx[k + 1] - fvx[k]
+            dpy = spy[k + 1] - ppy[k + 1]
+            dvy = svy[k + 1] - fvy[k]
+            spx[k] = fpx[k] + g00 * dpx + g01 * dvx
+            svx[k] = fvx[k] + g10 * dpx + g11 * dvx
+            spy[k] = fpy[k] + g00 * dpy + g01 * dvy
+            svy[k] = fvy[k] + g10 * dpy + g11 * dvy
+
+            da, db, dc = sa[k + 1] - A, sb[k + 1] - B, sc[k + 1] - C
+            t00 = g00 * da + g01 * db
+            t01 = g00 * db + g01 * dc
+            t10 = g10 * da + g11 * db
+            t11 = g10 * db + g11 * dc
+            sa[k] = fa[k] + t00 * g00 + t01 * g01
+            sb[k] = fb[k] + t00 * g10 + t01 * g11
+            sc[k] = fc[k] + t10 * g10 + t11 * g11
+
+    # -------- back to the flat layout --------
+    ok = started.ravel()[flat]
+    idx, cell = np.flatnonzero(ok), flat[ok]
+    positions[idx, 0] = spx.ravel()[cell]
+    positions[idx, 1] = spy.ravel()[cell]
+    velocities[idx, 0] = svx.ravel()[cell]
+    velocities[idx, 1] = svy.ravel()[cell]
+
+    if covariances:
+        cov = np.zeros((len(idx), 4, 4))
+        a, b, c = sa.ravel()[cell], sb.ravel()[cell], sc.ravel()[cell]
+        cov[:, 0, 0] = cov[:, 1, 1] = a
+        cov[:, 2, 2] = cov[:, 3, 3] = c
+        cov[:, 0, 2] = cov[:, 2, 0] = cov[:, 1, 3] = cov[:, 3, 1] = b
+        cov_out[idx] = cov
+
+    return positions, velocities, cov_out
@@ -0,0 +1,121 @@
+import numpy as np
+
+
+class TrajectoryBuffer:
+    """
+    Growable, columnar trajectory storage.
+
+    Columns: frame (int32), x, y (float32) and, once first given,
+    vx, vy, conf (float32, NaN where missing). Capacity doubles when
+    full, so appends are amortised O(1) with no per-point Python objects.
+    """
+
+    EXTRA = ("vx", "vy", "conf")
+
+    def __init__(self, capacity=128):
+        self._n = 0
+        self._cap = capacity
+        self.frame = np.empty(capacity, dtype=np.int32)
+        self.x = np.empty(capacity, dtype=np.float32)
+        self.y = np.empty(capacity, dtype=np.float32)
+        self.vx = self.vy = self.conf = None
+
+    def __len__(self):
+        return self._n
+
+    # ------------------------------------
+    def _grow(self):
+        self._cap *= 2
+        for name in ("frame", "x", "y") + self.EXTRA:
+            col = getattr(self, name)
+            if col is None:
+                continue
+            new = np.empty(self._cap, dtype=col.dtype)
+            new[:self._n] = col[:self._n]
+            if name in self.EXTRA:
+                new[self._n:] = np.nan
+            setattr(self, name, new)
+
+    def _extra(self, name):
+        col = getattr(self, name)
+        if col is None:
+            col = np.full(self._cap, np.nan, dtype=np.float32)
+            setattr(self, name, col)
+        return col
+
+    def append(self, frame, x, y, vx=None, vy=None, conf=None):
+        if self._n == self._cap:
+            self._grow()
+
+        i = self._n
+        self.frame[i] = -1 if frame is None else frame
+        self.x[i] = x
+        self.y[i] = y
+        if vx is not None:
+            self._extra("vx")[i] = vx
+        if vy is not None:
+            self._extra("vy")[i] = vy
+        if conf is not None:
+            self._extra("conf")[i] = conf
+        self._n += 1
+
+    # ------------------------------------
+    def columns(self):
+        """Trimmed views of every column that holds data."""
+        cols = {
+            "frame": self.frame[:self._n],
+            "x": self.x[:self._n],
+            "y": self.y[:self._n],
+        }
+        for name in self.EXTRA:
+            col = getattr(self, name)
+            if col is not None:
+                cols[name] = col[:self._n]
+        return cols
+
+    def to_points(self, keys=("frame", "x", "y")):
+        """JSON-ready list of dicts, built only when writing."""
+        n = self._n
+        lists = []
+        for key in keys:
+            col = getattr(self, key)
+            if key in ("frame", "x", "y"):
+                lists.append(col[:n].astype(np.int64).tolist())
+            else:
+                lists.append(col[:n].tolist())
+        return [dict(zip(keys, row)) for row in zip(*lists)]
+
+
+def save_trajectories(path, trajectories, ids):
+    """
+    Compact binary side file: every trajectory's columns concatenated,
+    with `offsets` marking where each id's points start.
+    """
+    offsets = np.zeros(len(trajectories) + 1, dtype=np.int64)
+    np.cumsum([len(t) for t in trajectories], out=offsets[1:])
+
+    arrays = {"ids": np.asarray(ids, dtype=np.int32), "offsets": offsets}
+    for name in ("frame", "x", "y") + TrajectoryBuffer.EXTRA:
+        parts = []
+        for t in trajectories:
+            col = t.columns().get(name)
+            if col is None:
+                dtype = np.int32 if name == "frame" else np.float32
+                col = np.full(len(t), -1 if name == "frame" else np.nan, dtype=dtype)
+            parts.append(col)
+        if parts:
+            arrays[name] = np.concatenate(parts)
+
+    np.savez(path, **arrays)
+
+
+def load_trajectories(path):
+    """Inverse of save_trajectories: {id: {column: array}}."""
+    data = np.load(path)
+    offsets = data["offsets"]
+    names = [n for n in ("frame", "x", "y") + TrajectoryBuffer.EXTRA if n in data]
+    out = {}
+    for k, tid in enumerate(data["ids"].tolist()):
+        a, b = offsets[k], offsets[k + 1]
+        out[tid] = {n: data[n][a:b] for n in names}
+    return out
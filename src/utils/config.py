@@ -0,0 +1,135 @@
+import copy
+import os
+
+CONFIG_FILES = ("yolo", "kalman", "tracker")
+
+DEFAULTS = {
+    "yolo": {
+        "model": "models/yolo/ball_stump_best.pt",
+        "conf": 0.2,
+        "ball_class_id": 0,
+        "batch_size": 16,
+        "backend": "auto",
+        "imgsz": 640,
+        "iou": 0.45,
+        "threads": None,
+        "roi": {"enabled": False, "min": 128, "max": 640, "sigma": 3.0, "max_misses": 3},
+        "motion_gate": {
+            "enabled": False, "width": 320, "diff_threshold": 15,
+            "max_changed": 0.05, "max_regions": 4, "log_path": None
+        }
+    },
+    "kalman": {"q": 0.1, "r": 10.0, "p0": 500.0},
+    "tracker": {
+        "association": "nearest",
+        "max_missed": 15,
+        "meters_per_pixel": 20.12 / 520,
+        "perspective_gain": 1.5,
+        "calibration": None,
+        "max_stride": 1,
+        "queue_size": 16,
+        "segmenter": {
+            "enabled": False, "release_kmph": 30.0, "release_hits": 3,
+            "post_bounce_frames": 20, "max_flight_frames": 90,
+            "idle_stride": 3, "idle_imgsz": None
+        }
+    }
+}
+
+
+def _merge(base, override):
+    for k, v in (override or {}).items():
+        if isinstance(v, dict) and isinstance(base.get(k), dict):
+            _merge(base[k], v)
+        else:
+            base[k] = v
+    return base
+
+
+def _parse_value(text):
+    import yaml
+    return yaml.safe_load(text)
+
+
+def apply_overrides(cfg, overrides):
+    """`overrides`: ["yolo.conf=0.3", "tracker.association=gated", ...]"""
+    for item in overrides or ():
+        key, sep, value = item.partition("=")
+        assert sep, f"❌ Override must be key=value: {item}"
+
+        *parents, leaf = key.strip().split(".")
+        node = cfg
+        for p in parents:
+            node = node.setdefault(p, {})
+        node[leaf] = _parse_value(value)
+    return cfg
+
+
+def load_config(config_dir="configs", overrides=None):
+    """
+    {"yolo": ..., "kalman": ..., "tracker": ...} from configs/*.yaml,
+    falling back to DEFAULTS for missing files or keys.
+    """
+    import yaml
+
+    cfg = copy.deepcopy(DEFAULTS)
+    for name in CONFIG_FILES:
+        path = os.path.join(config_dir, name + ".yaml")
+        if os.path.isfile(path):
+            with open(path) as f:
+                _merge(cfg[name], yaml.safe_load(f))
+    return apply_overrides(cfg, overrides)
+
+
+# -------- builders --------
+def detector_kwargs(cfg):
+    yolo = cfg["yolo"]
+    roi = yolo["roi"]
+    return {
+        "conf": yolo["conf"],
+        "ball_class_id": yolo["ball_class_id"],
+        "batch_size": yolo["batch_size"],
+        "backend": yolo["backend"],
+        "imgsz": yolo["imgsz"],
+        "iou": yolo["iou"],
+        "threads": yolo["threads"],
+        "roi_mode": roi["enabled"],
+        "roi_min": roi["min"],
+        "roi_max": roi["max"],
+        "roi_sigma": roi["sigma"],
+        "max_roi_misses": roi["max_misses"]
+    }
+
+
+def motion_gate_kwargs(cfg):
+    """MotionGate kwargs, or None when the gate is off."""
+    gate = dict(cfg["yolo"]["motion_gate"])
+    if not gate.pop("enabled"):
+        return None
+    return gate
+
+
+def segmenter_kwargs(cfg):
+    """DeliverySegmenter kwargs, or None when segmentation is off."""
+    seg = dict(cfg["tracker"]["segmenter"])
+    if not seg.pop("enabled"):
+        return None
+    return seg
+
+
+def track_kwargs(cfg):
+    tr = cfg["tracker"]
+    return {
+        "association": tr["association"],
+        "max_missed": tr["max_missed"],
+        "meters_per_pixel": tr["meters_per_pixel"],
+        "perspective_gain": tr["perspective_gain"],
+        "calibration": tr["calibration"],
+        "kalman_kwargs": dict(cfg["kalman"])
+    }
+
+
+def build_detector(cfg):
+    # pulls in ultralytics / torch — only call when inference is needed
+    from src.detection.yolo_detector import YoloBallDetector
+    return YoloBallDetector(model_path=cfg["yolo"]["model"], **detector_kwargs(cfg))
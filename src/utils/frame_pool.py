@@ -0,0 +1,64 @@
+import threading
+
+import numpy as np
+
+
+class FramePool:
+    """
+    Free list of preallocated frame buffers for `cap.read(image=buf)`.
+
+    The decode thread acquires a buffer per frame and the pipeline sink
+    releases it once the frame has been drawn / written. The pool only
+    allocates while the number of frames in flight grows (up to roughly
+    the queue sizes of the pipeline); after that reads reuse buffers and
+    steady-state decoding allocates nothing.
+    """
+
+    def __init__(self, shape, dtype=np.uint8, prealloc=0):
+        self.shape = tuple(shape)
+        self.dtype = dtype
+        self.allocated = 0
+        self.reused = 0
+
+        self._free = []
+        self._lock = threading.Lock()
+        for _ in range(prealloc):
+            self._free.append(self._new())
+
+    def _new(self):
+        self.allocated += 1
+        return np.empty(self.shape, dtype=self.dtype)
+
+    def acquire(self):
+        with self._lock:
+            if self._free:
+                self.reused += 1
+                return self._free.pop()
+            return self._new()
+
+    def release(self, buf):
+        # frames the backend reallocated (shape change) are not ours
+        if buf is None or buf.shape != self.shape:
+            return
+        with self._lock:
+            self._free.append(buf)
+
+    def read(self, cap):
+        """cap.read() into a pooled buffer. Returns (ret, frame)."""
+        buf = self.acquire()
+        ret, frame = cap.read(image=buf)
+        if not ret:
+            self.release(buf)
+            return False, None
+        if frame is not buf:
+            self.release(buf)
+        return True, frame
+
+    @classmethod
+    def for_capture(cls, cap, prealloc=0):
+        import cv2
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        if width <= 0 or height <= 0:
+            return None
+        return cls((height, width, 3), prealloc=prealloc)
@@ -0,0 +1,192 @@
+"""
+Pixel → pitch-plane geometry.
+
+Without a calibration, metres/pixel is one constant scaled by image row
+(perspective_scale). PitchCalibration replaces that with a homography
+from the image onto the pitch plane, fitted once per camera angle from
+the two sets of stumps (class 1 of ball_stump_best.pt) or from clicked
+crease points, and cached on disk per camera angle:
+
+    calib.json  homography, frame size, the points it was fitted on,
+                and a hash of H + size the row table was built from
+    rows.npy    (h,) float32, metres per pixel of each image row
+
+TrackStage reads its per-frame metres/pixel from the row table (one
+index). Whole trajectories go through to_pitch: the projective map of
+every point is a handful of array ops, which measured ~15x faster than
+gathering from a dense per-pixel (h, w, 2) table, so none is kept.
+
+Pitch coordinates: origin at the base of the striker's middle stump,
+y along the pitch towards the bowler, x across it, in metres. The
+homography maps the ground plane; a ball in flight is above it, so
+only the bounce point is exact and speeds are an approximation (a
+better one than a single metres/pixel constant).
+"""
+import hashlib
+import json
+import os
+
+import cv2
+import numpy as np
+
+PITCH_LENGTH = 20.12        # stumps to stumps, m
+STUMPS_HALF_WIDTH = 0.1143  # 22.86 cm across the three stumps
+CREASE_OFFSET = 1.22        # popping crease in front of the stumps
+RETURN_CREASE_HALF = 1.32   # return creases are 2.64 m apart
+
+# clickable landmarks; "left" / "right" as seen in the image
+LANDMARKS = {
+    "striker_stumps_left": (-STUMPS_HALF_WIDTH, 0.0),
+    "striker_stumps_right": (STUMPS_HALF_WIDTH, 0.0),
+    "bowler_stumps_left": (-STUMPS_HALF_WIDTH, PITCH_LENGTH),
+    "bowler_stumps_right": (STUMPS_HALF_WIDTH, PITCH_LENGTH),
+    "striker_crease_left": (-RETURN_CREASE_HALF, CREASE_OFFSET),
+    "striker_crease_right": (RETURN_CREASE_HALF, CREASE_OFFSET),
+    "bowler_crease_left": (-RETURN_CREASE_HALF, PITCH_LENGTH - CREASE_OFFSET),
+    "bowler_crease_right": (RETURN_CREASE_HALF, PITCH_LENGTH - CREASE_OFFSET),
+}
+
+
+def perspective_scale(y, h, gain=1.5):
+    """Far-end pixels cover more ground: scale metres/pixel by image row."""
+    return 1.0 + gain * (y / h)
+
+
+def apply_homography(H, x, y):
+    """Projective map of point arrays: (x, y) → (X, Y)."""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    w = H[2, 0] * x + H[2, 1] * y + H[2, 2]
+    return ((H[0, 0] * x + H[0, 1] * y + H[0, 2]) / w,
+            (H[1, 0] * x + H[1, 1] * y + H[1, 2]) / w)
+
+
+# ---------------- calibration ----------------
+class PitchCalibration:
+    def __init__(self, H, size, points=None):
+        """
+        H: 3x3 image → pitch homography; size: (width, height) of the
+        frames it was fitted on; points: {landmark: [x, y]} used to fit it.
+        """
+        self.H = np.asarray(H, dtype=np.float64)
+        self.size = (int(size[0]), int(size[1]))
+        self.points = points or {}
+        self._rows = None
+
+    @classmethod
+    def from_points(cls, points, size):
+        """At least 4 of LANDMARKS (not all on one line) in pixels."""
+        unknown = set(points) - set(LANDMARKS)
+        assert not unknown, f"❌ Unknown landmarks: {sorted(unknown)}"
+        assert len(points) >= 4, "❌ Need at least 4 landmarks"
+
+        names = sorted(points)
+        src = np.float32([points[n] for n in names])
+        dst = np.float32([LANDMARKS[n] for n in names])
+        H, _ = cv2.findHomography(src, dst, 0)
+        assert H is not None, "❌ Degenerate landmarks (collinear?)"
+        return cls(H, size, {n: list(map(float, points[n])) for n in names})
+
+    @classmethod
+    def from_stumps(cls, striker_box, bowler_box, size):
+        """Bases of the two stump boxes (x1, y1, x2, y2)."""
+        sx1, _, sx2, sy2 = striker_box
+        bx1, _, bx2, by2 = bowler_box
+        return cls.from_points({
+            "striker_stumps_left": (sx1, sy2), "striker_stumps_right": (sx2, sy2),
+            "bowler_stumps_left": (bx1, by2), "bowler_stumps_right": (bx2, by2),
+        }, size)
+
+    # ---------------- conversion ----------------
+    def to_pitch(self, x, y):
+        """Pitch (X, Y) metres of pixel arrays (whole trajectories at once)."""
+        return apply_homography(self.H, x, y)
+
+    @property
+    def rows(self):
+        """
+        Metres per pixel of each image row: sqrt of the local area scale
+        of the homography where the pitch centre line crosses the row
+        (column clamped to the image when it leaves it).
+        """
+        if self._rows is None:
+            w, h = self.size
+            v = np.arange(h, dtype=np.float64)
+            # centre line: image of pitch x = 0 at the depth of each row
+            depth = self.to_pitch(np.full(h, w / 2), v)[1]
+            u = apply_homography(np.linalg.inv(self.H), np.zeros(h), depth)[0]
+            u = np.clip(np.nan_to_num(u, nan=w / 2), 0, w - 1)
+
+            X, Y = self.to_pitch(u, v)
+            Xu, Yu = self.to_pitch(u + 1, v)
+            Xv, Yv = self.to_pitch(u, v + 1)
+            area = np.abs((Xu - X) * (Yv - Y) - (Yu - Y) * (Xv - X))
+            self._rows = np.sqrt(area).astype(np.float32)
+        return self._rows
+
+    def check_frame(self, height, width=None):
+        """Raise if frames of this size are not the ones it was fitted on."""
+        w, h = self.size
+        if height != h or (width is not None and width != w):
+            raise ValueError(
+                f"❌ Calibration was fitted on {w}x{h} frames, got {width or '?'}x{height}; "
+                "re-run calibrate at this resolution"
+            )
+
+    def meters_per_pixel(self, y):
+        return float(self.rows[min(max(int(y), 0), self.size[1] - 1)])
+
+    # ---------------- cache ----------------
+    def digest(self):
+        """Hash of H and size: what the row table depends on."""
+        h = hashlib.sha256(np.ascontiguousarray(self.H, dtype=np.float64).tobytes())
+        h.update(np.asarray(self.size, dtype=np.int64).tobytes())
+        return h.hexdigest()
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, "calib.json"), "w") as f:
+            json.dump({"H": self.H.tolist(), "size": list(self.size),
+                       "points": self.points, "rows_digest": self.digest()}, f, indent=2)
+        np.save(os.path.join(directory, "rows.npy"), self.rows)
+
+    @classmethod
+    def load(cls, directory):
+        """
+        The row table is rebuilt (and re-saved) if missing, or if the
+        H / size it was saved with differ from calib.json's (e.g. the
+        json was edited by hand or rewritten by an older version).
+        """
+        with open(os.path.join(directory, "calib.json")) as f:
+            meta = json.load(f)
+        calib = cls(meta["H"], meta["size"], meta.get("points"))
+
+        rows = None
+        if meta.get("rows_digest") == calib.digest():
+            try:
+                rows = np.load(os.path.join(directory, "rows.npy"))
+            except (OSError, ValueError):
+                pass
+        if rows is not None and rows.shape == (calib.size[1],):
+            calib._rows = rows
+        else:
+            calib.save(directory)
+        return calib
+
+
+def stump_boxes(raw_per_frame, stump_class_id=1, striker="bottom"):
+    """
+    (striker_box, bowler_box) from unfiltered detections of several
+    frames ([(xyxy, cls, conf), ...] as detect_raw): class `stump_class_id`
+    boxes split into the two ends at the largest vertical gap, median box
+    of each. `striker`: which end of the image the batter is at.
+    """
+    boxes = [xyxy[cls.astype(np.int64) == stump_class_id] for xyxy, cls, _ in raw_per_frame]
+    boxes = np.concatenate(boxes) if boxes else np.zeros((0, 4), np.float32)
+    assert len(boxes) >= 2, "❌ Not enough stump detections to calibrate"
+
+    boxes = boxes[np.argsort(boxes[:, 3])]
+    split = int(np.argmax(np.diff(boxes[:, 3]))) + 1
+    top = np.median(boxes[:split], axis=0)
+    bottom = np.median(boxes[split:], axis=0)
+    return (bottom, top) if striker == "bottom" else (top, bottom)
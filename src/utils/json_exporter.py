@@ -1,16 +1,38 @@
 import json
+import textwrap
+
+from src.export.delivery_stream import DeliveryStreamWriter, iter_deliveries
+from src.trajectory.trajectory_builder import TrajectoryBuffer, save_trajectories
 
 class BallJSONExporter:
-    def __init__(self, video_name, fps, pitch_length=20.12):
+    def __init__(self, video_name, fps, pitch_length=20.12, stream_path=None,
+                 frame_height=None):
         self.data = {
             "video_id": video_name,
             "fps": fps,
             "pitch_length_meters": pitch_length,
             "deliveries": []
         }
+        # needed to re-classify pitch length from the trajectory later
+        if frame_height is not None:
+            self.data["frame_height"] = frame_height
         self.current_delivery = None
         self.delivery_id = 0
 
+        # append-only .jsonl: finished deliveries go to disk, not memory
+        self.stream = None
+        if stream_path is not None:
+            self.stream = DeliveryStreamWriter(
+                stream_path, video_id=video_name, fps=fps, pitch_length=pitch_length,
+                frame_height=frame_height
+            )
+
+    @property
+    def num_deliveries(self):
+        if self.stream is not None:
+            return self.stream.count
+        return len(self.data["deliveries"])
+
     def start_delivery(self, start_frame):
         self.delivery_id += 1
         self.current_delivery = {
@@ -29,16 +51,13 @@ class BallJSONExporter:
                 "average_kmph": 0.0
             },
             "pitch": {},
-            "trajectory": {
-                "path_px": []
-            }
+            # columnar until written; see _delivery_json
+            "trajectory": TrajectoryBuffer()
         }
 
-    def add_position(self, x, y):
+    def add_position(self, x, y, frame=None, vx=None, vy=None, conf=None):
         if self.current_delivery:
-            self.current_delivery["trajectory"]["path_px"].append(
-                {"x": int(x), "y": int(y)}
-            )
+            self.current_delivery["trajectory"].append(frame, x, y, vx, vy, conf)
 
     def set_release(self, frame_id, x, y, speed):
         self.current_delivery["timestamps"]["release_frame"] = frame_id
@@ -64,12 +83,83 @@ class BallJSONExporter:
     def finalize_delivery(self, end_frame, pitch_type):
         self.current_delivery["timestamps"]["end_frame"] = end_frame
         self.current_delivery["pitch"]["type"] = pitch_type
-        self.current_delivery["trajectory"]["num_points"] = len(
-            self.current_delivery["trajectory"]["path_px"]
-        )
-        self.data["deliveries"].append(self.current_delivery)
+        if self.stream is not None:
+            self.stream.write(self._delivery_json(self.current_delivery))
+        else:
+            self.data["deliveries"].append(self.current_delivery)
         self.current_delivery = None
 
-    def save(self, output_path):
-        with open(output_path, "w") as f:
-            json.dump(self.data, f, indent=4)
+    def discard_delivery(self):
+        """Drop the current delivery (e.g. a track that never released)."""
+        if self.current_delivery is not None:
+            self.current_delivery = None
+            self.delivery_id -= 1
+
+    def close(self):
+        if self.stream is not None:
+            self.stream.close()
+
+    # ------------------------------------
+    @staticmethod
+    def _delivery_json(delivery):
+        """Delivery dict in the JSON schema (trajectory as path_px points)."""
+        out = dict(delivery)
+        traj = delivery["trajectory"]
+        out["trajectory"] = {
+            "path_px": traj.to_points(("x", "y")),
+            "frames": traj.columns()["frame"].tolist(),
+            "num_points": len(traj)
+        }
+        return out
+
+    def to_dict(self):
+        data = dict(self.data)
+        data["deliveries"] = [self._delivery_json(d) for d in self.data["deliveries"]]
+        return data
+
+    def save(self, output_path, indent=4, binary_path=None):
+        """
+        Write the JSON one delivery at a time, so only a single delivery's
+        points exist as Python dicts at once. Same output as json.dump.
+        `binary_path`: also write every trajectory's columns to a .npz.
+        When streaming, the stream is closed and re-read lazily.
+        """
+        if self.stream is not None:
+            assert binary_path is None, "❌ binary_path needs in-memory trajectories"
+            self.close()
+            records = iter_deliveries(self.stream.path)
+        else:
+            deliveries = self.data["deliveries"]
+            records = (self._delivery_json(d) for d in deliveries)
+        header = {k: v for k, v in self.data.items() if k != "deliveries"}
+        write_json(output_path, header, records, indent)
+
+        if binary_path is not None:
+            save_trajectories(
+                binary_path,
+                [d["trajectory"] for d in deliveries],
+                [d["delivery_id"] for d in deliveries]
+            )
+
+
+def write_json(output_path, header, records, indent=4):
+    """
+    {**header, "deliveries": [...]} written record by record from any
+    iterable of JSON-ready deliveries. Same output as json.dump.
+    """
+    with open(output_path, "w") as f:
+        n = 0
+        if indent is None:
+            head = json.dumps(header)[:-1]
+            f.write(head + (", " if header else "") + '"deliveries": [')
+            for n, d in enumerate(records, 1):
+                f.write((", " if n > 1 else "") + json.dumps(d))
+            f.write("]}")
+        else:
+            pad = " " * indent
+            head = json.dumps(header, indent=indent)[:-2]
+            f.write(head + (",\n" if header else "{\n") + pad + '"deliveries": [')
+            for n, d in enumerate(records, 1):
+                body = json.dumps(d, indent=indent)
+                f.write(("," if n > 1 else "") + "\n" + textwrap.indent(body, pad * 2))
+            f.write(("\n" + pad if n else "") + "]\n}")
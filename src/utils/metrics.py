@@ -0,0 +1,199 @@
+import atexit
+import json
+import math
+import time
+
+# log-spaced latency bins: 1 µs .. 100 s, 20 per decade (~12% wide)
+_BINS_PER_DECADE = 20
+_MIN_EXP = -6
+_NUM_BINS = (2 - _MIN_EXP) * _BINS_PER_DECADE
+
+
+class Histogram:
+    """Fixed-size latency histogram; constant memory however long the run."""
+    __slots__ = ("count", "total", "max", "counts")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.counts = [0] * _NUM_BINS
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+        if seconds > 0:
+            i = int((math.log10(seconds) - _MIN_EXP) * _BINS_PER_DECADE)
+            i = 0 if i < 0 else (_NUM_BINS - 1 if i >= _NUM_BINS else i)
+        else:
+            i = 0
+        self.counts[i] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.total += other.total
+        if other.max > self.max:
+            self.max = other.max
+        for i, c in enumerate(other.counts):
+            if c:
+                self.counts[i] += c
+
+    def percentile(self, p):
+        """Upper edge of the bin holding the p-th percentile, in seconds."""
+        if self.count == 0:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                upper = 10 ** (_MIN_EXP + (i + 1) / _BINS_PER_DECADE)
+                return min(upper, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean_ms": round(1000 * self.total / self.count, 4) if self.count else 0.0,
+            "p50_ms": round(1000 * self.percentile(50), 4),
+            "p95_ms": round(1000 * self.percentile(95), 4),
+            "p99_ms": round(1000 * self.percentile(99), 4),
+            "max_ms": round(1000 * self.max, 4),
+            "total_s": round(self.total, 4)
+        }
+
+
+class _Span:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.record(time.perf_counter() - self.t0)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+_NULL = _NullSpan()
+
+
+class Metrics:
+    """
+    Per-stage timers (latency histograms) and counters.
+
+    Disabled by default: timer() hands back a shared no-op context and
+    count() returns immediately, so hooks left in hot paths cost one
+    attribute check. Each timer name should be recorded from one thread.
+
+        with metrics.timer("infer"):
+            results = model(frame)
+        metrics.count("detections", len(dets))
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.timers = {}
+        self.counters = {}
+        self._t0 = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+        self.reset()
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.timers = {}
+        self.counters = {}
+        self._t0 = time.perf_counter()
+
+    # ------------------------------------
+    def timer(self, name):
+        if not self.enabled:
+            return _NULL
+        hist = self.timers.get(name)
+        if hist is None:
+            hist = self.timers.setdefault(name, Histogram())
+        return _Span(hist)
+
+    def record(self, name, seconds):
+        if self.enabled:
+            hist = self.timers.get(name)
+            if hist is None:
+                hist = self.timers.setdefault(name, Histogram())
+            hist.record(seconds)
+
+    def count(self, name, n=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, other):
+        """
+        Add another Metrics' timers and counters into this one, e.g. the
+        instance a worker process sent back (Metrics pickles as is).
+        """
+        if other is None or not self.enabled:
+            return
+        for name, hist in other.timers.items():
+            self.timers.setdefault(name, Histogram()).merge(hist)
+        for name, n in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # ------------------------------------
+    def summary(self):
+        return {
+            "wall_s": round(time.perf_counter() - self._t0, 3),
+            "timers": {k: h.to_dict() for k, h in self.timers.items()},
+            "counters": dict(self.counters)
+        }
+
+    def format_summary(self):
+        s = self.summary()
+        lines = [f"{'stage':>10} {'count':>7} {'mean':>8} {'p50':>8} "
+                 f"{'p95':>8} {'p99':>8} {'max':>8}  (ms)"]
+        for name, t in s["timers"].items():
+            lines.append(
+                f"{name:>10} {t['count']:7d} {t['mean_ms']:8.3f} {t['p50_ms']:8.3f} "
+                f"{t['p95_ms']:8.3f} {t['p99_ms']:8.3f} {t['max_ms']:8.3f}"
+            )
+        if s["counters"]:
+            lines.append("  " + ", ".join(f"{k}={v}" for k, v in s["counters"].items()))
+        return "\n".join(lines)
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+# process-wide instance used by the pipeline hooks
+metrics = Metrics()
+
+
+def enable_at_exit(path=None):
+    """Turn instrumentation on; print the summary (and dump JSON) on exit."""
+    metrics.enable()
+
+    def _report():
+        print(metrics.format_summary())
+        if path:
+            metrics.dump(path)
+            print(f"metrics → {path}")
+
+    atexit.register(_report)
@@ -0,0 +1,163 @@
+import cv2
+import numpy as np
+
+from src.detection.yolo_detector import BallBoxFilter, in_region, to_tuples
+
+
+# ---------------- synthetic deliveries ----------------
+def ball_radius(width):
+    return max(3, round(width * 0.005))
+
+
+def delivery_path(n, width, height, rng, gravity=0.35, restitution=0.6):
+    """
+    One delivery of `n` frames: straight in x, parabolic in y with a
+    single bounce. Returns (xy (n, 2), bounce_frame).
+    """
+    x0 = width * rng.uniform(0.45, 0.55)
+    x1 = width * rng.uniform(0.35, 0.65)
+    y0 = height * rng.uniform(0.15, 0.25)
+    yb = height * rng.uniform(0.45, 0.8)
+    tb = int(n * rng.uniform(0.55, 0.7))
+
+    # scale gravity with resolution so the shape is the same at any size
+    g = gravity * height / 360
+    v0 = (yb - y0 - 0.5 * g * tb * tb) / tb
+
+    t = np.arange(n, dtype=np.float64)
+    y = y0 + v0 * t + 0.5 * g * t * t
+
+    after = t > tb
+    ta = t[after] - tb
+    vb = restitution * (v0 + g * tb)
+    y[after] = yb - vb * ta + 0.5 * g * ta * ta
+
+    x = x0 + (x1 - x0) * t / (n - 1)
+    return np.stack([x, y], axis=1), tb
+
+
+def pitch_background(width, height):
+    """Grass with a lighter pitch strip and crease lines."""
+    bg = np.empty((height, width, 3), dtype=np.uint8)
+    bg[:] = (40, 110, 40)
+
+    x1, x2 = int(width * 0.38), int(width * 0.62)
+    bg[:, x1:x2] = (110, 160, 185)
+    for fy in (0.18, 0.88):
+        y = int(height * fy)
+        cv2.line(bg, (x1, y), (x2, y), (235, 235, 235), max(1, height // 360))
+    return bg
+
+
+def make_delivery_video(path, width=640, height=360, frames=150, fps=30,
+                        delivery_len=45, gap=20, noise=12, occlusion_rate=0.03,
+                        seed=0):
+    """
+    Write a synthetic broadcast-style clip: a small white ball on a
+    pitch background, one bouncing delivery every `delivery_len + gap`
+    frames, additive pixel noise and short random occlusions.
+
+    Returns (truth, bounces):
+      truth   (frames, 3) float32 — x, y, visible (x/y NaN with no ball)
+      bounces list of bounce frame indices
+    """
+    rng = np.random.default_rng(seed)
+    radius = ball_radius(width)
+
+    truth = np.full((frames, 3), np.nan, dtype=np.float32)
+    truth[:, 2] = 0
+    bounces = []
+
+    start = gap // 2
+    while start < frames:
+        n = min(delivery_len, frames - start)
+        if n < 8:
+            break
+        xy, tb = delivery_path(n, width, height, rng)
+        truth[start:start + n, :2] = xy
+        truth[start:start + n, 2] = 1
+        if tb < n:
+            bounces.append(start + tb)
+        start += delivery_len + gap
+
+    # occlusions: 2-4 frame spans where the ball is not drawn
+    i = 0
+    while i < frames:
+        if truth[i, 2] and rng.random() < occlusion_rate:
+            span = int(rng.integers(2, 5))
+            truth[i:i + span, 2] = 0
+            i += span
+        i += 1
+
+    bg = pitch_background(width, height)
+    tiles = [
+        rng.integers(0, noise + 1, bg.shape, dtype=np.uint8) for _ in range(4)
+    ] if noise else None
+
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    assert writer.isOpened(), f"❌ Failed to open video writer: {path}"
+
+    frame = np.empty_like(bg)
+    for k in range(frames):
+        np.copyto(frame, bg)
+        if truth[k, 2]:
+            cx, cy = int(round(truth[k, 0])), int(round(truth[k, 1]))
+            cv2.circle(frame, (cx, cy), radius, (245, 245, 245), -1, cv2.LINE_AA)
+        if tiles is not None:
+            cv2.add(frame, tiles[k % 4], dst=frame)
+        writer.write(frame)
+
+    writer.release()
+    return truth, bounces
+
+
+# ---------------- stub detector ----------------
+class GroundTruthDetector(BallBoxFilter):
+    """
+    Drop-in for YoloBallDetector that returns boxes from the synthetic
+    ground truth (optionally jittered, plus random clutter boxes) and
+    runs them through the same box filter as the real detector.
+    """
+
+    def __init__(self, truth, radius, frame_size=(640, 360), jitter=1.0,
+                 clutter=0, conf=0.01, seed=0):
+        super().__init__(conf=conf)
+        self.truth = truth
+        self.radius = radius
+        self.frame_size = frame_size
+        self.jitter = jitter
+        self.clutter = clutter
+        self.model_path = None
+        self._rng = np.random.default_rng(seed)
+
+    def raw(self, frame_index):
+        rng = self._rng
+        centres = []
+        if self.truth[frame_index, 2]:
+            cx, cy = self.truth[frame_index, :2]
+            centres.append((cx, cy))
+        for _ in range(self.clutter):
+            centres.append((rng.uniform(0, self.frame_size[0]),
+                            rng.uniform(0, self.frame_size[1])))
+
+        if not centres:
+            z = np.zeros(0, dtype=np.float32)
+            return np.zeros((0, 4), dtype=np.float32), z.astype(np.int16), z
+
+        c = np.asarray(centres, dtype=np.float32)
+        if self.jitter:
+            c += rng.normal(0, self.jitter, c.shape).astype(np.float32)
+
+        r = self.radius + 1
+        xyxy = np.concatenate([c - r, c + r], axis=1)
+        cls = np.zeros(len(c), dtype=np.int16)
+        conf = np.full(len(c), 0.3, dtype=np.float32)
+        if self.truth[frame_index, 2]:
+            conf[0] = 0.9
+        return xyxy, cls, conf
+
+    def detect(self, frame=None, *args, frame_index=None, **kwargs):
+        return to_tuples(self.filter_boxes(*self.raw(frame_index)))
+
+    def detect_region(self, frame, roi, frame_index=None):
+        return in_region(self.filter_boxes(*self.raw(frame_index)), roi)
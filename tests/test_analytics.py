@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+
+from src.analytics.archive import analyze, load_archive, to_records
+from src.analytics.bounce_detector import classify_pitch, detect_bounces
+from src.analytics.speed_estimator import release_points, speed_profile
+from src.utils.synthetic import delivery_path
+
+FPS = 30
+MPP = 20.12 / 520
+
+
+def synthetic_archive(count, n=45, seed=0):
+    rng = np.random.default_rng(seed)
+    paths, bounces = [], []
+    for _ in range(count):
+        xy, tb = delivery_path(n, 640, 360, rng)
+        paths.append(np.round(xy))
+        bounces.append(tb)
+    offsets = np.arange(count + 1) * n
+    xy = np.concatenate(paths)
+    t = np.tile(np.arange(n), count) / FPS
+    return t, xy[:, 0], xy[:, 1], offsets, np.array(bounces)
+
+
+def test_bounces_and_speed_match_ground_truth():
+    t, x, y, offsets, truth = synthetic_archive(200)
+
+    bounce = detect_bounces(y, offsets)
+    assert (bounce - offsets[:-1] == truth).all()
+
+    speed = speed_profile(t, x, y, offsets, MPP, lag=2)
+    # lag-2 central difference, in km/h
+    i = np.arange(1, len(x) - 1)
+    expected = np.hypot(x[i + 1] - x[i - 1], y[i + 1] - y[i - 1]) / (2 / FPS) * MPP * 3.6
+    interior = np.isin(i, offsets, invert=True) & np.isin(i + 1, offsets, invert=True)
+    assert np.allclose(speed[i][interior], expected[interior], equal_nan=True)
+    # never differences across two deliveries
+    assert np.isnan(speed[offsets[:-1]]).all() and np.isnan(speed[offsets[1:] - 1]).all()
+
+
+def test_batch_equals_per_delivery():
+    t, x, y, offsets, _ = synthetic_archive(20, seed=3)
+    speed = speed_profile(t, x, y, offsets, frame_height=360)
+    release = release_points(speed, offsets)
+    bounce = detect_bounces(y, offsets, after=release)
+
+    for k in range(len(offsets) - 1):
+        a, b = offsets[k], offsets[k + 1]
+        s = speed_profile(t[a:b], x[a:b], y[a:b], frame_height=360)
+        assert np.allclose(s, speed[a:b], equal_nan=True)
+        r = release_points(s)[0]
+        assert r == (release[k] - a if release[k] >= 0 else -1)
+        assert detect_bounces(y[a:b], after=[r])[0] == (bounce[k] - a if bounce[k] >= 0 else -1)
+
+
+def test_smoothed_speed_beats_lag_differences():
+    rng = np.random.default_rng(7)
+    t, x, y, offsets, _ = synthetic_archive(100, seed=7)
+    true = speed_profile(t, x, y, offsets, MPP, lag=2)      # noise-free
+    archive = {
+        "t": t, "x": x + rng.normal(0, 1.0, len(x)), "y": y + rng.normal(0, 1.0, len(y)),
+        "frame": np.round(t * FPS).astype(int), "frame_height": np.full(len(t), np.nan),
+        "offsets": offsets, "source": ["s"] * 100, "delivery_id": list(range(100))
+    }
+    smooth = analyze(archive)["speed"]
+    lagged = analyze(archive, accel_std=None)["speed"]
+    assert np.nanmedian(np.abs(smooth - true)) < 0.8 * np.nanmedian(np.abs(lagged - true))
+
+
+def test_classify_pitch():
+    labels = classify_pitch([300, 230, 150, 100, np.nan], 360)
+    assert labels.tolist() == ["YORKER", "FULL", "GOOD", "SHORT", None]
+
+
+def test_recompute_from_export(tmp_path):
+    t, x, y, offsets, truth = synthetic_archive(3, seed=5)
+    deliveries = []
+    for k in range(3):
+        a, b = offsets[k], offsets[k + 1]
+        frames = 100 * k + np.arange(b - a)
+        deliveries.append({
+            "delivery_id": k + 1,
+            "timestamps": {"start_frame": int(frames[0])},
+            "trajectory": {
+                "path_px": [{"x": int(px), "y": int(py)} for px, py in zip(x[a:b], y[a:b])],
+                "frames": frames.tolist()
+            }
+        })
+    path = tmp_path / "out.json"
+    path.write_text(json.dumps({"fps": FPS, "frame_height": 360, "deliveries": deliveries}))
+
+    records = to_records(analyze(load_archive(str(path))))
+    assert [r["delivery_id"] for r in records] == [1, 2, 3]
+    for k, r in enumerate(records):
+        assert r["bounce_frame"] == 100 * k + truth[k]
+        assert r["release_kmph"] is not None and r["pitch"] is not None
+
+
+def test_empty_archive(tmp_path):
+    path = tmp_path / "out.json"
+    path.write_text(json.dumps({"fps": FPS, "frame_height": 360, "deliveries": []}))
+    assert to_records(analyze(load_archive(str(path)))) == []
+    assert release_points(np.zeros(0)).tolist() == [-1]
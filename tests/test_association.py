@@ -0,0 +1,57 @@
+import itertools
+
+import numpy as np
+
+from src.association.data_association import (
+    associate_ball, associate_tracks, linear_assignment, mahalanobis_cost
+)
+
+
+def brute_force_cost(cost):
+    n, m = cost.shape
+    if n <= m:
+        return min(
+            sum(cost[i, j] for i, j in enumerate(perm))
+            for perm in itertools.permutations(range(m), n)
+        )
+    return brute_force_cost(cost.T)
+
+
+def test_linear_assignment_is_optimal():
+    rng = np.random.default_rng(0)
+    for shape in [(3, 3), (2, 5), (5, 3), (4, 4)]:
+        cost = rng.uniform(0, 10, shape)
+        rows, cols = linear_assignment(cost)
+        assert len(rows) == min(shape)
+        assert len(set(cols)) == len(cols)
+        assert np.isclose(cost[rows, cols].sum(), brute_force_cost(cost))
+
+
+def test_mahalanobis_cost_matches_explicit_inverse():
+    S = np.array([[[30.0, 5.0], [5.0, 12.0]]])
+    det_xy = np.array([[3.0, -2.0], [10.0, 4.0]])
+    cost = mahalanobis_cost([[0.0, 0.0]], S, det_xy)
+    expected = [d @ np.linalg.inv(S[0]) @ d for d in det_xy]
+    np.testing.assert_allclose(cost[0], expected)
+
+
+def test_associate_tracks_gates_and_resolves_globally():
+    pred = np.array([[100.0, 100.0], [130.0, 100.0]])
+    cov = np.array([np.eye(2) * 100.0] * 2)
+    # det 0 is closest to both tracks; greedy would steal it for track 0
+    # and leave track 1 with nothing inside its gate
+    dets = [
+        (118, 100, 0, 0, 0, 0, 0.9),
+        (90, 100, 0, 0, 0, 0, 0.9),
+        (900, 500, 0, 0, 0, 0, 0.9),     # clutter
+    ]
+    matches, lost, spare = associate_tracks(dets, pred, cov)
+    assert sorted(matches) == [(0, 1), (1, 0)]
+    assert lost == [] and spare == [2]
+
+
+def test_associate_ball_picks_nearest_within_max_dist():
+    dets = [(300, 300, 0, 0, 0, 0, 0.5), (110, 95, 0, 0, 0, 0, 0.5)]
+    assert associate_ball(dets, (100, 100)) == dets[1]
+    assert associate_ball(dets, (1000, 1000)) is None
+    assert associate_ball(dets, None) == dets[0]
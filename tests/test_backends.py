@@ -0,0 +1,47 @@
+import numpy as np
+
+from src.detection.backends import Letterboxer, decode_yolo, letterbox, nms
+
+
+def test_letterbox_keeps_aspect_and_centres():
+    frame = np.full((360, 640, 3), 255, dtype=np.uint8)
+    blob, scale, pad = letterbox(frame, 640)
+    assert blob.shape == (1, 3, 640, 640) and blob.dtype == np.float32
+    assert scale == 1.0 and pad == (0, 140)
+    assert blob[0, :, 139, 0].max() < 0.5 and blob[0, :, 140, 0].min() == 1.0
+
+
+def test_letterboxer_matches_letterbox_and_reuses_buffers():
+    rng = np.random.default_rng(0)
+    lb = Letterboxer()
+    for shape in [(1080, 1920, 3), (720, 1280, 3), (200, 96, 3), (1080, 1920, 3)]:
+        frame = rng.integers(0, 256, shape, dtype=np.uint8)
+        ref, ref_scale, ref_pad = letterbox(frame, 640)
+        blob, scale, pad = lb(frame, 640)
+        assert np.array_equal(blob, ref), f"❌ blob differs for {shape}"
+        assert (scale, pad) == (ref_scale, ref_pad)
+    assert lb(frame, 640)[0] is blob
+
+
+def test_nms_suppresses_overlaps_only():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60]], dtype=np.float32)
+    scores = np.array([0.6, 0.9, 0.5], dtype=np.float32)
+    assert nms(boxes, scores, 0.45).tolist() == [1, 2]
+
+
+def test_decode_maps_back_to_frame_coordinates():
+    # ball at frame (100, 50)-(120, 70) in a 640x360 frame letterboxed to 640
+    scale, pad = 1.0, (0, 140)
+    preds = np.array([
+        # cx,  cy,  w,  h, ball, stump
+        [110, 200, 20, 20, 0.90, 0.01],
+        [111, 201, 20, 20, 0.70, 0.01],     # duplicate, suppressed
+        [110, 200, 20, 20, 0.05, 0.80],     # same place, other class: kept
+        [400, 300, 20, 20, 0.10, 0.02],     # below conf
+    ], dtype=np.float32)
+    output = preds.T[None]                   # (1, 4 + nc, N)
+
+    xyxy, cls, conf = decode_yolo(output, 0.25, scale, pad)
+    assert cls.tolist() == [0, 1]
+    np.testing.assert_allclose(xyxy[0], [100, 50, 120, 70])
+    np.testing.assert_allclose(conf, [0.9, 0.8])
@@ -0,0 +1,23 @@
+import sys
+
+from src.cli import main
+from src.utils.config import load_config, track_kwargs
+
+
+def test_repo_configs_load_with_overrides():
+    cfg = load_config("configs", ["yolo.conf=0.35", "tracker.association=gated"])
+    assert cfg["yolo"]["conf"] == 0.35
+    assert cfg["yolo"]["roi"]["min"] == 128
+
+    kw = track_kwargs(cfg)
+    assert kw["association"] == "gated"
+    assert kw["kalman_kwargs"] == {"q": 0.1, "r": 10.0, "p0": 500.0}
+
+
+def test_analyze_does_not_import_model_stack(tmp_path, capsys):
+    path = tmp_path / "d.json"
+    path.write_text('{"deliveries": [{"speed": {"release_kmph": 130.0}, "pitch": {"type": "full"}}]}')
+
+    assert main(["analyze", str(path)]) == 0
+    assert "1 deliveries" in capsys.readouterr().out
+    assert "ultralytics" not in sys.modules
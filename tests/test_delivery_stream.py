@@ -0,0 +1,62 @@
+import pytest
+
+from src.export.delivery_stream import iter_deliveries, read_header
+from src.utils.json_exporter import BallJSONExporter
+
+
+def play(exporter):
+    for d in range(3):
+        exporter.start_delivery(d * 100)
+        for i in range(5):
+            exporter.add_position(10 * i, 20 + i, frame=d * 100 + i)
+        exporter.update_speed(120.0 + d)
+        exporter.finalize_delivery(d * 100 + 5, "good length")
+
+
+def test_streamed_deliveries_match_in_memory_export(tmp_path):
+    memory = BallJSONExporter("match.mp4", 30)
+    play(memory)
+    memory.save(tmp_path / "memory.json")
+
+    stream = BallJSONExporter("match.mp4", 30, stream_path=tmp_path / "d.jsonl")
+    play(stream)
+    assert stream.data["deliveries"] == [] and stream.num_deliveries == 3
+
+    stream.save(tmp_path / "stream.json")
+    assert (tmp_path / "stream.json").read_text() == (tmp_path / "memory.json").read_text()
+
+    header = read_header(tmp_path / "d.jsonl")
+    assert header["video_id"] == "match.mp4" and header["pitch_length_meters"] == 20.12
+
+
+def test_reader_skips_truncated_tail(tmp_path):
+    exporter = BallJSONExporter("match.mp4", 30, stream_path=tmp_path / "d.jsonl")
+    play(exporter)
+    exporter.close()
+
+    # simulate a crash half-way through writing a fourth delivery
+    with open(tmp_path / "d.jsonl", "a") as f:
+        f.write('{"delivery_id": 4, "timest')
+
+    ids = [d["delivery_id"] for d in iter_deliveries(tmp_path / "d.jsonl")]
+    assert ids == [1, 2, 3]
+
+
+def test_stream_is_synced_when_the_run_fails(tmp_path):
+    from src.pipeline.offline import run_headless
+    from src.utils.synthetic import GroundTruthDetector, ball_radius, make_delivery_video
+
+    video = str(tmp_path / "clip.mp4")
+    truth, _ = make_delivery_video(video, 320, 180, frames=150)
+
+    class Crashing(GroundTruthDetector):
+        def detect(self, *args, frame_index=None, **kwargs):
+            assert frame_index < 140, "❌ detector crashed"
+            return super().detect(*args, frame_index=frame_index, **kwargs)
+
+    stream = tmp_path / "d.jsonl"
+    with pytest.raises(AssertionError, match="crashed"):
+        run_headless(video, Crashing(truth, ball_radius(320), (320, 180)),
+                     str(tmp_path / "out.json"), stream_path=str(stream))
+    # finalized deliveries (well under fsync_every) reached the file
+    assert len(list(iter_deliveries(stream))) >= 2
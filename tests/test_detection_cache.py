@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from src.detection.cache import DetectionCache, CachedDetector
+
+
+def test_low_threshold_cache_serves_higher_threshold(tmp_path):
+    video = tmp_path / "match.mp4"
+    weights = tmp_path / "best.pt"
+    video.write_bytes(b"video bytes")
+    weights.write_bytes(b"weights")
+
+    cache = DetectionCache(str(tmp_path / "cache"))
+    writer = cache.writer(str(video), str(weights), 0.05, fps=30, width=640, height=360)
+    writer.append(0, np.array([[10, 10, 20, 20], [100, 100, 110, 110], [50, 50, 60, 60]]),
+                  [0, 0, 1], [0.1, 0.8, 0.9])
+    writer.append(2, np.zeros((0, 4)), [], [])
+    writer.close()
+
+    assert cache.find(str(video), str(weights), 0.01) is None
+
+    cached = cache.load(str(video), str(weights), 0.5)
+    assert cached is not None and len(cached) == 3
+
+    dets = CachedDetector(cached).detect(frame_index=0)
+    assert dets == [(105, 105, 100, 100, 110, 110, np.float32(0.8))]
+    assert CachedDetector(cached).detect(frame_index=2) == []
+    # a model whose ball is another class replays that class
+    assert CachedDetector(cached, ball_class_id=1).detect(frame_index=0) == [
+        (55, 55, 50, 50, 60, 60, np.float32(0.9))
+    ]
+
+    with pytest.raises(LookupError):
+        cached.raw(1)     # never ran through the model
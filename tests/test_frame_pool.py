@@ -0,0 +1,29 @@
+import cv2
+
+from src.pipeline.stages import decode_frames
+from src.utils.frame_pool import FramePool
+from src.utils.synthetic import make_delivery_video
+
+
+def test_decode_recycles_released_buffers(tmp_path):
+    video = str(tmp_path / "clip.mp4")
+    make_delivery_video(video, 320, 180, frames=40)
+
+    cap = cv2.VideoCapture(video)
+    pool = FramePool.for_capture(cap)
+    assert pool.shape == (180, 320, 3)
+
+    in_flight = []
+    seen = set()
+    n = 0
+    for packet in decode_frames(cap, 30, pool):
+        in_flight.append(packet)
+        seen.add(id(packet.frame))
+        if len(in_flight) > 3:           # 4 frames in flight, like a short queue
+            in_flight.pop(0).release()
+        n += 1
+    cap.release()
+
+    assert n == 40
+    assert pool.allocated <= 5 and len(seen) == pool.allocated
+    assert pool.reused >= n - pool.allocated
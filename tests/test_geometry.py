@@ -0,0 +1,91 @@
+import json
+
+import cv2
+import numpy as np
+import pytest
+
+from src.analytics.speed_estimator import speed_profile
+from src.pipeline.stages import FramePacket, TrackStage
+from src.tracking.multi_tracker import MultiBallTracker
+from src.utils.geometry import (
+    LANDMARKS, PitchCalibration, apply_homography, stump_boxes
+)
+
+SIZE = (640, 360)
+
+
+def camera():
+    """Pitch (m) → image (px) homography of a behind-the-stumps view."""
+    pitch = np.float32([[-1.32, 1.22], [1.32, 1.22], [-1.32, 18.9], [1.32, 18.9]])
+    image = np.float32([[260, 330], [380, 330], [305, 90], [335, 90]])
+    return cv2.getPerspectiveTransform(pitch, image)
+
+
+def clicked(G, names):
+    return {n: [float(v) for v in apply_homography(G, *LANDMARKS[n])] for n in names}
+
+
+def test_points_recover_the_pitch_plane(tmp_path):
+    G = camera()
+    calib = PitchCalibration.from_points(
+        clicked(G, [n for n in LANDMARKS if "crease" in n]), SIZE
+    )
+
+    # far stumps were not clicked: still land on the far stumps
+    u, v = apply_homography(G, 0.0, 20.12)
+    assert np.allclose(calib.to_pitch(u, v), (0.0, 20.12), atol=1e-3)
+    # rows further up the image cover more ground; 1 px down the centre
+    # line at row 300 is about the row's metres/pixel
+    assert calib.rows[100] > calib.rows[300]
+    (_, y0), (_, y1) = calib.to_pitch(u, 300), calib.to_pitch(u, 301)
+    assert 0.5 < abs(y1 - y0) / calib.meters_per_pixel(300) < 2
+
+    calib.save(tmp_path)
+    loaded = PitchCalibration.load(str(tmp_path))
+    assert np.allclose(loaded.H, calib.H) and np.array_equal(loaded.rows, calib.rows)
+
+    # stale table (different size) is rebuilt, not trusted
+    np.save(tmp_path / "rows.npy", np.zeros(2, np.float32))
+    assert np.array_equal(PitchCalibration.load(str(tmp_path)).rows, calib.rows)
+
+    # same shape but saved for another homography: caught by the digest
+    other = PitchCalibration(calib.H * [[1.0, 1.0, 1.0], [1.0, 1.1, 1.0], [1.0, 1.0, 1.0]], calib.size)
+    other.save(tmp_path)
+    meta = json.loads((tmp_path / "calib.json").read_text())
+    meta["H"] = calib.H.tolist()
+    (tmp_path / "calib.json").write_text(json.dumps(meta))
+    assert np.array_equal(PitchCalibration.load(str(tmp_path)).rows, calib.rows)
+    assert json.loads((tmp_path / "calib.json").read_text())["rows_digest"] == calib.digest()
+
+
+def test_stump_boxes_and_calibrated_speed():
+    G = camera()
+    ends = []
+    for y in (0.0, 20.12):
+        (x1, x2), (y2, _) = apply_homography(G, [-0.1143, 0.1143], [y, y])
+        ends.append([x1, y2 - 30, x2, y2])
+    raw = [(np.float32([ends[0], ends[1], [300, 200, 306, 206]]) + k * 0.2,
+            np.array([1, 1, 0]), np.ones(3, np.float32)) for k in range(5)]
+
+    striker, bowler = stump_boxes(raw)
+    assert striker[3] > bowler[3]
+    calib = PitchCalibration.from_stumps(striker, bowler, SIZE)
+
+    # ball rolling down the middle at 18 m/s (64.8 km/h)
+    t = np.arange(15) / 30
+    u, v = apply_homography(G, np.zeros(15), 18.0 - 18.0 * t)
+    speed = speed_profile(t, u, v, calibration=calib)
+    assert np.allclose(speed[1:-2], 64.8, rtol=0.03)
+
+
+def test_calibration_rejects_other_resolutions():
+    calib = PitchCalibration(camera(), SIZE)
+    TrackStage(calibration=calib).step([], 360)
+    MultiBallTracker(calibration=calib).step([], 360)
+
+    with pytest.raises(ValueError):
+        TrackStage(calibration=calib).step([], 720)
+    with pytest.raises(ValueError):
+        MultiBallTracker(calibration=calib).step([], 720)
+    with pytest.raises(ValueError):
+        TrackStage(calibration=calib)(FramePacket(0, 0.0, np.zeros((360, 480, 3), np.uint8)))
@@ -0,0 +1,154 @@
+import numpy as np
+
+from src.tracking.kalman_filter import BallKalmanFilter, BatchKalmanFilter
+from src.tracking.smoother import rts_smooth
+
+
+def reference_step(x, P, z, dt, Q, R):
+    """Textbook predict + update with explicit matrices and np.linalg.inv."""
+    F = np.array([
+        [1, 0, dt, 0],
+        [0, 1, 0, dt],
+        [0, 0, 1,  0],
+        [0, 0, 0,  1]
+    ])
+    H = np.array([
+        [1, 0, 0, 0],
+        [0, 1, 0, 0]
+    ])
+    x = F @ x
+    P = F @ P @ F.T + Q
+    y = np.array(z).reshape(2, 1) - H @ x
+    S = H @ P @ H.T + R
+    K = P @ H.T @ np.linalg.inv(S)
+    return x + K @ y, (np.eye(4) - K @ H) @ P
+
+
+def test_matches_reference_filter():
+    rng = np.random.default_rng(1)
+    kf = BallKalmanFilter()
+    kf.init(100, 200)
+
+    x = np.array([[100.0], [200.0], [0.0], [0.0]])
+    P = np.eye(4) * 500
+
+    for i in range(50):
+        dt = 1 / 30 if i % 7 else 2 / 30
+        z = (100 + 20 * i + rng.normal(0, 3), 200 + 5 * i + rng.normal(0, 3))
+
+        kf.predict(dt)
+        kf.update(z)
+        x, P = reference_step(x, P, z, dt, kf.Q * (dt / kf.dt), kf.R)
+
+        np.testing.assert_allclose(kf.x, x, rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(kf.P, P, rtol=1e-9, atol=1e-9)
+
+
+def test_nis_is_chi_square_of_innovation():
+    kf = BallKalmanFilter()
+    kf.init(0, 0)
+    kf.predict()
+    S = kf.P[:2, :2] + kf.R
+    kf.update((10.0, -4.0))
+
+    y = np.array([10.0, -4.0])
+    assert np.isclose(kf.nis, y @ np.linalg.inv(S) @ y)
+
+
+def test_batch_matches_single_filters():
+    rng = np.random.default_rng(2)
+    n = 5
+    singles = [BallKalmanFilter() for _ in range(n)]
+    batch = BatchKalmanFilter(n)
+
+    start = rng.uniform(0, 500, (n, 2))
+    for kf, (sx, sy) in zip(singles, start):
+        kf.init(sx, sy)
+    batch.init(np.arange(n), start)
+
+    for i in range(30):
+        z = start + i * np.array([15.0, 4.0]) + rng.normal(0, 2, (n, 2))
+        z[i % n] = np.nan   # one missing measurement per step
+
+        batch.predict()
+        batch.update(z)
+        for j, kf in enumerate(singles):
+            kf.predict()
+            if not np.isnan(z[j, 0]):
+                kf.update(z[j])
+
+        for j, kf in enumerate(singles):
+            np.testing.assert_allclose(batch.x[j], kf.x[:, 0], rtol=1e-9, atol=1e-9)
+            np.testing.assert_allclose(batch.P[j], kf.P, rtol=1e-9, atol=1e-9)
+
+
+def test_smoother_last_frame_equals_forward_filter():
+    rng = np.random.default_rng(3)
+    t = np.arange(90) / 30
+    z = np.stack([100 + 600 * t, 200 + 300 * t - 200 * t ** 2], axis=1)
+    z += rng.normal(0, 3, z.shape)
+    z[[10, 11, 50]] = np.nan
+
+    kf = BallKalmanFilter()
+    kf.init(*z[0])
+    for zk in z[1:]:
+        kf.predict()
+        if not np.isnan(zk[0]):
+            kf.update(zk)
+
+    pos, vel, cov = kf.smooth(z)
+
+    np.testing.assert_allclose(pos[-1], kf.x[:2, 0])
+    np.testing.assert_allclose(vel[-1], kf.x[2:, 0])
+    np.testing.assert_allclose(cov[-1], kf.P, atol=1e-9)
+    assert not np.isnan(pos).any()
+
+
+def test_smoother_beats_filter_on_noisy_track():
+    rng = np.random.default_rng(4)
+    t = np.arange(120) / 30
+    truth = np.stack([50 + 400 * t, 300 + 80 * t], axis=1)
+    z = truth + rng.normal(0, 4, truth.shape)
+
+    kf = BallKalmanFilter()
+    kf.init(*z[0])
+    filtered = [z[0]]
+    for zk in z[1:]:
+        kf.predict()
+        kf.update(zk)
+        filtered.append(kf.x[:2, 0].copy())
+
+    pos, _, _ = kf.smooth(z)
+    err_f = np.abs(np.array(filtered) - truth)[30:].mean()
+    err_s = np.abs(pos - truth)[30:].mean()
+    assert err_s < err_f
+
+
+def test_smoother_leading_gap_is_nan():
+    z = np.full((10, 2), np.nan)
+    z[3:] = [[10.0 * i, 5.0] for i in range(7)]
+    pos, _, _ = rts_smooth(z)
+    assert np.isnan(pos[:3]).all()
+    assert not np.isnan(pos[3:]).any()
+
+
+def test_smoother_batch_equals_per_delivery():
+    rng = np.random.default_rng(5)
+    tracks, times = [], []
+    for n in (1, 7, 40, 25):
+        z = np.cumsum(rng.normal(0, 5, (n, 2)), axis=0)
+        z[rng.random(n) < 0.2] = np.nan
+        tracks.append(z)
+        times.append(np.cumsum(rng.choice([1 / 30, 2 / 30], n)))
+    tracks[2][:4] = np.nan                  # leading gap
+    offsets = np.cumsum([0] + [len(z) for z in tracks])
+
+    for kwargs in ({}, {"accel_std": 1000.0, "init_speed_std": 600.0}):
+        pos, vel, cov = rts_smooth(np.concatenate(tracks), np.concatenate(times),
+                                   offsets=offsets, **kwargs)
+        for k, z in enumerate(tracks):
+            a, b = offsets[k], offsets[k + 1]
+            p, v, c = rts_smooth(z, times[k], **kwargs)
+            np.testing.assert_allclose(pos[a:b], p, atol=1e-6)
+            np.testing.assert_allclose(vel[a:b], v, atol=1e-6)
+            np.testing.assert_allclose(cov[a:b], c, atol=1e-6)
@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+from src.pipeline.live import StreamStats, track_stream, track_stream_async
+from src.tracking.segmenter import BOUNCED, END, RELEASED, START
+from src.utils.synthetic import GroundTruthDetector, ball_radius, make_delivery_video
+
+W, H = 640, 360
+
+
+class SlowDetector(GroundTruthDetector):
+    def __init__(self, delay, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delay = delay
+
+    def detect(self, *args, **kwargs):
+        time.sleep(self.delay)
+        return super().detect(*args, **kwargs)
+
+
+def test_live_stream_keeps_up_and_drops_when_slow(tmp_path):
+    video = str(tmp_path / "live.mp4")
+    truth, bounces = make_delivery_video(video, W, H, frames=75)
+
+    # fast detector: every frame processed, events match the video
+    stats = StreamStats()
+    fast = SlowDetector(0.002, truth, ball_radius(W), (W, H))
+    results = list(track_stream(video, fast, stats=stats))
+    events = [(r["index"], e) for r in results for e in r["events"]]
+
+    assert stats.processed == 75 and stats.dropped == 0
+    assert [e for _, e in events][:4] == [START, RELEASED, BOUNCED, END]
+    bounce = next(i for i, e in events if e == BOUNCED)
+    assert abs(bounce - bounces[0]) <= 2
+
+    # 3 frame times per detection: stale frames dropped, latency stays bounded
+    stats = StreamStats()
+    slow = SlowDetector(0.1, truth, ball_radius(W), (W, H))
+    results = list(track_stream(video, slow, stats=stats))
+    indexes = [r["index"] for r in results]
+
+    assert stats.dropped > 30, "❌ slow detector should skip frames"
+    assert stats.processed + stats.dropped == stats.grabbed == 75
+    assert indexes == sorted(indexes) and sum(r["dropped"] for r in results) <= stats.dropped
+    assert stats.latency.percentile(95) < 0.3, "❌ latency grew with the backlog"
+
+
+def test_async_stream(tmp_path):
+    video = str(tmp_path / "live.mp4")
+    truth, _ = make_delivery_video(video, W, H, frames=30)
+    detector = SlowDetector(0.002, truth, ball_radius(W), (W, H))
+
+    async def collect():
+        return [r async for r in track_stream_async(video, detector, realtime=True)]
+
+    results = asyncio.run(collect())
+    assert [r["index"] for r in results] == list(range(30))
+    assert results[-1]["position"] is not None
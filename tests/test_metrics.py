@@ -0,0 +1,62 @@
+from src.utils.metrics import Metrics
+
+
+def test_histogram_percentiles_and_counters():
+    m = Metrics(enabled=True)
+    for ms in range(1, 101):              # 1 .. 100 ms
+        m.record("infer", ms / 1000)
+    m.count("frames", 100)
+    m.count("misses")
+
+    s = m.summary()
+    t = s["timers"]["infer"]
+    assert t["count"] == 100 and t["max_ms"] == 100.0
+    # bins are ~12% wide; percentiles report the bin's upper edge
+    assert 50 <= t["p50_ms"] <= 50 * 1.13
+    assert 95 <= t["p95_ms"] <= 100
+    assert s["counters"] == {"frames": 100, "misses": 1}
+
+
+def test_disabled_records_nothing():
+    m = Metrics()
+    with m.timer("read"):
+        pass
+    m.count("frames")
+    assert m.summary()["timers"] == {} and m.summary()["counters"] == {}
+
+
+def test_merge_worker_metrics():
+    m = Metrics(enabled=True)
+    m.record("infer", 0.010)
+    m.count("frames", 2)
+    worker = Metrics(enabled=True)
+    for _ in range(3):
+        worker.record("infer", 0.020)
+    worker.count("frames", 3)
+    worker.count("misses")
+
+    m.merge(worker)
+    t = m.summary()["timers"]["infer"]
+    assert t["count"] == 4 and t["max_ms"] == 20.0 and t["total_s"] == 0.07
+    assert m.counters == {"frames": 5, "misses": 1}
+
+
+def test_batch_worker_returns_its_metrics(tmp_path):
+    from src.pipeline import batch
+    from src.utils.metrics import metrics
+    from src.utils.synthetic import GroundTruthDetector, ball_radius, make_delivery_video
+
+    video = str(tmp_path / "clip.mp4")
+    truth, _ = make_delivery_video(video, 320, 180, frames=30)
+    batch._detector = GroundTruthDetector(truth, ball_radius(320), (320, 180))
+    batch._options = {"guided": False, "max_stride": 1, "track_kwargs": None,
+                      "motion_gate": None, "segmenter": None, "metrics": True}
+    metrics.enable()
+    try:
+        entry, worker = batch._process_video(video, str(tmp_path / "clip.json"), None)
+        assert entry["status"] == "ok"
+        timers = worker.summary()["timers"]
+        assert timers["read"]["count"] >= 30 and timers["kalman"]["count"] > 0
+    finally:
+        metrics.disable()
+        batch._detector = batch._options = None
@@ -0,0 +1,42 @@
+import cv2
+import numpy as np
+
+from src.detection.motion_gate import MotionGate, SKIP, REGIONS, FULL, GLOBAL
+from src.utils.synthetic import pitch_background, GroundTruthDetector, ball_radius
+
+
+def frame_with_ball(bg, pos):
+    frame = bg.copy()
+    if pos is not None:
+        cv2.circle(frame, pos, 4, (245, 245, 245), -1)
+    return frame
+
+
+def test_gate_skips_static_and_crops_around_moving_ball():
+    bg = pitch_background(640, 360)
+    gate = MotionGate()
+
+    # warm-up: two frames of history needed
+    assert [gate.check(bg)[0] for _ in range(4)] == [FULL, FULL, SKIP, SKIP]
+
+    decision = None
+    for k in range(4):
+        pos = (300 + 12 * k, 100 + 9 * k)
+        decision, regions = gate.check(frame_with_ball(bg, pos))
+    assert decision == REGIONS and len(regions) == 1
+    x0, y0, x1, y1 = regions[0]
+    assert x0 <= pos[0] <= x1 and y0 <= pos[1] <= y1
+    assert (x1 - x0) % 32 == 0 and x1 - x0 < 640
+
+    # scene cut: everything changes
+    assert gate.check(255 - bg)[0] == GLOBAL
+    assert gate.stats[SKIP] == 2
+
+
+def test_region_detections_keep_full_frame_coordinates():
+    truth = np.array([[200.0, 120.0, 1.0]])
+    detector = GroundTruthDetector(truth, ball_radius(640), jitter=0)
+
+    inside = detector.detect_region(None, (160, 96, 256, 160), frame_index=0)
+    assert len(inside) == 1 and tuple(inside[0, :2]) == (200.0, 120.0)
+    assert len(detector.detect_region(None, (0, 0, 128, 96), frame_index=0)) == 0
@@ -0,0 +1,59 @@
+import numpy as np
+
+from src.tracking.multi_tracker import MultiBallTracker
+from src.tracking.segmenter import ABORT, BOUNCED, END, RELEASED, START
+from src.utils.synthetic import delivery_path
+
+W, H = 1280, 720
+
+
+def lanes(balls, stagger=10, seed=0):
+    rng = np.random.default_rng(seed)
+    paths = []
+    for k in range(balls):
+        xy, tb = delivery_path(60, W / balls, H, rng)
+        xy[:, 0] += k * W / balls
+        paths.append((stagger * k, xy + rng.normal(0, 1.0, xy.shape), tb))
+    return paths
+
+
+def run(tracker, paths, frames):
+    events = []
+    for f in range(frames):
+        dets = [tuple(xy[f - s]) + (0, 0, 0, 0, 0.9)
+                for s, xy, _ in paths if s <= f < s + len(xy)]
+        events += [(f, i, e) for i, e in tracker.step(dets, H, f / 30)]
+    return events + [(frames, i, e) for i, e in tracker.finish()]
+
+
+def test_concurrent_balls_keep_their_tracks():
+    paths = lanes(5)
+    # starts with room for 2 tracks: grows while balls are in flight
+    tracker = MultiBallTracker(fps=30, capacity=2)
+    events = run(tracker, paths, 130)
+
+    assert tracker.next_id == 5, "❌ a ball was split over several tracks"
+    assert tracker.capacity >= 5
+    for track_id in range(5):
+        mine = [e for _, i, e in events if i == track_id]
+        assert mine == [START, RELEASED, BOUNCED, END]
+
+    bounces = sorted(d["bounce_frame"] for d in tracker.deliveries)
+    assert bounces == sorted(s + tb for s, _, tb in paths)
+    assert all(d["pitch"] is not None for d in tracker.deliveries)
+
+
+def test_snapshot_and_abort():
+    tracker = MultiBallTracker(fps=30, max_missed=3)
+    # slow ball never reaches release speed, then disappears
+    for f in range(10):
+        events = tracker.step([(100 + f, 300, 0, 0, 0, 0, 0.9)], H, f / 30)
+    snap = tracker.tracks()
+    assert snap["id"].tolist() == [0] and snap["state"].tolist() == ["RUN_UP"]
+    assert np.allclose(snap["position"][0], (109, 300), atol=1.0)
+
+    events = []
+    for f in range(10, 15):
+        events += tracker.step([], H, f / 30)
+    assert events == [(0, ABORT)] and len(tracker) == 0
+    assert tracker.deliveries == []
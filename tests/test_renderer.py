@@ -0,0 +1,31 @@
+import numpy as np
+
+from src.visualization.renderer import OverlayRenderer
+
+
+def track(pos, reset=False):
+    return {"position": pos, "velocity": (30.0, 0.0), "speed": 100.0,
+            "release_speed": None, "max_speed": 100.0, "pitch_type": None,
+            "reset": reset}
+
+
+def test_trail_ring_keeps_last_points_in_order():
+    r = OverlayRenderer(trail=4)
+    for i in range(6):
+        r.update(track((i, 2 * i)))
+    assert r.trail_points()[:, 0].tolist() == [2, 3, 4, 5]
+
+    r.update(track((100, 100), reset=True))
+    assert r.trail_points().tolist() == [[100, 100]]
+
+
+def test_draw_on_scaled_canvas():
+    r = OverlayRenderer(fps=30)
+    for i in range(5):
+        r.update(track((100 + 10 * i, 200)))
+
+    canvas = np.zeros((180, 320, 3), np.uint8)
+    dets = [(140, 200, 130, 190, 150, 210, 0.9)]
+    r.draw(canvas, dets, track((140, 200)), fps=30, scale=(0.5, 0.5))
+    assert canvas[100, 50:70, 0].max() == 255         # trail (blue) at half scale
+    assert canvas[100, 70, 2] == 255                   # ball centre (red)
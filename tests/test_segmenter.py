@@ -0,0 +1,66 @@
+from src.tracking.segmenter import (
+    DeliverySegmenter, IDLE, START, RELEASED, BOUNCED, END, ABORT
+)
+
+
+def track(pos=(100, 100), speed=0.0, bounced=False, reset=False):
+    return {"position": pos, "matched": pos, "speed": speed,
+            "bounced": bounced, "reset": reset}
+
+
+def run(seg, tracks):
+    events = []
+    for t in tracks:
+        events += seg.step(t)[1]
+    return events
+
+
+def test_full_delivery_lifecycle():
+    seg = DeliverySegmenter(release_hits=3, post_bounce_frames=5)
+    tracks = (
+        [track(pos=None)] * 3
+        + [track(speed=10)] * 4
+        + [track(speed=120)] * 10
+        + [track(speed=100, bounced=True)]
+        + [track(speed=80)] * 6
+    )
+    assert run(seg, tracks) == [START, RELEASED, BOUNCED, END]
+    assert seg.release_frame == 7
+    assert seg.deliveries == 1 and seg.state == IDLE
+
+    # same ball still tracked: no new delivery until the track resets
+    assert run(seg, [track(speed=50)] * 5) == []
+    assert run(seg, [track(pos=None), track(speed=10)]) == [START]
+
+
+def test_lost_before_release_is_aborted():
+    seg = DeliverySegmenter()
+    assert run(seg, [track(speed=5)] * 4 + [track(pos=None)]) == [START, ABORT]
+    assert seg.deliveries == 0
+
+    seg = DeliverySegmenter(release_hits=1)
+    events = run(seg, [track(speed=5), track(speed=90), track(pos=None)])
+    assert events == [START, RELEASED, END]
+    assert seg.state == IDLE and seg.deliveries == 1
+
+
+def test_segmented_export_uses_tracker_release_speed():
+    from src.pipeline.stages import ExportStage
+    from src.utils.json_exporter import BallJSONExporter
+
+    export = ExportStage(BallJSONExporter("clip.mp4", 30))
+    seg = DeliverySegmenter(release_hits=3, post_bounce_frames=2)
+    for i, speed in enumerate([0, 10, 40, 60, 90, 90, 90]):
+        t = track(pos=(100 + 10 * i, 100), speed=speed, bounced=(i == 6))
+        # tracker latched 45 km/h; the instantaneous speed keeps rising
+        t.update(matched=(100 + 10 * i, 100, 0, 0, 0, 0, 0.9), velocity=(0.0, 0.0),
+                 release_speed=45.0 if i >= 2 else None,
+                 release_point=None, pitch_type=None)
+        state, events = seg.step(t)
+        t["segment"] = {"state": state, "events": events,
+                        "release_frame": seg.release_frame,
+                        "release_point": seg.release_point}
+        export.record(i, t)
+
+    release = export.exporter.current_delivery["release"]
+    assert release["frame"] == 2 and release["speed_kmph"] == 45.0
@@ -0,0 +1,43 @@
+import functools
+import json
+
+import pytest
+
+from src.pipeline.offline import run_headless
+from src.pipeline.shm_ring import FrameRing, run_shm
+from src.utils.metrics import metrics
+from src.utils.synthetic import GroundTruthDetector, ball_radius, make_delivery_video
+
+
+def test_ring_views_are_shared_not_copied():
+    ring = FrameRing((4, 6, 3), slots=3)
+    other = FrameRing(*ring.spec())
+    ring.view(1)[:] = 7
+    assert other.view(1).min() == 7 and other.view(0).max() == 0
+    other.view(2)[0, 0] = 3
+    assert ring.view(2)[0, 0].tolist() == [3, 3, 3]
+    other.close()
+    ring.close()
+
+
+def test_shm_pipeline_matches_threaded_pipeline(tmp_path):
+    video = str(tmp_path / "clip.mp4")
+    truth, _ = make_delivery_video(video, 320, 180, frames=90)
+    make = functools.partial(GroundTruthDetector, truth, ball_radius(320), (320, 180), jitter=0)
+
+    metrics.enable()
+    try:
+        report = run_shm(video, make, str(tmp_path / "shm.json"), workers=2, slots=4)
+        # the decoder's timers come back from its process
+        assert metrics.timers["read"].count >= 90
+    finally:
+        metrics.disable()
+    run_headless(video, make(), str(tmp_path / "threads.json"))
+
+    assert report["frames"] == 90
+    with open(tmp_path / "shm.json") as f, open(tmp_path / "threads.json") as g:
+        assert json.load(f)["deliveries"] == json.load(g)["deliveries"]
+
+    # a worker that fails to start stops the whole run cleanly
+    with pytest.raises(RuntimeError, match="detector"):
+        run_shm(video, functools.partial(int, "not a detector"), str(tmp_path / "x.json"))
@@ -0,0 +1,29 @@
+import numpy as np
+
+from src.pipeline.stages import TrackStage, ExportStage
+from src.utils.json_exporter import BallJSONExporter
+from src.utils.synthetic import make_delivery_video, GroundTruthDetector, ball_radius
+
+
+def test_tracks_synthetic_deliveries(tmp_path):
+    truth, bounces = make_delivery_video(str(tmp_path / "s.mp4"), 640, 360, 150, noise=0)
+    detector = GroundTruthDetector(truth, ball_radius(640), jitter=0)
+
+    track = TrackStage(fps=30)
+    exporter = BallJSONExporter("s.mp4", 30)
+    export = ExportStage(exporter)
+
+    bounced = []
+    for i in range(len(truth)):
+        result = track.step(detector.detect(frame_index=i), 360, i / 30)
+        if result["bounced"]:
+            bounced.append(i)
+        if result["matched"] is not None:
+            err = np.hypot(*(np.asarray(result["matched"][:2]) - truth[i, :2]))
+            assert err < 2.0
+        export.record(i, result)
+    export.close()
+
+    # flagged once the ball is seen rising again, one frame later
+    assert bounced == [b + 1 for b in bounces]
+    assert exporter.num_deliveries == len(bounces)
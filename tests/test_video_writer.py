@@ -0,0 +1,28 @@
+import cv2
+import numpy as np
+
+from src.export.video_writer import ProcessVideoWriter
+
+
+def test_process_writer_encodes_every_frame(tmp_path):
+    path = str(tmp_path / "out.mp4")
+    writer = ProcessVideoWriter(path, 30, (160, 96), slots=2)
+    assert writer.isOpened()
+
+    frame = np.zeros((96, 160, 3), np.uint8)
+    for i in range(25):
+        frame[:] = 10 * i
+        writer.write(frame)
+    writer.release()
+
+    cap = cv2.VideoCapture(path)
+    n = 0
+    while cap.read()[0]:
+        n += 1
+    cap.release()
+    assert n == 25
+
+
+def test_process_writer_reports_open_failure(tmp_path):
+    writer = ProcessVideoWriter(str(tmp_path / "missing" / "out.mp4"), 30, (160, 96))
+    assert not writer.isOpened() and "could not open" in writer.error